@@ -10,7 +10,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from app.core.database import Base
 from app.core.config import settings
-from app.models import user, condominium, resident, property, role, accounting, space_request, meeting, document, notification
+# Import every model so autogenerate sees the complete metadata
+from app.models import *  # noqa: F401,F403
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -28,6 +29,21 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
+# Full-text search objects created by raw DDL (app.models.search), not by the metadata
+SEARCH_DDL_TABLE_PREFIX = "search_entries_fts"
+SEARCH_DDL_NAMES = {"search_vector", "ix_search_entries_vector"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Keep autogenerate from dropping the full-text search objects"""
+    if reflected and compare_to is None:
+        if type_ == "table" and name.startswith(SEARCH_DDL_TABLE_PREFIX):
+            return False
+        if type_ in ("column", "index") and name in SEARCH_DDL_NAMES:
+            return False
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -52,6 +68,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -73,7 +91,13 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite cannot ALTER columns; batch mode rebuilds the table instead
+            render_as_batch=connection.dialect.name == "sqlite",
+            include_object=include_object,
+            # Commit after each revision so long upgrades do not hold one huge transaction
+            transaction_per_migration=True,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,39 @@
+"""User profile fields and optional password
+
+Replaces scripts/add_user_photo_field.py, add_user_resident_fields.py,
+make_password_nullable.py and migrate_password_nullable.py.
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.migrations import add_column_if_missing, column_info
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column_if_missing('users', sa.Column('photo_url', sa.String(length=500), nullable=True))
+    add_column_if_missing('users', sa.Column('phone', sa.String(length=50), nullable=True))
+    add_column_if_missing('users', sa.Column('document_type', sa.String(length=50), nullable=True))
+    add_column_if_missing('users', sa.Column('document_number', sa.String(length=50), nullable=True))
+
+    # Users invited without a password (set on first login)
+    hashed_password = column_info('users', 'hashed_password')
+    if hashed_password and not hashed_password['nullable']:
+        # PostgreSQL only drops the constraint; SQLite rebuilds the table in batch mode
+        with op.batch_alter_table('users') as batch_op:
+            batch_op.alter_column('hashed_password', existing_type=sa.String(length=255), nullable=True)
+
+
+def downgrade() -> None:
+    # The columns belong to the current schema; nothing to undo for legacy databases
+    pass
@@ -0,0 +1,46 @@
+"""Condominium profile and administration fee configuration
+
+Replaces scripts/update_database.py and
+migrate_condominium_administration_config.py.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+import sqlalchemy as sa
+from app.core.migrations import add_column_if_missing
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ('short_name', sa.String(length=100)),
+    ('city', sa.String(length=100)),
+    ('state', sa.String(length=100)),
+    ('country', sa.String(length=100)),
+    ('postal_code', sa.String(length=20)),
+    ('administrator_name', sa.String(length=255)),
+    ('administrator_phone', sa.String(length=50)),
+    ('administrator_email', sa.String(length=255)),
+    ('logo_url', sa.String(length=500)),
+    ('landscape_image_url', sa.String(length=500)),
+    ('description', sa.Text()),
+    ('total_units', sa.Integer()),
+    ('administration_value_type', sa.String(length=20)),
+    ('administration_value_cop', sa.Integer()),
+]
+
+
+def upgrade() -> None:
+    for name, type_ in COLUMNS:
+        add_column_if_missing('condominiums', sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    # The columns belong to the current schema; nothing to undo for legacy databases
+    pass
@@ -0,0 +1,29 @@
+"""Property and resident descriptive fields
+
+Replaces scripts/update_properties_schema.py and update_residents_schema.py.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+import sqlalchemy as sa
+from app.core.migrations import add_column_if_missing
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column_if_missing('properties', sa.Column('description', sa.Text(), nullable=True))
+    add_column_if_missing('properties', sa.Column('photo_url', sa.String(length=500), nullable=True))
+    add_column_if_missing('residents', sa.Column('photo_url', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    # The columns belong to the current schema; nothing to undo for legacy databases
+    pass
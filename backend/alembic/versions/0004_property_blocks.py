@@ -0,0 +1,72 @@
+"""Blocks table and properties.block -> properties.block_id
+
+Replaces scripts/update_properties_block_schema.py. Block names are turned
+into blocks rows with one INSERT ... SELECT, then properties are linked in
+committed id-range batches so the table is never locked as a whole. The
+legacy properties.block column is left in place (unused by the models).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.migrations import (
+    add_column_if_missing,
+    batched_update,
+    create_index_if_missing,
+    create_table_if_missing,
+    has_column,
+    has_table,
+)
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not has_table('properties'):
+        # Fresh database: 0007 creates the complete schema
+        return
+
+    create_table_if_missing('blocks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_blocks_id', 'blocks', ['id'], unique=False)
+    add_column_if_missing('properties', sa.Column('block_id', sa.Integer(), nullable=True))
+
+    if not has_column('properties', 'block'):
+        return
+
+    op.execute(sa.text("""
+        INSERT INTO blocks (condominium_id, name)
+        SELECT DISTINCT p.condominium_id, p.block
+        FROM properties p
+        WHERE p.block IS NOT NULL AND p.block != ''
+          AND NOT EXISTS (
+              SELECT 1 FROM blocks b WHERE b.condominium_id = p.condominium_id AND b.name = p.block
+          )
+    """))
+    batched_update(
+        'properties',
+        "block_id = (SELECT MIN(b.id) FROM blocks b "
+        "WHERE b.condominium_id = properties.condominium_id AND b.name = properties.block)",
+        where="block IS NOT NULL AND block != '' AND block_id IS NULL",
+    )
+
+
+def downgrade() -> None:
+    # Block links are kept; the legacy block column was never removed
+    pass
@@ -0,0 +1,32 @@
+"""Assembly numbering, start time, minutes and per-option vote counts
+
+Replaces scripts/migrate_assembly_fields.py and
+migrate_assembly_votes_fields.py, which rebuilt both tables on SQLite; the
+columns are nullable so ADD COLUMN is enough on every backend.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+import sqlalchemy as sa
+from app.core.migrations import add_column_if_missing
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column_if_missing('assemblies', sa.Column('assembly_number', sa.Integer(), nullable=True))
+    add_column_if_missing('assemblies', sa.Column('started_at', sa.DateTime(timezone=True), nullable=True))
+    add_column_if_missing('assemblies', sa.Column('minutes', sa.Text(), nullable=True))
+    add_column_if_missing('assembly_votes', sa.Column('option_votes', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    # The columns belong to the current schema; nothing to undo for legacy databases
+    pass
@@ -0,0 +1,32 @@
+"""Expense type on accounting transactions
+
+Replaces scripts/migrate_accounting_expense_type.py.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.migrations import has_column, has_table
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not has_table('accounting_transactions') or has_column('accounting_transactions', 'expense_type'):
+        return
+    expense_type = sa.Enum('ADMINISTRATION', 'FINES', 'SOCIAL_AREA_RENTAL', name='expensetype')
+    expense_type.create(op.get_bind(), checkfirst=True)
+    op.add_column('accounting_transactions', sa.Column('expense_type', expense_type, nullable=True))
+
+
+def downgrade() -> None:
+    # The column belongs to the current schema; nothing to undo for legacy databases
+    pass
@@ -0,0 +1,726 @@
+"""Complete schema: create missing tables and indexes
+
+Fresh databases get every table here (the legacy revisions before it are
+no-ops on them). Databases built by create_all or the old scripts only get
+the tables and indexes they lack; on PostgreSQL the new indexes on existing
+tables are built CONCURRENTLY so administration_invoices and the other large
+tables stay writable during the upgrade.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 01:33:03.688574
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.migrations import create_table_if_missing, create_index_if_missing
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_table_if_missing('condominiums',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('short_name', sa.String(length=100), nullable=True),
+    sa.Column('address', sa.Text(), nullable=True),
+    sa.Column('city', sa.String(length=100), nullable=True),
+    sa.Column('state', sa.String(length=100), nullable=True),
+    sa.Column('country', sa.String(length=100), nullable=True),
+    sa.Column('postal_code', sa.String(length=20), nullable=True),
+    sa.Column('phone', sa.String(length=50), nullable=True),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('nit', sa.String(length=50), nullable=True),
+    sa.Column('administrator_name', sa.String(length=255), nullable=True),
+    sa.Column('administrator_phone', sa.String(length=50), nullable=True),
+    sa.Column('administrator_email', sa.String(length=255), nullable=True),
+    sa.Column('logo_url', sa.String(length=500), nullable=True),
+    sa.Column('landscape_image_url', sa.String(length=500), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('total_units', sa.Integer(), nullable=True),
+    sa.Column('administration_value_type', sa.String(length=20), nullable=True),
+    sa.Column('administration_value_cop', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_condominiums_id', 'condominiums', ['id'], unique=False)
+
+    create_table_if_missing('roles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_roles_id', 'roles', ['id'], unique=False)
+    create_index_if_missing('ix_roles_name', 'roles', ['name'], unique=True)
+
+    create_table_if_missing('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=False),
+    sa.Column('hashed_password', sa.String(length=255), nullable=True),
+    sa.Column('full_name', sa.String(length=255), nullable=True),
+    sa.Column('photo_url', sa.String(length=500), nullable=True),
+    sa.Column('phone', sa.String(length=50), nullable=True),
+    sa.Column('document_type', sa.String(length=50), nullable=True),
+    sa.Column('document_number', sa.String(length=50), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_users_email', 'users', ['email'], unique=True)
+    create_index_if_missing('ix_users_id', 'users', ['id'], unique=False)
+
+    create_table_if_missing('assemblies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('assembly_number', sa.Integer(), nullable=True),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('scheduled_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('agenda', sa.Text(), nullable=True),
+    sa.Column('minutes', sa.Text(), nullable=True),
+    sa.Column('required_quorum', sa.Float(), nullable=False),
+    sa.Column('current_quorum', sa.Float(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_assemblies_id', 'assemblies', ['id'], unique=False)
+    create_index_if_missing('ix_assemblies_condo_scheduled', 'assemblies', ['condominium_id', 'scheduled_date'], unique=False)
+
+    create_table_if_missing('background_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('job_type', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', name='jobstatus'), nullable=True),
+    sa.Column('condominium_id', sa.Integer(), nullable=True),
+    sa.Column('payload', sa.JSON(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('progress', sa.Float(), nullable=True),
+    sa.Column('progress_message', sa.String(length=255), nullable=True),
+    sa.Column('idempotency_key', sa.String(length=255), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('max_attempts', sa.Integer(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('created_by', 'idempotency_key', name='uq_background_jobs_user_idempotency_key')
+    )
+    create_index_if_missing('ix_background_jobs_id', 'background_jobs', ['id'], unique=False)
+    create_index_if_missing('ix_background_jobs_job_type', 'background_jobs', ['job_type'], unique=False)
+    create_index_if_missing('ix_background_jobs_status', 'background_jobs', ['status'], unique=False)
+
+    create_table_if_missing('bank_reconciliations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('bank_name', sa.String(length=255), nullable=False),
+    sa.Column('account_number', sa.String(length=100), nullable=False),
+    sa.Column('statement_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('opening_balance', sa.Float(), nullable=False),
+    sa.Column('closing_balance', sa.Float(), nullable=False),
+    sa.Column('reconciled_by', sa.Integer(), nullable=False),
+    sa.Column('reconciled_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['reconciled_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_bank_reconciliations_id', 'bank_reconciliations', ['id'], unique=False)
+
+    create_table_if_missing('blocks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_blocks_id', 'blocks', ['id'], unique=False)
+
+    create_table_if_missing('budgets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=False),
+    sa.Column('budgeted_amount', sa.Float(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('is_approved', sa.Boolean(), nullable=True),
+    sa.Column('approved_by', sa.Integer(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['approved_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_budgets_id', 'budgets', ['id'], unique=False)
+
+    create_table_if_missing('document_attachments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('entity_type', sa.Enum('RESIDENT', 'PROPERTY', name='attachmententitytype'), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('file_name', sa.String(length=255), nullable=False),
+    sa.Column('file_size', sa.Integer(), nullable=True),
+    sa.Column('mime_type', sa.String(length=100), nullable=True),
+    sa.Column('uploaded_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['uploaded_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_document_attachments_id', 'document_attachments', ['id'], unique=False)
+
+    create_table_if_missing('documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('file_name', sa.String(length=255), nullable=False),
+    sa.Column('file_size', sa.Integer(), nullable=True),
+    sa.Column('mime_type', sa.String(length=100), nullable=True),
+    sa.Column('version', sa.Integer(), nullable=True),
+    sa.Column('previous_version_id', sa.Integer(), nullable=True),
+    sa.Column('uploaded_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['previous_version_id'], ['documents.id'], ),
+    sa.ForeignKeyConstraint(['uploaded_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_documents_id', 'documents', ['id'], unique=False)
+
+    create_table_if_missing('idempotency_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('key', sa.String(length=255), nullable=False),
+    sa.Column('request_hash', sa.String(length=64), nullable=False),
+    sa.Column('status_code', sa.Integer(), nullable=True),
+    sa.Column('content_type', sa.String(length=100), nullable=True),
+    sa.Column('response_body', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'key', name='uq_idempotency_records_user_key')
+    )
+    create_index_if_missing('ix_idempotency_records_expires_at', 'idempotency_records', ['expires_at'], unique=False)
+    create_index_if_missing('ix_idempotency_records_id', 'idempotency_records', ['id'], unique=False)
+
+    create_table_if_missing('meetings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('meeting_type', sa.String(length=50), nullable=False),
+    sa.Column('scheduled_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('location', sa.String(length=255), nullable=True),
+    sa.Column('agenda', sa.Text(), nullable=True),
+    sa.Column('minutes', sa.Text(), nullable=True),
+    sa.Column('is_completed', sa.Boolean(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_meetings_id', 'meetings', ['id'], unique=False)
+    create_index_if_missing('ix_meetings_condo_scheduled', 'meetings', ['condominium_id', 'scheduled_date'], unique=False)
+
+    create_table_if_missing('notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=255), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('notification_type', sa.String(length=50), nullable=False),
+    sa.Column('is_read', sa.Boolean(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_notifications_id', 'notifications', ['id'], unique=False)
+    create_index_if_missing('ix_notifications_condo_user_id', 'notifications', ['condominium_id', 'user_id', 'id'], unique=False)
+
+    create_table_if_missing('residents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('full_name', sa.String(length=255), nullable=False),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('phone', sa.String(length=50), nullable=True),
+    sa.Column('document_type', sa.String(length=50), nullable=True),
+    sa.Column('document_number', sa.String(length=50), nullable=True),
+    sa.Column('photo_url', sa.String(length=500), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_residents_id', 'residents', ['id'], unique=False)
+
+    create_table_if_missing('user_condominiums',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_user_condominiums_id', 'user_condominiums', ['id'], unique=False)
+
+    create_table_if_missing('user_roles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('role_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_user_roles_id', 'user_roles', ['id'], unique=False)
+
+    create_table_if_missing('web_push_subscriptions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('endpoint', sa.String(length=1000), nullable=False),
+    sa.Column('p256dh', sa.String(length=255), nullable=False),
+    sa.Column('auth', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('endpoint')
+    )
+    create_index_if_missing('ix_web_push_subscriptions_id', 'web_push_subscriptions', ['id'], unique=False)
+    create_index_if_missing('ix_web_push_subscriptions_user_id', 'web_push_subscriptions', ['user_id'], unique=False)
+
+    create_table_if_missing('assembly_attendances',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('assembly_id', sa.Integer(), nullable=False),
+    sa.Column('resident_id', sa.Integer(), nullable=False),
+    sa.Column('attended', sa.Boolean(), nullable=True),
+    sa.Column('attendance_confirmed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['assembly_id'], ['assemblies.id'], ),
+    sa.ForeignKeyConstraint(['resident_id'], ['residents.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_assembly_attendances_id', 'assembly_attendances', ['id'], unique=False)
+
+    create_table_if_missing('assembly_votes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('assembly_id', sa.Integer(), nullable=False),
+    sa.Column('topic', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('vote_type', sa.String(length=50), nullable=True),
+    sa.Column('options', sa.Text(), nullable=True),
+    sa.Column('option_votes', sa.Text(), nullable=True),
+    sa.Column('total_votes', sa.Integer(), nullable=True),
+    sa.Column('yes_votes', sa.Integer(), nullable=True),
+    sa.Column('no_votes', sa.Integer(), nullable=True),
+    sa.Column('abstain_votes', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['assembly_id'], ['assemblies.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_assembly_votes_id', 'assembly_votes', ['id'], unique=False)
+
+    create_table_if_missing('meeting_attendances',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('meeting_id', sa.Integer(), nullable=False),
+    sa.Column('resident_id', sa.Integer(), nullable=False),
+    sa.Column('attended', sa.Boolean(), nullable=True),
+    sa.Column('vote', sa.String(length=50), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['meeting_id'], ['meetings.id'], ),
+    sa.ForeignKeyConstraint(['resident_id'], ['residents.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_meeting_attendances_id', 'meeting_attendances', ['id'], unique=False)
+
+    create_table_if_missing('notification_deliveries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('notification_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('channel', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'SENT', 'FAILED', 'SKIPPED', name='deliverystatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['notification_id'], ['notifications.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('notification_id', 'user_id', 'channel', name='uq_notification_deliveries_recipient_channel')
+    )
+    create_index_if_missing('ix_notification_deliveries_id', 'notification_deliveries', ['id'], unique=False)
+    create_index_if_missing('ix_notification_deliveries_notification_status', 'notification_deliveries', ['notification_id', 'status', 'id'], unique=False)
+
+    create_table_if_missing('notification_receipts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('notification_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('read_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['notification_id'], ['notifications.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'notification_id', name='uq_notification_receipts_user_notification')
+    )
+    create_index_if_missing('ix_notification_receipts_id', 'notification_receipts', ['id'], unique=False)
+
+    create_table_if_missing('properties',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('block_id', sa.Integer(), nullable=True),
+    sa.Column('code', sa.String(length=50), nullable=False),
+    sa.Column('type', sa.String(length=50), nullable=False),
+    sa.Column('area', sa.Float(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('photo_url', sa.String(length=500), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['block_id'], ['blocks.id'], ),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_properties_id', 'properties', ['id'], unique=False)
+
+    create_table_if_missing('space_requests',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('resident_id', sa.Integer(), nullable=False),
+    sa.Column('space_name', sa.String(length=255), nullable=False),
+    sa.Column('request_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('start_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('end_time', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('purpose', sa.Text(), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'APPROVED', 'REJECTED', 'CANCELLED', name='requeststatus'), nullable=True),
+    sa.Column('approved_by', sa.Integer(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('rejection_reason', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['approved_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['resident_id'], ['residents.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_space_requests_id', 'space_requests', ['id'], unique=False)
+    create_index_if_missing('ix_space_requests_space_start', 'space_requests', ['condominium_id', 'space_name', 'start_time', 'end_time'], unique=False)
+
+    create_table_if_missing('accounting_transactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('type', sa.Enum('INCOME', 'EXPENSE', name='transactiontype'), nullable=False),
+    sa.Column('category', sa.String(length=100), nullable=True),
+    sa.Column('expense_type', sa.Enum('ADMINISTRATION', 'FINES', 'SOCIAL_AREA_RENTAL', name='expensetype'), nullable=True),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('transaction_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'COMPLETED', 'CANCELLED', name='transactionstatus'), nullable=True),
+    sa.Column('reference_number', sa.String(length=100), nullable=True),
+    sa.Column('property_id', sa.Integer(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_accounting_transactions_id', 'accounting_transactions', ['id'], unique=False)
+
+    create_table_if_missing('administration_fee_rules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('rule_type', sa.Enum('PROPERTY_TYPE', 'BLOCK', 'AREA_RATE', 'LATE_INTEREST', 'RECURRING_CHARGE', name='feeruletype'), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('property_type', sa.String(length=50), nullable=True),
+    sa.Column('block_id', sa.Integer(), nullable=True),
+    sa.Column('property_id', sa.Integer(), nullable=True),
+    sa.Column('description', sa.String(length=255), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['block_id'], ['blocks.id'], ),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_administration_fee_rules_condominium_id', 'administration_fee_rules', ['condominium_id'], unique=False)
+    create_index_if_missing('ix_administration_fee_rules_id', 'administration_fee_rules', ['id'], unique=False)
+
+    create_table_if_missing('administration_invoices',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('invoice_number', sa.String(length=100), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('issue_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('due_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('base_amount', sa.Float(), nullable=False),
+    sa.Column('additional_charges', sa.Float(), nullable=True),
+    sa.Column('discounts', sa.Float(), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('paid_amount', sa.Float(), nullable=True),
+    sa.Column('pending_amount', sa.Float(), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'PARTIAL', 'PAID', 'OVERDUE', 'CANCELLED', name='invoicestatus'), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('invoice_number')
+    )
+    create_index_if_missing('ix_administration_invoices_id', 'administration_invoices', ['id'], unique=False)
+    create_index_if_missing('ix_administration_invoices_condo_due', 'administration_invoices', ['condominium_id', 'is_active', 'due_date'], unique=False)
+
+    create_table_if_missing('property_residents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('resident_id', sa.Integer(), nullable=False),
+    sa.Column('start_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('end_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('ownership_percentage', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ),
+    sa.ForeignKeyConstraint(['resident_id'], ['residents.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_property_residents_id', 'property_residents', ['id'], unique=False)
+
+    create_table_if_missing('receivable_aging_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('condominium_id', sa.Integer(), nullable=False),
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('block_id', sa.Integer(), nullable=True),
+    sa.Column('current_amount', sa.Float(), nullable=True),
+    sa.Column('days_1_30', sa.Float(), nullable=True),
+    sa.Column('days_31_60', sa.Float(), nullable=True),
+    sa.Column('days_61_90', sa.Float(), nullable=True),
+    sa.Column('days_over_90', sa.Float(), nullable=True),
+    sa.Column('total_pending', sa.Float(), nullable=True),
+    sa.Column('invoice_count', sa.Integer(), nullable=True),
+    sa.Column('as_of', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['block_id'], ['blocks.id'], ),
+    sa.ForeignKeyConstraint(['condominium_id'], ['condominiums.id'], ),
+    sa.ForeignKeyConstraint(['property_id'], ['properties.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_receivable_aging_snapshots_condominium_id', 'receivable_aging_snapshots', ['condominium_id'], unique=False)
+    create_index_if_missing('ix_receivable_aging_snapshots_id', 'receivable_aging_snapshots', ['id'], unique=False)
+
+    create_table_if_missing('vote_records',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('vote_id', sa.Integer(), nullable=False),
+    sa.Column('resident_id', sa.Integer(), nullable=False),
+    sa.Column('vote_value', sa.String(length=50), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['resident_id'], ['residents.id'], ),
+    sa.ForeignKeyConstraint(['vote_id'], ['assembly_votes.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_vote_records_id', 'vote_records', ['id'], unique=False)
+
+    create_table_if_missing('invoice_payments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('invoice_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('payment_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('payment_method', sa.Enum('CASH', 'BANK_TRANSFER', 'CHECK', 'CARD', 'OTHER', name='paymentmethod'), nullable=False),
+    sa.Column('reference_number', sa.String(length=100), nullable=True),
+    sa.Column('notes', sa.Text(), nullable=True),
+    sa.Column('recorded_by', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['invoice_id'], ['administration_invoices.id'], ),
+    sa.ForeignKeyConstraint(['recorded_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_index_if_missing('ix_invoice_payments_id', 'invoice_payments', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('invoice_payments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_invoice_payments_id'))
+
+    op.drop_table('invoice_payments')
+    with op.batch_alter_table('vote_records', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_vote_records_id'))
+
+    op.drop_table('vote_records')
+    with op.batch_alter_table('receivable_aging_snapshots', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_receivable_aging_snapshots_id'))
+        batch_op.drop_index(batch_op.f('ix_receivable_aging_snapshots_condominium_id'))
+
+    op.drop_table('receivable_aging_snapshots')
+    with op.batch_alter_table('property_residents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_property_residents_id'))
+
+    op.drop_table('property_residents')
+    with op.batch_alter_table('administration_invoices', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_administration_invoices_id'))
+        batch_op.drop_index('ix_administration_invoices_condo_due')
+
+    op.drop_table('administration_invoices')
+    with op.batch_alter_table('administration_fee_rules', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_administration_fee_rules_id'))
+        batch_op.drop_index(batch_op.f('ix_administration_fee_rules_condominium_id'))
+
+    op.drop_table('administration_fee_rules')
+    with op.batch_alter_table('accounting_transactions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_accounting_transactions_id'))
+
+    op.drop_table('accounting_transactions')
+    with op.batch_alter_table('space_requests', schema=None) as batch_op:
+        batch_op.drop_index('ix_space_requests_space_start')
+        batch_op.drop_index(batch_op.f('ix_space_requests_id'))
+
+    op.drop_table('space_requests')
+    with op.batch_alter_table('properties', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_properties_id'))
+
+    op.drop_table('properties')
+    with op.batch_alter_table('notification_receipts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_notification_receipts_id'))
+
+    op.drop_table('notification_receipts')
+    with op.batch_alter_table('notification_deliveries', schema=None) as batch_op:
+        batch_op.drop_index('ix_notification_deliveries_notification_status')
+        batch_op.drop_index(batch_op.f('ix_notification_deliveries_id'))
+
+    op.drop_table('notification_deliveries')
+    with op.batch_alter_table('meeting_attendances', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_meeting_attendances_id'))
+
+    op.drop_table('meeting_attendances')
+    with op.batch_alter_table('assembly_votes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_assembly_votes_id'))
+
+    op.drop_table('assembly_votes')
+    with op.batch_alter_table('assembly_attendances', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_assembly_attendances_id'))
+
+    op.drop_table('assembly_attendances')
+    with op.batch_alter_table('web_push_subscriptions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_web_push_subscriptions_user_id'))
+        batch_op.drop_index(batch_op.f('ix_web_push_subscriptions_id'))
+
+    op.drop_table('web_push_subscriptions')
+    with op.batch_alter_table('user_roles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_roles_id'))
+
+    op.drop_table('user_roles')
+    with op.batch_alter_table('user_condominiums', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_user_condominiums_id'))
+
+    op.drop_table('user_condominiums')
+    with op.batch_alter_table('residents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_residents_id'))
+
+    op.drop_table('residents')
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_notifications_id'))
+        batch_op.drop_index('ix_notifications_condo_user_id')
+
+    op.drop_table('notifications')
+    with op.batch_alter_table('meetings', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_meetings_id'))
+        batch_op.drop_index('ix_meetings_condo_scheduled')
+
+    op.drop_table('meetings')
+    with op.batch_alter_table('idempotency_records', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_idempotency_records_id'))
+        batch_op.drop_index(batch_op.f('ix_idempotency_records_expires_at'))
+
+    op.drop_table('idempotency_records')
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_documents_id'))
+
+    op.drop_table('documents')
+    with op.batch_alter_table('document_attachments', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_document_attachments_id'))
+
+    op.drop_table('document_attachments')
+    with op.batch_alter_table('budgets', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_budgets_id'))
+
+    op.drop_table('budgets')
+    with op.batch_alter_table('blocks', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_blocks_id'))
+
+    op.drop_table('blocks')
+    with op.batch_alter_table('bank_reconciliations', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_bank_reconciliations_id'))
+
+    op.drop_table('bank_reconciliations')
+    with op.batch_alter_table('background_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_background_jobs_status'))
+        batch_op.drop_index(batch_op.f('ix_background_jobs_job_type'))
+        batch_op.drop_index(batch_op.f('ix_background_jobs_id'))
+
+    op.drop_table('background_jobs')
+    with op.batch_alter_table('assemblies', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_assemblies_id'))
+        batch_op.drop_index('ix_assemblies_condo_scheduled')
+
+    op.drop_table('assemblies')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_id'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
+    with op.batch_alter_table('roles', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_roles_name'))
+        batch_op.drop_index(batch_op.f('ix_roles_id'))
+
+    op.drop_table('roles')
+    with op.batch_alter_table('condominiums', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_condominiums_id'))
+
+    op.drop_table('condominiums')
+    # ### end Alembic commands ###
+
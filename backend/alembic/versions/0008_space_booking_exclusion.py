@@ -0,0 +1,43 @@
+"""Exclusion constraint against overlapping approved space bookings (PostgreSQL)
+
+Same constraint the SpaceRequest model adds when the table is created with
+create_all; other backends rely on the application-level overlap check.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 02:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.migrations import is_postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+CONSTRAINT = 'ex_space_requests_no_overlap'
+
+
+def upgrade() -> None:
+    if not is_postgresql():
+        return
+    exists = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_constraint WHERE conname = :name"), {"name": CONSTRAINT}
+    ).first()
+    if exists:
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.execute(
+        f"ALTER TABLE space_requests ADD CONSTRAINT {CONSTRAINT} "
+        "EXCLUDE USING gist (condominium_id WITH =, space_name WITH =, "
+        "tstzrange(start_time, end_time, '[)') WITH &&) WHERE (status = 'APPROVED')"
+    )
+
+
+def downgrade() -> None:
+    if is_postgresql():
+        op.execute(f"ALTER TABLE space_requests DROP CONSTRAINT IF EXISTS {CONSTRAINT}")
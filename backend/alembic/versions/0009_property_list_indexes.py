@@ -0,0 +1,29 @@
+"""Indexes for the paginated property listing
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 03:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.migrations import create_index_if_missing, has_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_if_missing('ix_properties_condo_code', 'properties', ['condominium_id', 'code'])
+    create_index_if_missing('ix_property_residents_property_end', 'property_residents', ['property_id', 'end_date'])
+
+
+def downgrade() -> None:
+    if has_index('property_residents', 'ix_property_residents_property_end'):
+        op.drop_index('ix_property_residents_property_end', table_name='property_residents')
+    if has_index('properties', 'ix_properties_condo_code'):
+        op.drop_index('ix_properties_condo_code', table_name='properties')
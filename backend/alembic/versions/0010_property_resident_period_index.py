@@ -0,0 +1,28 @@
+"""Index for ownership as of a date on property_residents
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 04:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.migrations import create_index_if_missing, has_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_if_missing(
+        'ix_property_residents_property_period', 'property_residents', ['property_id', 'start_date', 'end_date']
+    )
+
+
+def downgrade() -> None:
+    if has_index('property_residents', 'ix_property_residents_property_period'):
+        op.drop_index('ix_property_residents_property_period', table_name='property_residents')
@@ -0,0 +1,53 @@
+"""Full-text search index (search_entries + FTS5 / tsvector)
+
+Creates the search_entries table with its backend full-text structures and
+fills it from the existing residents, properties, blocks and documents.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 05:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.migrations import create_table_if_missing, create_index_if_missing, has_table
+from app.core.search import rebuild_search_index
+from app.models.search import create_fulltext_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_table_if_missing(
+        'search_entries',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('condominium_id', sa.Integer(), sa.ForeignKey('condominiums.id'), nullable=False),
+        sa.Column('entity_type', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('subtitle', sa.String(length=255), nullable=True),
+        sa.Column('search_text', sa.Text(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    )
+    create_index_if_missing('ix_search_entries_id', 'search_entries', ['id'])
+    create_index_if_missing('ix_search_entries_entity', 'search_entries', ['entity_type', 'entity_id'], unique=True)
+    create_index_if_missing('ix_search_entries_condo_type', 'search_entries', ['condominium_id', 'entity_type'])
+
+    bind = op.get_bind()
+    if not create_fulltext_index(bind):
+        print("[WARNING] No full-text index for this database; search will use LIKE")
+    rebuild_search_index(bind)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for trigger in ('search_entries_ai', 'search_entries_ad', 'search_entries_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS search_entries_fts")
+    if has_table('search_entries'):
+        op.drop_table('search_entries')
@@ -0,0 +1,37 @@
+"""Extracted text columns on documents and document_attachments
+
+Existing files keep text_status NULL until scripts/extract_document_text.py
+processes them.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 06:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.migrations import add_column_if_missing, has_column
+
+
+# revision identifiers, used by Alembic.
+revision = '0012'
+down_revision = '0011'
+branch_labels = None
+depends_on = None
+
+TABLES = ['documents', 'document_attachments']
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        add_column_if_missing(table, sa.Column('text_content', sa.Text(), nullable=True))
+        add_column_if_missing(table, sa.Column('text_status', sa.String(length=20), nullable=True))
+        add_column_if_missing(table, sa.Column('text_error', sa.String(length=500), nullable=True))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            for column in ('text_error', 'text_status', 'text_content'):
+                if has_column(table, column):
+                    batch_op.drop_column(column)
@@ -0,0 +1,72 @@
+"""Document version chains: root_document_id, is_latest, content_hash
+
+Existing rows become heads of their own chain unless a later row points to
+them through previous_version_id.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 07:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.migrations import add_column_if_missing, create_index_if_missing, has_column, has_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0013'
+down_revision = '0012'
+branch_labels = None
+depends_on = None
+
+MAX_CHAIN_LENGTH = 1000
+
+
+def upgrade() -> None:
+    add_column_if_missing('documents', sa.Column('root_document_id', sa.Integer(), nullable=True))
+    add_column_if_missing('documents', sa.Column('is_latest', sa.Boolean(), nullable=False, server_default=sa.true()))
+    add_column_if_missing('documents', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    bind = op.get_bind()
+    # Roots first, then each following version inherits its predecessor's root
+    bind.execute(sa.text(
+        "UPDATE documents SET root_document_id = id "
+        "WHERE root_document_id IS NULL AND previous_version_id IS NULL"
+    ))
+    for _ in range(MAX_CHAIN_LENGTH):
+        updated = bind.execute(sa.text(
+            "UPDATE documents SET root_document_id = ("
+            "  SELECT p.root_document_id FROM documents p WHERE p.id = documents.previous_version_id"
+            ") WHERE root_document_id IS NULL AND EXISTS ("
+            "  SELECT 1 FROM documents p WHERE p.id = documents.previous_version_id AND p.root_document_id IS NOT NULL"
+            ")"
+        )).rowcount
+        if not updated:
+            break
+    bind.execute(sa.text("UPDATE documents SET root_document_id = id WHERE root_document_id IS NULL"))
+    bind.execute(
+        sa.text(
+            "UPDATE documents SET is_latest = CASE WHEN EXISTS ("
+            "  SELECT 1 FROM documents n WHERE n.previous_version_id = documents.id"
+            ") THEN :no ELSE :yes END"
+        ),
+        {"yes": True, "no": False},
+    )
+
+    create_index_if_missing('ix_documents_condo_latest', 'documents', ['condominium_id', 'is_latest'])
+    create_index_if_missing('ix_documents_root_version', 'documents', ['root_document_id', 'version'])
+    create_index_if_missing(
+        'ux_documents_root_latest', 'documents', ['root_document_id'], unique=True,
+        sqlite_where=sa.text('is_latest = 1'), postgresql_where=sa.text('is_latest'),
+    )
+    create_index_if_missing('ix_documents_condo_hash', 'documents', ['condominium_id', 'content_hash'])
+
+
+def downgrade() -> None:
+    for name in ('ix_documents_condo_hash', 'ux_documents_root_latest', 'ix_documents_root_version', 'ix_documents_condo_latest'):
+        if has_index('documents', name):
+            op.drop_index(name, table_name='documents')
+    with op.batch_alter_table('documents') as batch_op:
+        for column in ('content_hash', 'is_latest', 'root_document_id'):
+            if has_column('documents', column):
+                batch_op.drop_column(column)
@@ -0,0 +1,34 @@
+"""Job lease: background_jobs.heartbeat_at
+
+Running jobs refresh heartbeat_at while they execute; jobs whose heartbeat
+is older than JOB_LEASE_SECONDS were lost with their worker and are queued
+again by app.core.jobs.recover_stale_jobs.
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-20 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.migrations import add_column_if_missing, create_index_if_missing, has_column, has_index
+
+
+# revision identifiers, used by Alembic.
+revision = '0014'
+down_revision = '0013'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    add_column_if_missing('background_jobs', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+    create_index_if_missing('ix_background_jobs_status_heartbeat', 'background_jobs', ['status', 'heartbeat_at'])
+
+
+def downgrade() -> None:
+    if has_index('background_jobs', 'ix_background_jobs_status_heartbeat'):
+        op.drop_index('ix_background_jobs_status_heartbeat', table_name='background_jobs')
+    with op.batch_alter_table('background_jobs') as batch_op:
+        if has_column('background_jobs', 'heartbeat_at'):
+            batch_op.drop_column('heartbeat_at')
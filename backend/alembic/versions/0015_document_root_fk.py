@@ -0,0 +1,41 @@
+"""Foreign key documents.root_document_id -> documents.id
+
+0013 added root_document_id without the constraint the model declares.
+SQLite cannot add constraints in place, so the table is rebuilt through
+batch_alter_table there; PostgreSQL gets a plain ALTER TABLE.
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-21 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.core.migrations import has_column, has_foreign_key
+
+
+# revision identifiers, used by Alembic.
+revision = '0015'
+down_revision = '0014'
+branch_labels = None
+depends_on = None
+
+FK_NAME = 'fk_documents_root_document_id'
+
+
+def upgrade() -> None:
+    if not has_column('documents', 'root_document_id') or has_foreign_key('documents', ['root_document_id'], 'documents'):
+        return
+    # Rows pointing at deleted documents would make the constraint fail: they become their own root
+    op.execute(sa.text(
+        "UPDATE documents SET root_document_id = id "
+        "WHERE root_document_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM documents r WHERE r.id = documents.root_document_id)"
+    ))
+    with op.batch_alter_table('documents') as batch_op:
+        batch_op.create_foreign_key(FK_NAME, 'documents', ['root_document_id'], ['id'])
+
+
+def downgrade() -> None:
+    if has_foreign_key('documents', ['root_document_id'], 'documents'):
+        with op.batch_alter_table('documents') as batch_op:
+            batch_op.drop_constraint(FK_NAME, type_='foreignkey')
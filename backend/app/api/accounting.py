@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from app.core.database import get_db
+from app.core.idempotency import idempotent
 from app.core.permissions import (
     check_condominium_access,
     can_access_accounting,
@@ -31,6 +32,7 @@ router = APIRouter()
 
 # Transactions
 @router.post("/transactions", response_model=AccountingTransactionResponse, status_code=status.HTTP_201_CREATED)
+@idempotent
 async def create_transaction(
     transaction_data: AccountingTransactionCreate,
     db: Session = Depends(get_db),
@@ -175,6 +177,7 @@ async def delete_transaction(
 
 # Budgets
 @router.post("/budgets", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED)
+@idempotent
 async def create_budget(
     budget_data: BudgetCreate,
     db: Session = Depends(get_db),
@@ -278,6 +281,7 @@ async def update_budget(
 
 # Bank Reconciliations
 @router.post("/bank-reconciliations", response_model=BankReconciliationResponse, status_code=status.HTTP_201_CREATED)
+@idempotent
 async def create_bank_reconciliation(
     reconciliation_data: BankReconciliationCreate,
     db: Session = Depends(get_db),
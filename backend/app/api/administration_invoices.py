@@ -1,18 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
-from typing import List, Optional
+from sqlalchemy import func, and_, case, select, literal, union_all, Float, String
+from typing import List, Optional, Iterator, Callable
+import csv
+import io
 from datetime import datetime, date, timedelta
 from app.core.database import get_db
 from app.core.permissions import check_condominium_access, can_access_accounting, Role
+from app.core.billing import compute_administration_fees, describe_fee
+from app.core.jobs import register_job, JobContext, JobError
+from app.core.idempotency import idempotent
+from app.core.ownership import current_link
 from app.models.administration_invoice import (
     AdministrationInvoice,
     InvoicePayment,
     InvoiceStatus,
-    PaymentMethod
+    PaymentMethod,
+    ReceivableAgingSnapshot,
+    AdministrationFeeRule,
+    FeeRuleType,
 )
 from app.models.condominium import Condominium
-from app.models.property import Property
+from app.models.property import Property, PropertyResident
+from app.models.resident import Resident
 from app.models.block import Block
 from app.models.user import User
 from app.api.auth import get_current_user
@@ -26,6 +37,13 @@ from app.schemas.administration_invoice import (
     InvoicePaymentResponse,
     GenerateBillingRequest,
     GenerateBillingResponse,
+    ReceivableAgingRow,
+    ReceivableAgingResponse,
+    OverdueSweepResponse,
+    StatementEntry,
+    PropertyStatementResponse,
+    AdministrationFeeRuleCreate,
+    AdministrationFeeRuleResponse,
 )
 
 router = APIRouter()
@@ -53,7 +71,360 @@ def update_invoice_status(invoice: AdministrationInvoice):
             invoice.status = InvoiceStatus.OVERDUE
 
 
+# Invoices that still carry a balance for collection purposes
+OPEN_INVOICE_STATUSES = [InvoiceStatus.PENDING, InvoiceStatus.PARTIAL, InvoiceStatus.OVERDUE]
+AGING_BUCKETS = ("current", "days_1_30", "days_31_60", "days_61_90", "days_over_90")
+
+
+def _start_of_day(moment: Optional[datetime] = None) -> datetime:
+    moment = moment or datetime.utcnow()
+    return datetime(moment.year, moment.month, moment.day)
+
+
+def _aging_columns(as_of: datetime):
+    """SUM(CASE ...) columns that split pending_amount into aging buckets by due_date"""
+    pending = AdministrationInvoice.pending_amount
+    due = AdministrationInvoice.due_date
+    cut_30 = as_of - timedelta(days=30)
+    cut_60 = as_of - timedelta(days=60)
+    cut_90 = as_of - timedelta(days=90)
+
+    def bucket(condition, label):
+        return func.coalesce(func.sum(case((condition, pending), else_=0.0)), 0.0).label(label)
+
+    return [
+        bucket(due >= as_of, "current"),
+        bucket(and_(due < as_of, due >= cut_30), "days_1_30"),
+        bucket(and_(due < cut_30, due >= cut_60), "days_31_60"),
+        bucket(and_(due < cut_60, due >= cut_90), "days_61_90"),
+        bucket(due < cut_90, "days_over_90"),
+        func.coalesce(func.sum(pending), 0.0).label("total_pending"),
+        func.count(AdministrationInvoice.id).label("invoice_count"),
+    ]
+
+
+def compute_receivable_aging(
+    db: Session, condominium_id: int, group_by: str = "property", as_of: Optional[datetime] = None
+) -> List[ReceivableAgingRow]:
+    """Aggregate open invoice balances per property or per block in a single query"""
+    as_of = _start_of_day(as_of)
+    if group_by == "block":
+        key_columns = [Property.block_id, Block.name]
+    else:
+        key_columns = [Property.id, Property.code, Property.block_id, Block.name]
+
+    query = (
+        db.query(*key_columns, *_aging_columns(as_of))
+        .select_from(AdministrationInvoice)
+        .join(Property, Property.id == AdministrationInvoice.property_id)
+        .outerjoin(Block, Block.id == Property.block_id)
+        .filter(
+            AdministrationInvoice.condominium_id == condominium_id,
+            AdministrationInvoice.is_active == True,
+            AdministrationInvoice.status.in_(OPEN_INVOICE_STATUSES),
+            AdministrationInvoice.pending_amount > 0,
+        )
+        .group_by(*key_columns)
+    )
+
+    rows = []
+    if group_by == "block":
+        for row in query.order_by(Block.name).all():
+            rows.append(ReceivableAgingRow(
+                block_id=row.block_id,
+                block_name=row.name,
+                **{b: float(getattr(row, b)) for b in AGING_BUCKETS},
+                total_pending=float(row.total_pending),
+                invoice_count=row.invoice_count,
+            ))
+    else:
+        for row in query.order_by(Property.code).all():
+            rows.append(ReceivableAgingRow(
+                property_id=row.id,
+                property_code=row.code,
+                block_id=row.block_id,
+                block_name=row.name,
+                **{b: float(getattr(row, b)) for b in AGING_BUCKETS},
+                total_pending=float(row.total_pending),
+                invoice_count=row.invoice_count,
+            ))
+    return rows
+
+
+def _cached_receivable_aging(db: Session, condominium_id: int, group_by: str):
+    """Read the aging report from the materialized snapshot; returns (as_of, rows) or None"""
+    snap = ReceivableAgingSnapshot
+    as_of = db.query(func.max(snap.as_of)).filter(snap.condominium_id == condominium_id).scalar()
+    if as_of is None:
+        return None
+
+    sums = [
+        func.sum(snap.current_amount).label("current"),
+        func.sum(snap.days_1_30).label("days_1_30"),
+        func.sum(snap.days_31_60).label("days_31_60"),
+        func.sum(snap.days_61_90).label("days_61_90"),
+        func.sum(snap.days_over_90).label("days_over_90"),
+        func.sum(snap.total_pending).label("total_pending"),
+        func.sum(snap.invoice_count).label("invoice_count"),
+    ]
+    if group_by == "block":
+        key_columns = [snap.block_id, Block.name]
+        query = (
+            db.query(*key_columns, *sums)
+            .outerjoin(Block, Block.id == snap.block_id)
+            .filter(snap.condominium_id == condominium_id)
+            .group_by(*key_columns)
+            .order_by(Block.name)
+        )
+    else:
+        key_columns = [snap.property_id, Property.code, snap.block_id, Block.name]
+        query = (
+            db.query(*key_columns, *sums)
+            .join(Property, Property.id == snap.property_id)
+            .outerjoin(Block, Block.id == snap.block_id)
+            .filter(snap.condominium_id == condominium_id)
+            .group_by(*key_columns)
+            .order_by(Property.code)
+        )
+
+    rows = []
+    for row in query.all():
+        rows.append(ReceivableAgingRow(
+            property_id=getattr(row, "property_id", None),
+            property_code=getattr(row, "code", None),
+            block_id=row.block_id,
+            block_name=row.name,
+            **{b: float(getattr(row, b) or 0.0) for b in AGING_BUCKETS},
+            total_pending=float(row.total_pending or 0.0),
+            invoice_count=int(row.invoice_count or 0),
+        ))
+    return as_of, rows
+
+
+def refresh_receivable_aging_snapshot(db: Session, condominium_id: int, as_of: Optional[datetime] = None) -> int:
+    """Rebuild the materialized aging rows for a condominium (caller commits)"""
+    as_of = _start_of_day(as_of)
+    rows = compute_receivable_aging(db, condominium_id, group_by="property", as_of=as_of)
+    db.query(ReceivableAgingSnapshot).filter(
+        ReceivableAgingSnapshot.condominium_id == condominium_id
+    ).delete(synchronize_session=False)
+    db.bulk_insert_mappings(ReceivableAgingSnapshot, [
+        {
+            "condominium_id": condominium_id,
+            "property_id": row.property_id,
+            "block_id": row.block_id,
+            "current_amount": row.current,
+            "days_1_30": row.days_1_30,
+            "days_31_60": row.days_31_60,
+            "days_61_90": row.days_61_90,
+            "days_over_90": row.days_over_90,
+            "total_pending": row.total_pending,
+            "invoice_count": row.invoice_count,
+            "as_of": as_of,
+        }
+        for row in rows
+    ])
+    return len(rows)
+
+
+def sweep_overdue_invoices(db: Session, condominium_id: Optional[int] = None) -> OverdueSweepResponse:
+    """
+    Mark past-due pending/partial invoices as overdue with one UPDATE and refresh
+    the aging snapshot of every affected condominium. Caller commits.
+    """
+    today = _start_of_day()
+    query = db.query(AdministrationInvoice).filter(
+        AdministrationInvoice.is_active == True,
+        AdministrationInvoice.status.in_([InvoiceStatus.PENDING, InvoiceStatus.PARTIAL]),
+        AdministrationInvoice.due_date < today,
+    )
+    if condominium_id is not None:
+        query = query.filter(AdministrationInvoice.condominium_id == condominium_id)
+    marked = query.update({AdministrationInvoice.status: InvoiceStatus.OVERDUE}, synchronize_session=False)
+
+    if condominium_id is not None:
+        condominium_ids = [condominium_id]
+    else:
+        condominium_ids = [
+            cid for (cid,) in db.query(AdministrationInvoice.condominium_id)
+            .filter(AdministrationInvoice.is_active == True)
+            .distinct()
+            .all()
+        ]
+
+    snapshot_rows = 0
+    for cid in condominium_ids:
+        snapshot_rows += refresh_receivable_aging_snapshot(db, cid, as_of=today)
+
+    return OverdueSweepResponse(marked_overdue=marked, snapshot_rows=snapshot_rows)
+
+
+STATEMENT_FORMATS = ("json", "csv", "pdf")
+PAYMENT_METHOD_LABELS = {
+    PaymentMethod.CASH.name: "efectivo",
+    PaymentMethod.BANK_TRANSFER.name: "transferencia",
+    PaymentMethod.CHECK.name: "cheque",
+    PaymentMethod.CARD.name: "tarjeta",
+    PaymentMethod.OTHER.name: "otro",
+}
+
+
+def _statement_filters(property_id: int):
+    return [
+        AdministrationInvoice.property_id == property_id,
+        AdministrationInvoice.is_active == True,
+        AdministrationInvoice.status != InvoiceStatus.CANCELLED,
+    ]
+
+
+def _statement_ledger(property_id: int, date_from: Optional[datetime] = None, date_to: Optional[datetime] = None):
+    """
+    UNION ALL of invoice charges and their payments for a property, ordered by date.
+    Invoices are placed before payments of the same timestamp.
+    """
+    charge_amount = AdministrationInvoice.total_amount - func.coalesce(AdministrationInvoice.discounts, 0.0)
+    charges = (
+        select(
+            AdministrationInvoice.issue_date.label("entry_date"),
+            literal("invoice", type_=String).label("entry_type"),
+            AdministrationInvoice.id.label("invoice_id"),
+            AdministrationInvoice.invoice_number.label("invoice_number"),
+            AdministrationInvoice.month.label("month"),
+            AdministrationInvoice.year.label("year"),
+            literal(None, type_=String).label("method"),
+            literal(None, type_=String).label("reference"),
+            charge_amount.label("charge"),
+            literal(0.0, type_=Float).label("payment"),
+        )
+        .where(*_statement_filters(property_id))
+    )
+    payments = (
+        select(
+            InvoicePayment.payment_date.label("entry_date"),
+            literal("payment", type_=String).label("entry_type"),
+            AdministrationInvoice.id.label("invoice_id"),
+            AdministrationInvoice.invoice_number.label("invoice_number"),
+            AdministrationInvoice.month.label("month"),
+            AdministrationInvoice.year.label("year"),
+            func.cast(InvoicePayment.payment_method, String).label("method"),
+            InvoicePayment.reference_number.label("reference"),
+            literal(0.0, type_=Float).label("charge"),
+            InvoicePayment.amount.label("payment"),
+        )
+        .join(AdministrationInvoice, AdministrationInvoice.id == InvoicePayment.invoice_id)
+        .where(*_statement_filters(property_id))
+    )
+    if date_from:
+        charges = charges.where(AdministrationInvoice.issue_date >= date_from)
+        payments = payments.where(InvoicePayment.payment_date >= date_from)
+    if date_to:
+        charges = charges.where(AdministrationInvoice.issue_date <= date_to)
+        payments = payments.where(InvoicePayment.payment_date <= date_to)
+
+    ledger = union_all(charges, payments).subquery()
+    return select(ledger).order_by(ledger.c.entry_date, ledger.c.entry_type, ledger.c.invoice_id)
+
+
+def _statement_opening_balance(db: Session, property_id: int, date_from: Optional[datetime]) -> float:
+    """Charges minus payments recorded before date_from"""
+    if not date_from:
+        return 0.0
+    charged = db.query(
+        func.coalesce(func.sum(AdministrationInvoice.total_amount - func.coalesce(AdministrationInvoice.discounts, 0.0)), 0.0)
+    ).filter(*_statement_filters(property_id), AdministrationInvoice.issue_date < date_from).scalar()
+    paid = db.query(func.coalesce(func.sum(InvoicePayment.amount), 0.0)).join(
+        AdministrationInvoice, AdministrationInvoice.id == InvoicePayment.invoice_id
+    ).filter(*_statement_filters(property_id), InvoicePayment.payment_date < date_from).scalar()
+    return float(charged) - float(paid)
+
+
+def iter_property_statement(
+    db: Session,
+    property_id: int,
+    opening_balance: float = 0.0,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+) -> Iterator[StatementEntry]:
+    """Stream statement entries with running balance, fetching rows in batches"""
+    balance = opening_balance
+    result = db.execute(_statement_ledger(property_id, date_from, date_to).execution_options(yield_per=500))
+    for row in result:
+        charge = float(row.charge or 0.0)
+        payment = float(row.payment or 0.0)
+        balance += charge - payment
+        if row.entry_type == "invoice":
+            description = f"Administración {row.month:02d}/{row.year}"
+        else:
+            method = PAYMENT_METHOD_LABELS.get(row.method, (row.method or "").lower())
+            description = f"Pago {method}" + (f" ref. {row.reference}" if row.reference else "")
+        yield StatementEntry(
+            entry_date=row.entry_date,
+            entry_type=row.entry_type,
+            invoice_id=row.invoice_id,
+            invoice_number=row.invoice_number,
+            description=description,
+            charge=charge,
+            payment=payment,
+            balance=balance,
+        )
+
+
+def _statement_csv(entries: Iterator[StatementEntry], opening_balance: float) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        data = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return data
+
+    writer.writerow(["fecha", "tipo", "factura", "descripcion", "cargo", "abono", "saldo"])
+    writer.writerow(["", "saldo_inicial", "", "", "", "", f"{opening_balance:.2f}"])
+    yield flush()
+    for entry in entries:
+        writer.writerow([
+            entry.entry_date.date().isoformat(),
+            entry.entry_type,
+            entry.invoice_number,
+            entry.description,
+            f"{entry.charge:.2f}",
+            f"{entry.payment:.2f}",
+            f"{entry.balance:.2f}",
+        ])
+        yield flush()
+
+
+def _statement_pdf_lines(entries: Iterator[StatementEntry]) -> Iterator[str]:
+    for entry in entries:
+        yield "{:<10} {:<28} {:<34} {:>12} {:>12} {:>12}".format(
+            entry.entry_date.date().isoformat(),
+            entry.invoice_number[:28],
+            entry.description[:34],
+            f"{entry.charge:,.2f}" if entry.charge else "",
+            f"{entry.payment:,.2f}" if entry.payment else "",
+            f"{entry.balance:,.2f}",
+        )
+
+
+def user_can_view_property_statement(db: Session, user: User, property_obj: Property) -> bool:
+    """Accounting roles or residents currently linked to the property may read its statement"""
+    if not check_condominium_access(db, user, property_obj.condominium_id):
+        return False
+    if can_access_accounting(user):
+        return True
+    linked = db.query(PropertyResident.id).join(
+        Resident, Resident.id == PropertyResident.resident_id
+    ).filter(
+        PropertyResident.property_id == property_obj.id,
+        current_link(),
+        Resident.user_id == user.id,
+    ).first()
+    return linked is not None
+
+
 @router.post("/", response_model=AdministrationInvoiceResponse, status_code=status.HTTP_201_CREATED)
+@idempotent
 async def create_invoice(
     invoice_data: AdministrationInvoiceCreate,
     db: Session = Depends(get_db),
@@ -173,11 +544,162 @@ async def get_invoices(
     for invoice in invoices:
         update_invoice_status(invoice)
     
-    db.commit()
+    # Committing expires every loaded row and serializing would reload them one by one
+    if any(db.is_modified(invoice) for invoice in invoices):
+        db.commit()
     
     return invoices
 
 
+@router.get("/condominium/{condominium_id}/aging", response_model=ReceivableAgingResponse)
+async def get_receivable_aging(
+    condominium_id: int,
+    group_by: str = Query("property", description="'property' or 'block'"),
+    cached: bool = Query(False, description="Read the snapshot refreshed by the overdue sweeper"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Accounts-receivable aging (current, 1-30, 31-60, 61-90, 90+ days) per property or block"""
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    if not can_access_accounting(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to accounting module"
+        )
+    
+    if group_by not in ("property", "block"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="group_by must be 'property' or 'block'"
+        )
+    
+    cached_result = _cached_receivable_aging(db, condominium_id, group_by) if cached else None
+    if cached_result:
+        as_of, rows = cached_result
+    else:
+        as_of = _start_of_day()
+        rows = compute_receivable_aging(db, condominium_id, group_by=group_by, as_of=as_of)
+    
+    totals = ReceivableAgingRow(
+        **{b: sum(getattr(r, b) for r in rows) for b in AGING_BUCKETS},
+        total_pending=sum(r.total_pending for r in rows),
+        invoice_count=sum(r.invoice_count for r in rows),
+    )
+    
+    return ReceivableAgingResponse(
+        condominium_id=condominium_id,
+        group_by=group_by,
+        as_of=as_of,
+        from_cache=cached_result is not None,
+        rows=rows,
+        totals=totals,
+    )
+
+
+@router.post("/condominium/{condominium_id}/sweep-overdue", response_model=OverdueSweepResponse)
+async def sweep_overdue(
+    condominium_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mark past-due invoices as overdue and refresh the cached aging report"""
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    if not can_access_accounting(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to accounting module"
+        )
+    
+    result = sweep_overdue_invoices(db, condominium_id)
+    db.commit()
+    
+    return result
+
+
+@router.get("/property/{property_id}/statement", response_model=PropertyStatementResponse)
+async def get_property_statement(
+    property_id: int,
+    format: str = Query("json", description="'json', 'csv' or 'pdf'"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Account statement (estado de cuenta) for a property; CSV and PDF are streamed"""
+    property_obj = db.query(Property).filter(Property.id == property_id).first()
+    if not property_obj:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    
+    if not user_can_view_property_statement(db, current_user, property_obj):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this property"
+        )
+    
+    if format not in STATEMENT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="format must be 'json', 'csv' or 'pdf'"
+        )
+    
+    opening_balance = _statement_opening_balance(db, property_id, date_from)
+    entries = iter_property_statement(db, property_id, opening_balance, date_from, date_to)
+    filename = f"estado_cuenta_{property_obj.code}".replace(" ", "_")
+    
+    if format == "csv":
+        return StreamingResponse(
+            _statement_csv(entries, opening_balance),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'},
+        )
+    
+    if format == "pdf":
+        from app.core.pdf import StreamingPDFWriter
+        writer = StreamingPDFWriter(
+            title=f"Estado de cuenta - Unidad {property_obj.code}",
+            header_lines=[
+                f"Saldo inicial: {opening_balance:,.2f}",
+                "{:<10} {:<28} {:<34} {:>12} {:>12} {:>12}".format(
+                    "Fecha", "Factura", "Descripcion", "Cargo", "Abono", "Saldo"
+                ),
+            ],
+        )
+        return StreamingResponse(
+            writer.stream(_statement_pdf_lines(entries)),
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.pdf"'},
+        )
+    
+    entry_list = list(entries)
+    total_charged = sum(e.charge for e in entry_list)
+    total_paid = sum(e.payment for e in entry_list)
+    return PropertyStatementResponse(
+        property_id=property_obj.id,
+        property_code=property_obj.code,
+        condominium_id=property_obj.condominium_id,
+        date_from=date_from,
+        date_to=date_to,
+        opening_balance=opening_balance,
+        total_charged=total_charged,
+        total_paid=total_paid,
+        closing_balance=opening_balance + total_charged - total_paid,
+        entries=entry_list,
+    )
+
+
 @router.get("/{invoice_id}", response_model=AdministrationInvoiceDetailResponse)
 async def get_invoice(
     invoice_id: int,
@@ -307,6 +829,7 @@ async def delete_invoice(
 
 # Invoice Payments Endpoints
 @router.post("/{invoice_id}/payments", response_model=InvoicePaymentResponse, status_code=status.HTTP_201_CREATED)
+@idempotent
 async def create_payment(
     invoice_id: int,
     payment_data: InvoicePaymentCreate,
@@ -348,7 +871,7 @@ async def create_payment(
         )
     
     payment = InvoicePayment(
-        **payment_data.model_dump(),
+        **payment_data.model_dump(exclude={"invoice_id"}),
         invoice_id=invoice_id,
         recorded_by=current_user.id
     )
@@ -492,6 +1015,7 @@ async def delete_payment(
 
 
 @router.post("/generate-monthly", response_model=List[AdministrationInvoiceResponse], status_code=status.HTTP_201_CREATED)
+@idempotent
 async def generate_monthly_invoices(
     condominium_id: int,
     month: int,
@@ -583,28 +1107,18 @@ async def generate_monthly_invoices(
     return created_invoices
 
 
-@router.post("/generate-billing", response_model=GenerateBillingResponse)
-async def generate_billing(
+def run_generate_billing(
+    db: Session,
     condominium_id: int,
     body: GenerateBillingRequest,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
+    created_by: int,
+    progress: Optional[Callable[[float, Optional[str]], None]] = None,
+) -> GenerateBillingResponse:
     """
-    Generate administration invoices for a month/year.
-    Method: global (all units), block (units in selected block), unit (selected units).
-    Skips units that already have an invoice for that month/year.
+    Generate administration invoices for a month/year (shared by the endpoint and the
+    generate_billing background job). Access checks are the caller's responsibility.
     """
-    if not check_condominium_access(db, current_user, condominium_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied to this condominium",
-        )
-    if not can_access_accounting(current_user):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied to accounting module",
-        )
+    progress = progress or (lambda percent, message=None: None)
     if body.month < 1 or body.month > 12:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -685,15 +1199,21 @@ async def generate_billing(
 
     to_create = [p for p in target_properties if p.id not in already_invoiced]
     skipped_ids = [p.id for p in target_properties if p.id in already_invoiced]
+    progress(20.0, f"{len(to_create)} unidad(es) por facturar")
 
     issue_date = datetime(body.year, body.month, 1)
     due_date = datetime(body.year, body.month, 1) + timedelta(days=body.due_days)
     base = max(0.0, float(body.base_amount))
 
-    created_invoices = []
+    condominium = db.query(Condominium).filter(Condominium.id == condominium_id).first()
+    fees = compute_administration_fees(db, condominium, to_create, body.month, body.year, base)
+    progress(50.0, "Cuotas calculadas")
+
+    new_invoices = []
     for prop in to_create:
+        fee = fees[prop.id]
         inv_num = generate_invoice_number(condominium_id, body.month, body.year, prop.code)
-        inv = AdministrationInvoice(
+        new_invoices.append(AdministrationInvoice(
             condominium_id=condominium_id,
             property_id=prop.id,
             invoice_number=inv_num,
@@ -701,21 +1221,34 @@ async def generate_billing(
             year=body.year,
             issue_date=issue_date,
             due_date=due_date,
-            base_amount=base,
-            additional_charges=0.0,
+            base_amount=fee.base_amount,
+            additional_charges=fee.additional_charges,
             discounts=0.0,
-            total_amount=base,
+            total_amount=fee.total_amount,
             paid_amount=0.0,
-            pending_amount=base,
+            pending_amount=fee.total_amount,
             status=InvoiceStatus.PENDING,
-            created_by=current_user.id,
-        )
-        db.add(inv)
-        created_invoices.append(inv)
+            description=describe_fee(fee) or None,
+            created_by=created_by,
+        ))
 
+    db.add_all(new_invoices)
     db.commit()
-    for inv in created_invoices:
-        db.refresh(inv)
+
+    # Reload the batch with one query instead of refreshing each invoice
+    created_invoices = []
+    if new_invoices:
+        created_invoices = (
+            db.query(AdministrationInvoice)
+            .filter(
+                AdministrationInvoice.condominium_id == condominium_id,
+                AdministrationInvoice.month == body.month,
+                AdministrationInvoice.year == body.year,
+                AdministrationInvoice.is_active == True,
+                AdministrationInvoice.property_id.in_([p.id for p in to_create]),
+            )
+            .all()
+        )
 
     msg = f"Se generaron {len(created_invoices)} factura(s)."
     if skipped_ids:
@@ -726,3 +1259,204 @@ async def generate_billing(
         skipped_property_ids=skipped_ids,
         message=msg,
     )
+
+
+@router.post("/generate-billing", response_model=GenerateBillingResponse)
+@idempotent
+async def generate_billing(
+    condominium_id: int,
+    body: GenerateBillingRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Generate administration invoices for a month/year.
+    Method: global (all units), block (units in selected block), unit (selected units).
+    Skips units that already have an invoice for that month/year.
+    Amounts come from the fee engine (app.core.billing): segmented coefficients,
+    late interest on previous balances and recurring charges.
+    For large condominiums enqueue a 'generate_billing' job at /api/jobs instead.
+    """
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium",
+        )
+    if not can_access_accounting(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to accounting module",
+        )
+    return run_generate_billing(db, condominium_id, body, current_user.id)
+
+
+@register_job("generate_billing", permission=can_access_accounting, payload_schema=GenerateBillingRequest)
+def generate_billing_job(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Background version of generate-billing; payload is a GenerateBillingRequest"""
+    if not ctx.condominium_id:
+        raise JobError("condominium_id is required for generate_billing")
+    result = run_generate_billing(
+        db, ctx.condominium_id, GenerateBillingRequest(**payload), ctx.created_by, ctx.progress
+    )
+    return {
+        "created_invoice_ids": [inv.id for inv in result.created],
+        "skipped_property_ids": result.skipped_property_ids,
+        "message": result.message,
+    }
+
+
+# Fee rules for segmented administration billing
+@router.get("/condominium/{condominium_id}/fee-rules", response_model=List[AdministrationFeeRuleResponse])
+async def get_fee_rules(
+    condominium_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get active fee rules used by generate-billing"""
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    if not can_access_accounting(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to accounting module"
+        )
+    
+    rules = db.query(AdministrationFeeRule).filter(
+        AdministrationFeeRule.condominium_id == condominium_id,
+        AdministrationFeeRule.is_active == True
+    ).order_by(AdministrationFeeRule.rule_type, AdministrationFeeRule.id).all()
+    
+    return rules
+
+
+@router.post("/condominium/{condominium_id}/fee-rules", response_model=AdministrationFeeRuleResponse, status_code=status.HTTP_201_CREATED)
+@idempotent
+async def create_fee_rule(
+    condominium_id: int,
+    rule_data: AdministrationFeeRuleCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Create a fee rule (coefficient, area rate, late interest or recurring charge)"""
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    if not can_access_accounting(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to accounting module"
+        )
+    
+    try:
+        rule_type = FeeRuleType(rule_data.rule_type)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"rule_type must be one of: {', '.join(t.value for t in FeeRuleType)}"
+        )
+    
+    if rule_data.value < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="value must be zero or positive"
+        )
+    if rule_type == FeeRuleType.PROPERTY_TYPE and not rule_data.property_type:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="property_type is required for 'property_type' rules"
+        )
+    if rule_type == FeeRuleType.BLOCK and not rule_data.block_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="block_id is required for 'block' rules"
+        )
+    if rule_type == FeeRuleType.LATE_INTEREST and rule_data.value > 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="late_interest is a monthly percentage between 0 and 100"
+        )
+    
+    if rule_data.block_id:
+        block = db.query(Block).filter(
+            Block.id == rule_data.block_id,
+            Block.condominium_id == condominium_id
+        ).first()
+        if not block:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Block not found in this condominium"
+            )
+    if rule_data.property_id:
+        property_obj = db.query(Property).filter(
+            Property.id == rule_data.property_id,
+            Property.condominium_id == condominium_id
+        ).first()
+        if not property_obj:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Property not found in this condominium"
+            )
+    
+    # Coefficients and interest have a single value per scope: replace the previous rule
+    if rule_type in (FeeRuleType.PROPERTY_TYPE, FeeRuleType.BLOCK, FeeRuleType.LATE_INTEREST):
+        previous = db.query(AdministrationFeeRule).filter(
+            AdministrationFeeRule.condominium_id == condominium_id,
+            AdministrationFeeRule.rule_type == rule_type,
+            AdministrationFeeRule.is_active == True
+        )
+        if rule_type == FeeRuleType.PROPERTY_TYPE:
+            previous = previous.filter(AdministrationFeeRule.property_type == rule_data.property_type)
+        elif rule_type == FeeRuleType.BLOCK:
+            previous = previous.filter(AdministrationFeeRule.block_id == rule_data.block_id)
+        previous.update({AdministrationFeeRule.is_active: False}, synchronize_session=False)
+    
+    rule = AdministrationFeeRule(
+        **rule_data.model_dump(exclude={"rule_type"}),
+        rule_type=rule_type,
+        condominium_id=condominium_id,
+        created_by=current_user.id
+    )
+    db.add(rule)
+    db.commit()
+    db.refresh(rule)
+    
+    return rule
+
+
+@router.delete("/fee-rules/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_fee_rule(
+    rule_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delete (deactivate) a fee rule"""
+    rule = db.query(AdministrationFeeRule).filter(AdministrationFeeRule.id == rule_id).first()
+    if not rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Fee rule not found"
+        )
+    
+    if not check_condominium_access(db, current_user, rule.condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    if not can_access_accounting(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to accounting module"
+        )
+    
+    rule.is_active = False
+    db.commit()
+    
+    return None
@@ -1,14 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from typing import List
 from datetime import datetime
-from app.core.database import get_db
+from app.core.database import get_db, as_naive_utc
 from app.core.permissions import check_condominium_access, Role
+from app.core.ownership import ownership_as_of
 from app.models.assembly import Assembly, AssemblyVote, VoteRecord, AssemblyAttendance
 from app.models.condominium import Condominium
 from app.models.resident import Resident
-from app.models.property import Property, PropertyResident
+from app.models.property import Property
 from app.models.user import User
 from app.api.auth import get_current_user
 from app.schemas.assembly import (
@@ -112,27 +112,21 @@ async def get_assembly(
             detail="Access denied to this condominium"
         )
     
-    # Calculate current quorum
-    total_units = db.query(func.count(Property.id)).filter(
+    # Quorum: share of the units represented by attending owners, with the ownership held at the assembly date
+    property_ids = [property_id for property_id, in db.query(Property.id).filter(
         Property.condominium_id == assembly.condominium_id
-    ).scalar() or 0
-    
-    if total_units > 0:
-        # Count unique property owners (residents with property ownership)
-        owners_count = db.query(func.count(func.distinct(PropertyResident.resident_id))).filter(
-            PropertyResident.property_id.in_(
-                db.query(Property.id).filter(Property.condominium_id == assembly.condominium_id)
-            )
-        ).scalar() or 0
-        
-        # Count attendees
-        attendees_count = db.query(func.count(AssemblyAttendance.id)).filter(
+    ).all()]
+    
+    if property_ids:
+        attendee_ids = {resident_id for resident_id, in db.query(AssemblyAttendance.resident_id).filter(
             AssemblyAttendance.assembly_id == assembly_id,
             AssemblyAttendance.attended == True
-        ).scalar() or 0
-        
-        # Calculate quorum percentage (using attendees or owners)
-        assembly.current_quorum = (attendees_count / total_units * 100) if total_units > 0 else 0
+        ).all()}
+        as_of = as_naive_utc(assembly.started_at or assembly.scheduled_date)
+        represented = 0.0
+        for shares in ownership_as_of(db, property_ids, as_of).values():
+            represented += min(sum(percentage for resident_id, percentage in shares.items() if resident_id in attendee_ids) / 100.0, 1.0)
+        assembly.current_quorum = represented / len(property_ids) * 100
     else:
         assembly.current_quorum = 0
     
@@ -411,7 +405,7 @@ async def record_vote(
         return existing_vote
     
     # Create new vote record
-    record = VoteRecord(**vote_record.model_dump(), vote_id=vote_id)
+    record = VoteRecord(**vote_record.model_dump(exclude={"vote_id"}), vote_id=vote_id)
     db.add(record)
     db.commit()
     db.refresh(record)
@@ -15,6 +15,7 @@ from app.schemas.auth import LoginRequest, RegisterRequest, Token, RefreshTokenR
 from app.schemas.user import UserResponse, UserUpdate, UserDetailResponse, CondominiumInfo
 from datetime import timedelta
 from app.core.config import settings
+from app.core.ownership import current_link
 
 router = APIRouter()
 # Use auto_error=False to handle errors manually
@@ -318,7 +319,10 @@ async def get_current_user_info(
                         Resident.condominium_id == uc.condominium.id
                     ).all()
                     for r in residents:
-                        prs = db.query(PropertyResident).filter(PropertyResident.resident_id == r.id).all()
+                        prs = db.query(PropertyResident).filter(
+                            PropertyResident.resident_id == r.id,
+                            current_link()
+                        ).all()
                         property_ids.extend([pr.property_id for pr in prs])
                     property_ids = list(dict.fromkeys(property_ids))
                 user_condominiums.append(
@@ -0,0 +1,323 @@
+"""
+Unified calendar of space bookings, assemblies and meetings.
+
+Both the JSON listing and the iCalendar feed are rendered once per
+condominium, window and data version, and served with an ETag derived from
+that version. The version is a single aggregate query (row counts and latest
+created/updated timestamps of the three tables), so unchanged calendars are
+answered with 304 Not Modified without loading or rendering any event.
+
+Calendar apps cannot send a Bearer token, so the .ics feed is authenticated
+by a per-user feed token in its URL (GET .../feed-url hands it out): an HMAC
+of the user, the condominium and the user's password hash, keyed with a key
+derived from SECRET_KEY. Changing the password revokes the user's feed URLs,
+and condominium access is still checked on every request.
+"""
+import base64
+import hashlib
+import hmac
+from functools import lru_cache
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_db, as_naive_utc
+from app.core.permissions import check_condominium_access
+from app.models.space_request import SpaceRequest, BOOKED_STATUSES
+from app.models.assembly import Assembly
+from app.models.meeting import Meeting
+from app.models.condominium import Condominium
+from app.models.user import User, UserRole
+from app.api.auth import get_current_user
+from app.schemas.calendar import CalendarEvent, CalendarFeedUrl
+
+router = APIRouter()
+
+# Rendered calendars keyed by (condominium_id, format, date_from, date_to, version)
+calendar_cache = TTLCache("calendar_feeds", ttl=300.0, max_entries=500)
+
+ICS_MEDIA_TYPE = "text/calendar"  # Starlette appends the utf-8 charset
+
+
+def _resolve_window(date_from: Optional[datetime], date_to: Optional[datetime]) -> Tuple[datetime, datetime]:
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    date_from = as_naive_utc(date_from) or today - timedelta(days=settings.CALENDAR_DEFAULT_PAST_DAYS)
+    date_to = as_naive_utc(date_to) or today + timedelta(days=settings.CALENDAR_DEFAULT_FUTURE_DAYS)
+    if date_to <= date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must be after date_from"
+        )
+    if date_to - date_from > timedelta(days=settings.CALENDAR_MAX_WINDOW_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {settings.CALENDAR_MAX_WINDOW_DAYS} days"
+        )
+    return date_from, date_to
+
+
+def calendar_version(db: Session, condominium_id: int) -> str:
+    """Changes whenever an event of the condominium is created, updated or deleted"""
+    columns = []
+    for model in (SpaceRequest, Assembly, Meeting):
+        in_condominium = model.condominium_id == condominium_id
+        columns.append(select(func.count(model.id)).where(in_condominium).scalar_subquery())
+        columns.append(
+            select(func.max(func.coalesce(model.updated_at, model.created_at))).where(in_condominium).scalar_subquery()
+        )
+    row = db.execute(select(*columns)).one()
+    return "|".join(str(value) for value in row)
+
+
+def _etag(*parts) -> str:
+    return '"' + hashlib.sha1("|".join(str(p) for p in parts).encode("utf-8")).hexdigest() + '"'
+
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def load_calendar_events(db: Session, condominium_id: int, date_from: datetime, date_to: datetime) -> List[CalendarEvent]:
+    """Events starting in [date_from, date_to), ordered by start"""
+    default_duration = timedelta(hours=settings.CALENDAR_EVENT_DEFAULT_HOURS)
+    events = []
+    
+    # Bookings are shown as occupancy only: no resident or purpose
+    bookings = db.query(
+        SpaceRequest.id, SpaceRequest.space_name, SpaceRequest.start_time, SpaceRequest.end_time, SpaceRequest.status
+    ).filter(
+        SpaceRequest.condominium_id == condominium_id,
+        SpaceRequest.status.in_(BOOKED_STATUSES),
+        SpaceRequest.start_time >= date_from,
+        SpaceRequest.start_time < date_to,
+    ).all()
+    for b in bookings:
+        events.append(CalendarEvent(
+            uid=f"space-request-{b.id}",
+            event_type="space_request",
+            source_id=b.id,
+            title=f"Reserva: {b.space_name}",
+            start=b.start_time,
+            end=b.end_time,
+            location=b.space_name,
+            status=b.status.value,
+        ))
+    
+    assemblies = db.query(
+        Assembly.id, Assembly.title, Assembly.scheduled_date, Assembly.location, Assembly.agenda, Assembly.status
+    ).filter(
+        Assembly.condominium_id == condominium_id,
+        Assembly.is_active == True,
+        Assembly.scheduled_date >= date_from,
+        Assembly.scheduled_date < date_to,
+    ).all()
+    for a in assemblies:
+        events.append(CalendarEvent(
+            uid=f"assembly-{a.id}",
+            event_type="assembly",
+            source_id=a.id,
+            title=a.title,
+            start=a.scheduled_date,
+            end=a.scheduled_date + default_duration,
+            location=a.location,
+            description=a.agenda,
+            status=a.status,
+        ))
+    
+    meetings = db.query(
+        Meeting.id, Meeting.title, Meeting.scheduled_date, Meeting.location, Meeting.agenda, Meeting.is_completed
+    ).filter(
+        Meeting.condominium_id == condominium_id,
+        Meeting.scheduled_date >= date_from,
+        Meeting.scheduled_date < date_to,
+    ).all()
+    for m in meetings:
+        events.append(CalendarEvent(
+            uid=f"meeting-{m.id}",
+            event_type="meeting",
+            source_id=m.id,
+            title=m.title,
+            start=m.scheduled_date,
+            end=m.scheduled_date + default_duration,
+            location=m.location,
+            description=m.agenda,
+            status="completed" if m.is_completed else "scheduled",
+        ))
+    
+    events.sort(key=lambda e: (e.start.replace(tzinfo=None), e.uid))
+    return events
+
+
+def _ics_escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def _ics_fold(line: str) -> str:
+    """Fold content lines at 75 octets (RFC 5545 3.1)"""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+    parts = []
+    while len(data) > 75:
+        cut = 75 if not parts else 74
+        # Do not split a multi-byte character
+        while cut > 0 and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+    parts.append(data.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+def _ics_datetime(value: datetime) -> str:
+    return as_naive_utc(value).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_ics(calendar_name: str, events: List[CalendarEvent]) -> str:
+    stamp = _ics_datetime(datetime.utcnow())
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//AdmCondm//Calendario//ES",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_ics_escape(calendar_name)}",
+    ]
+    for event in events:
+        lines.extend([
+            "BEGIN:VEVENT",
+            f"UID:{event.uid}@admcondm",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_ics_datetime(event.start)}",
+            f"DTEND:{_ics_datetime(event.end)}",
+            f"SUMMARY:{_ics_escape(event.title)}",
+        ])
+        if event.location:
+            lines.append(f"LOCATION:{_ics_escape(event.location)}")
+        if event.description:
+            lines.append(f"DESCRIPTION:{_ics_escape(event.description)}")
+        if event.status == "cancelled":
+            lines.append("STATUS:CANCELLED")
+        lines.append(f"CATEGORIES:{event.event_type}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_ics_fold(line) for line in lines) + "\r\n"
+
+
+@lru_cache(maxsize=4)
+def _feed_signing_key(secret: str) -> bytes:
+    # Separate key: a feed token can never double as a JWT or download signature
+    return hashlib.sha256(b"calendar-feed:" + secret.encode()).digest()
+
+
+def calendar_feed_token(user: User, condominium_id: int) -> str:
+    message = f"{user.id}\n{condominium_id}\n{user.hashed_password or ''}".encode()
+    digest = hmac.new(_feed_signing_key(settings.SECRET_KEY), message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def _feed_user(db: Session, user_id: int, token: str, condominium_id: int) -> User:
+    """Active user whose feed token matches; 401 otherwise"""
+    user = (
+        db.query(User)
+        .options(joinedload(User.user_roles).joinedload(UserRole.role), joinedload(User.user_condominiums))
+        .filter(User.id == user_id)
+        .first()
+    )
+    if not user or not user.is_active or not hmac.compare_digest(token, calendar_feed_token(user, condominium_id)):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid calendar feed token"
+        )
+    return user
+
+
+def _check_access(db: Session, current_user: User, condominium_id: int):
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+
+
+@router.get("/condominium/{condominium_id}", response_model=List[CalendarEvent])
+async def get_calendar(
+    condominium_id: int,
+    request: Request,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Space bookings, assemblies and meetings of a condominium in a date window"""
+    _check_access(db, current_user, condominium_id)
+    date_from, date_to = _resolve_window(date_from, date_to)
+    
+    version = calendar_version(db, condominium_id)
+    etag = _etag("json", condominium_id, date_from, date_to, version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    body = calendar_cache.get_or_set(
+        (condominium_id, "json", date_from, date_to, version),
+        lambda: "[" + ",".join(
+            e.model_dump_json() for e in load_calendar_events(db, condominium_id, date_from, date_to)
+        ) + "]",
+    )
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/condominium/{condominium_id}/feed-url", response_model=CalendarFeedUrl)
+async def get_calendar_feed_url(
+    condominium_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Subscription URL of the .ics feed for the current user"""
+    _check_access(db, current_user, condominium_id)
+    url = request.url_for("get_calendar_feed", condominium_id=condominium_id).include_query_params(
+        user=current_user.id, token=calendar_feed_token(current_user, condominium_id)
+    )
+    return CalendarFeedUrl(url=str(url))
+
+
+@router.get("/condominium/{condominium_id}/feed.ics")
+async def get_calendar_feed(
+    condominium_id: int,
+    request: Request,
+    user: int = Query(..., description="User id of the feed URL"),
+    token: str = Query(..., description="Feed token from /feed-url"),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """iCalendar feed of the condominium for calendar apps (authenticated by the feed token, not a JWT)"""
+    _check_access(db, _feed_user(db, user, token, condominium_id), condominium_id)
+    date_from, date_to = _resolve_window(date_from, date_to)
+    
+    version = calendar_version(db, condominium_id)
+    etag = _etag("ics", condominium_id, date_from, date_to, version)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    def render() -> str:
+        condominium = db.query(Condominium.name).filter(Condominium.id == condominium_id).first()
+        name = condominium.name if condominium else f"Condominio {condominium_id}"
+        return render_ics(name, load_calendar_events(db, condominium_id, date_from, date_to))
+    
+    body = calendar_cache.get_or_set((condominium_id, "ics", date_from, date_to, version), render)
+    headers["Content-Disposition"] = f'inline; filename="calendario-{condominium_id}.ics"'
+    return Response(content=body, media_type=ICS_MEDIA_TYPE, headers=headers)
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 import os
-import shutil
 from pathlib import Path
 from app.core.database import get_db
 from app.core.permissions import check_condominium_access
-from app.core.config import settings
+from app.core.storage import get_storage
 from app.models.condominium import Condominium
 from app.models.user import User, UserCondominium
 from app.api.auth import get_current_user
@@ -14,21 +14,12 @@ from app.schemas.condominium import CondominiumCreate, CondominiumUpdate, Condom
 
 router = APIRouter()
 
-# Ensure upload directory exists
-UPLOAD_DIR = Path(settings.UPLOAD_DIR)
-UPLOAD_DIR.mkdir(exist_ok=True)
-CONDOMINIUM_UPLOAD_DIR = UPLOAD_DIR / "condominiums"
-CONDOMINIUM_UPLOAD_DIR.mkdir(exist_ok=True)
-
 
 def save_upload_file(file: UploadFile, condominium_id: int, file_type: str) -> str:
     """Save uploaded file and return URL"""
     file_ext = Path(file.filename).suffix
     filename = f"{file_type}_{condominium_id}{file_ext}"
-    file_path = CONDOMINIUM_UPLOAD_DIR / filename
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    get_storage().save(f"condominiums/{filename}", file.file, file.content_type)
     
     return f"/uploads/condominiums/{filename}"
 
@@ -83,7 +74,7 @@ async def upload_logo(
             detail="Condominium not found"
         )
     
-    logo_url = save_upload_file(file, condominium_id, "logo")
+    logo_url = await run_in_threadpool(save_upload_file, file, condominium_id, "logo")
     condominium.logo_url = logo_url
     db.commit()
     db.refresh(condominium)
@@ -112,7 +103,7 @@ async def upload_landscape_image(
             detail="Condominium not found"
         )
     
-    landscape_url = save_upload_file(file, condominium_id, "landscape")
+    landscape_url = await run_in_threadpool(save_upload_file, file, condominium_id, "landscape")
     condominium.landscape_image_url = landscape_url
     db.commit()
     db.refresh(condominium)
@@ -141,7 +132,7 @@ async def upload_logo(
             detail="Condominium not found"
         )
     
-    logo_url = save_upload_file(file, condominium_id, "logo")
+    logo_url = await run_in_threadpool(save_upload_file, file, condominium_id, "logo")
     condominium.logo_url = logo_url
     db.commit()
     db.refresh(condominium)
@@ -170,7 +161,7 @@ async def upload_landscape_image(
             detail="Condominium not found"
         )
     
-    landscape_url = save_upload_file(file, condominium_id, "landscape")
+    landscape_url = await run_in_threadpool(save_upload_file, file, condominium_id, "landscape")
     condominium.landscape_image_url = landscape_url
     db.commit()
     db.refresh(condominium)
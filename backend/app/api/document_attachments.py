@@ -1,12 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 import os
-import shutil
 from pathlib import Path
 from app.core.database import get_db
 from app.core.permissions import check_condominium_access, Role
 from app.core.config import settings
+from app.core.storage import get_storage, measure_upload, storage_key
+from app.core.text_extraction import enqueue_text_extraction
+from app.core.zip_stream import ZipEntry, safe_arcname, zip_streaming_response
 from app.models.document_attachment import DocumentAttachment, AttachmentEntityType
 from app.models.condominium import Condominium
 from app.models.resident import Resident
@@ -17,19 +20,6 @@ from app.schemas.document_attachment import DocumentAttachmentCreate, DocumentAt
 
 router = APIRouter()
 
-# Ensure upload directory exists
-UPLOAD_DIR = Path(settings.UPLOAD_DIR)
-UPLOAD_DIR.mkdir(exist_ok=True)
-ATTACHMENTS_DIR = UPLOAD_DIR / "attachments"
-ATTACHMENTS_DIR.mkdir(exist_ok=True)
-
-
-def ensure_upload_dir():
-    """Ensure upload directory exists"""
-    ATTACHMENTS_DIR.mkdir(parents=True, exist_ok=True)
-
-
-
 
 @router.post("/", response_model=DocumentAttachmentResponse, status_code=status.HTTP_201_CREATED)
 async def upload_attachment(
@@ -74,9 +64,8 @@ async def upload_attachment(
                 detail="Property not found or does not belong to this condominium"
             )
     
-    # Read file content
-    file_content = await file.read()
-    file_size = len(file_content)
+    # Measure the upload in chunks (it is streamed to storage, never held in memory)
+    file_size, _ = await run_in_threadpool(measure_upload, file.file)
     
     # Check file size
     if file_size > settings.MAX_UPLOAD_SIZE:
@@ -102,18 +91,15 @@ async def upload_attachment(
     db.commit()
     db.refresh(attachment)
     
-    # Save file with attachment ID
-    ensure_upload_dir()
+    # Save file with attachment ID (the storage key is what file_path stores)
     file_ext = Path(file.filename).suffix
-    filename = f"{entity_type.value}_{entity_id}_{attachment.id}{file_ext}"
-    file_path_obj = ATTACHMENTS_DIR / filename
-    
-    with open(file_path_obj, "wb") as buffer:
-        buffer.write(file_content)
-    
-    file_path = str(file_path_obj.relative_to(settings.UPLOAD_DIR)).replace("\\", "/")
+    file_path = f"attachments/{entity_type.value}_{entity_id}_{attachment.id}{file_ext}"
+    await run_in_threadpool(get_storage().save, file_path, file.file, file.content_type)
     attachment.file_path = file_path
     db.commit()
+    
+    # Text extraction runs in the job pool; the upload only queues it
+    enqueue_text_extraction(db, attachment, current_user.id)
     db.refresh(attachment)
     
     return attachment
@@ -146,6 +132,43 @@ async def get_attachments(
     return attachments
 
 
+@router.get("/{entity_type}/{entity_id}/bundle")
+async def download_attachments_bundle(
+    entity_type: AttachmentEntityType,
+    entity_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Download every attachment of a resident or property as a ZIP streamed on the fly"""
+    attachments = db.query(DocumentAttachment).filter(
+        DocumentAttachment.entity_type == entity_type,
+        DocumentAttachment.entity_id == entity_id
+    ).order_by(DocumentAttachment.id).all()
+    
+    if not attachments:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No attachments found"
+        )
+    
+    if not check_condominium_access(db, current_user, attachments[0].condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    entries = [
+        ZipEntry(
+            arcname=safe_arcname(f"{a.title}{os.path.splitext(a.file_name or '')[1]}"),
+            key=storage_key(a.file_path),
+            modified=a.created_at,
+            size=a.file_size,
+        )
+        for a in attachments
+    ]
+    return zip_streaming_response(entries, f"adjuntos_{entity_type.value}_{entity_id}.zip")
+
+
 @router.delete("/{attachment_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_attachment(
     attachment_id: int,
@@ -175,10 +198,9 @@ async def delete_attachment(
         )
     
     # Delete file if exists
-    file_path = Path(settings.UPLOAD_DIR) / attachment.file_path
-    if file_path.exists():
+    if storage_key(attachment.file_path):
         try:
-            file_path.unlink()
+            await run_in_threadpool(get_storage().delete, storage_key(attachment.file_path))
         except Exception:
             pass  # Continue even if file deletion fails
     
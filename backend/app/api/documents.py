@@ -1,22 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple
+from datetime import date, datetime, time, timedelta
 import os
 from app.core.database import get_db
-from app.core.permissions import check_condominium_access, Role
+from app.core.permissions import check_condominium_access, Role, can_manage_documents
 from app.core.config import settings
+from app.core.jobs import register_job, JobContext, JobError
+from app.core.search import reindex_entities, search
+from app.core.storage import get_storage, measure_upload, storage_key
+from app.core.text_extraction import TextStatus, enqueue_text_extraction, extract_into
+from app.core.zip_stream import ZipEntry, safe_arcname, zip_streaming_response
 from app.models.document import Document
+from app.models.document_attachment import DocumentAttachment, AttachmentEntityType
+from app.models.property import Property
+from app.models.resident import Resident
 from app.models.condominium import Condominium
 from app.models.user import User
 from app.api.auth import get_current_user
-from app.schemas.document import DocumentCreate, DocumentUpdate, DocumentResponse
+from app.schemas.document import DocumentCreate, DocumentUpdate, DocumentResponse, DocumentTextJobPayload
+from app.schemas.job import JobResponse
+from app.schemas.search import SearchPage
 
 router = APIRouter()
 
 
-def ensure_upload_dir():
-    """Ensure upload directory exists"""
-    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+def store_document_file(condominium_id: int, file: UploadFile, content_hash: str) -> str:
+    """
+    Content-addressed storage (key documents/{condominium}/{sha256}{ext}): a file identical
+    to one already stored, e.g. a version re-uploaded unchanged, is written once and shared.
+    Returns the file_path, kept as UPLOAD_DIR/{key} like earlier rows so that deduplication
+    compares like with like whatever the storage backend.
+    """
+    key = f"documents/{condominium_id}/{content_hash}{os.path.splitext(file.filename or '')[1].lower()}"
+    storage = get_storage()
+    if not storage.exists(key):
+        storage.save(key, file.file, file.content_type)
+    return os.path.join(settings.UPLOAD_DIR, key)
+
+
+def remove_unreferenced_files(db: Session, file_paths: List[str]):
+    """Delete stored files no document row points to anymore (shared by deduplicated versions)"""
+    for file_path in set(file_paths):
+        still_used = db.query(Document.id).filter(Document.file_path == file_path).first()
+        if not still_used and storage_key(file_path):
+            get_storage().delete(storage_key(file_path))
+
+
+def queue_text_extraction(db: Session, document: Document, user_id: int):
+    """Reuse the text of a stored copy of the same file, otherwise extract it in the job pool"""
+    if document.content_hash:
+        source = db.query(Document).filter(
+            Document.condominium_id == document.condominium_id,
+            Document.content_hash == document.content_hash,
+            Document.id != document.id,
+            Document.text_status.in_([TextStatus.EXTRACTED, TextStatus.EMPTY]),
+        ).first()
+        if source:
+            document.text_content = source.text_content
+            document.text_status = source.text_status
+            db.commit()
+            return
+    enqueue_text_extraction(db, document, user_id)
+
+
+def measure_document_upload(file: UploadFile) -> Tuple[int, str]:
+    """(size, sha256) of the upload, read in chunks instead of into memory"""
+    file_size, content_hash = measure_upload(file.file)
+    if file_size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE} bytes"
+        )
+    return file_size, content_hash
 
 
 @router.post("/", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
@@ -44,22 +102,10 @@ async def upload_document(
             detail="Only administrators can upload documents"
         )
     
-    # Check file size
-    file_content = await file.read()
-    if len(file_content) > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE} bytes"
-        )
-    
-    # Save file
-    ensure_upload_dir()
-    file_path = os.path.join(settings.UPLOAD_DIR, f"{condominium_id}_{file.filename}")
+    file_size, content_hash = await run_in_threadpool(measure_document_upload, file)
+    file_path = await run_in_threadpool(store_document_file, condominium_id, file, content_hash)
     
-    with open(file_path, "wb") as buffer:
-        buffer.write(file_content)
-    
-    # Create document record
+    # Create document record (version 1, head of its own chain)
     document = Document(
         condominium_id=condominium_id,
         title=title,
@@ -67,26 +113,333 @@ async def upload_document(
         category=category,
         file_path=file_path,
         file_name=file.filename,
-        file_size=len(file_content),
+        file_size=file_size,
         mime_type=file.content_type,
+        content_hash=content_hash,
+        version=1,
+        is_latest=True,
         uploaded_by=current_user.id
     )
     
     db.add(document)
+    db.flush()
+    document.root_document_id = document.id
     db.commit()
+    
+    # Text extraction runs in the job pool; the upload only queues it
+    queue_text_extraction(db, document, current_user.id)
     db.refresh(document)
     
     return document
 
 
+@router.post("/{document_id}/versions", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
+async def upload_document_version(
+    document_id: int,
+    title: Optional[str] = None,
+    description: Optional[str] = None,
+    category: Optional[str] = None,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Upload a new version of a document (document_id may be any version of it).
+    Metadata not given is copied from the current version, which stops being the latest.
+    """
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if not check_condominium_access(db, current_user, document.condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    if not can_manage_documents(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can upload documents"
+        )
+    
+    head = document if document.is_latest else db.query(Document).filter(
+        Document.root_document_id == document.root_document_id,
+        Document.is_latest == True
+    ).first()
+    if not head:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Document has no current version"
+        )
+    
+    file_size, content_hash = await run_in_threadpool(measure_document_upload, file)
+    file_path = await run_in_threadpool(store_document_file, head.condominium_id, file, content_hash)
+    
+    # Conditional flip: of two concurrent uploads on the same head only one wins
+    conflict = HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Another version was uploaded at the same time; reload and retry"
+    )
+    flipped = db.query(Document).filter(
+        Document.id == head.id,
+        Document.is_latest == True
+    ).update({Document.is_latest: False}, synchronize_session=False)
+    if flipped != 1:
+        db.rollback()
+        await run_in_threadpool(remove_unreferenced_files, db, [file_path])
+        raise conflict
+    
+    new_version = Document(
+        condominium_id=head.condominium_id,
+        title=title or head.title,
+        description=description if description is not None else head.description,
+        category=category if category is not None else head.category,
+        file_path=file_path,
+        file_name=file.filename,
+        file_size=file_size,
+        mime_type=file.content_type,
+        content_hash=content_hash,
+        version=(head.version or 1) + 1,
+        previous_version_id=head.id,
+        root_document_id=head.root_document_id or head.id,
+        is_latest=True,
+        uploaded_by=current_user.id
+    )
+    db.add(new_version)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        await run_in_threadpool(remove_unreferenced_files, db, [file_path])
+        raise conflict
+    reindex_entities(db, Document, [head.id])  # The bulk flip bypassed the ORM; drop the old head from search
+    db.commit()
+    
+    queue_text_extraction(db, new_version, current_user.id)
+    db.refresh(new_version)
+    
+    return new_version
+
+
+@router.get("/{document_id}/versions", response_model=List[DocumentResponse])
+async def get_document_versions(
+    document_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Every version of the document, newest first (document_id may be any version)"""
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if not check_condominium_access(db, current_user, document.condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    return db.query(Document).filter(
+        Document.root_document_id == document.root_document_id
+    ).order_by(Document.version.desc()).all()
+
+
+@register_job("extract_document_text", permission=can_manage_documents, payload_schema=DocumentTextJobPayload)
+def extract_document_text_job(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Extract and index the text of an uploaded document or attachment"""
+    model = DocumentAttachment if payload["kind"] == "attachment" else Document
+    record = db.query(model).filter(model.id == payload["record_id"]).first()
+    if not record:
+        raise JobError(f"{payload['kind'].capitalize()} {payload['record_id']} not found")
+    if record.condominium_id != ctx.condominium_id:
+        raise JobError("The file does not belong to the job's condominium")
+    
+    text_status = extract_into(record)
+    db.commit()  # The search index is refreshed in the same flush
+    return {
+        "kind": payload["kind"],
+        "record_id": record.id,
+        "text_status": text_status,
+        "characters": len(record.text_content or ""),
+    }
+
+
+@router.get("/condominium/{condominium_id}/search", response_model=SearchPage)
+async def search_documents(
+    condominium_id: int,
+    q: str = Query(..., min_length=1, max_length=200),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search inside documents and attachments (title, description and extracted text) with matched snippets"""
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    return search(
+        db, condominium_id, q, entity_types=["document", "attachment"], skip=skip, limit=limit, snippets=True
+    )
+
+
+@router.post("/{document_id}/extract-text", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def reextract_document_text(
+    document_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Queue the text extraction again (e.g. after installing pypdf for PDFs marked unsupported)"""
+    document = db.query(Document).filter(Document.id == document_id).first()
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    if not check_condominium_access(db, current_user, document.condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    if not can_manage_documents(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can reprocess documents"
+        )
+    
+    job = enqueue_text_extraction(db, document, current_user.id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Document text extraction is disabled"
+        )
+    return job
+
+
+def filter_created_between(query, model, date_from: Optional[date], date_to: Optional[date]):
+    """Rows created within [date_from, date_to] (whole days, both optional)"""
+    if date_from:
+        query = query.filter(model.created_at >= datetime.combine(date_from, time.min))
+    if date_to:
+        query = query.filter(model.created_at < datetime.combine(date_to + timedelta(days=1), time.min))
+    return query
+
+
+def check_bundle_size(count: int):
+    if count > settings.DOCUMENT_BUNDLE_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"The selection has {count} files; narrow the filters (maximum {settings.DOCUMENT_BUNDLE_MAX_FILES})"
+        )
+
+
+def attachment_folders(db: Session, attachments: List[DocumentAttachment]) -> dict:
+    """Readable folder per attachment owner: unidad_101, residente_Ana Gomez (two IN queries)"""
+    property_ids = {a.entity_id for a in attachments if a.entity_type == AttachmentEntityType.PROPERTY}
+    resident_ids = {a.entity_id for a in attachments if a.entity_type == AttachmentEntityType.RESIDENT}
+    folders = {}
+    if property_ids:
+        for property_id, code in db.query(Property.id, Property.code).filter(Property.id.in_(property_ids)):
+            folders[(AttachmentEntityType.PROPERTY, property_id)] = f"unidad_{code}"
+    if resident_ids:
+        for resident_id, full_name in db.query(Resident.id, Resident.full_name).filter(Resident.id.in_(resident_ids)):
+            folders[(AttachmentEntityType.RESIDENT, resident_id)] = f"residente_{full_name}"
+    return folders
+
+
+def attachment_entry(attachment: DocumentAttachment, *folders: str) -> ZipEntry:
+    extension = os.path.splitext(attachment.file_name or "")[1]
+    return ZipEntry(
+        arcname=safe_arcname(*folders, f"{attachment.title}{extension}"),
+        key=storage_key(attachment.file_path),
+        modified=attachment.created_at,
+        size=attachment.file_size,
+    )
+
+
+@router.get("/condominium/{condominium_id}/bundle")
+async def download_documents_bundle(
+    condominium_id: int,
+    category: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    include_versions: bool = False,
+    include_attachments: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    ZIP of the condominium's documents (current versions unless include_versions), filtered
+    by category and upload date, optionally with every unit/resident attachment. The archive
+    is streamed while it is built: nothing is buffered in memory or written to disk.
+    """
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    if not can_manage_documents(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can download document bundles"
+        )
+    
+    query = db.query(Document).filter(Document.condominium_id == condominium_id)
+    if not include_versions:
+        query = query.filter(Document.is_latest == True)
+    if category:
+        query = query.filter(Document.category == category)
+    documents = filter_created_between(query, Document, date_from, date_to).order_by(
+        Document.category, Document.title, Document.version
+    ).all()
+    
+    attachments = []
+    if include_attachments:
+        attachments = filter_created_between(
+            db.query(DocumentAttachment).filter(DocumentAttachment.condominium_id == condominium_id),
+            DocumentAttachment, date_from, date_to
+        ).order_by(DocumentAttachment.entity_type, DocumentAttachment.entity_id, DocumentAttachment.id).all()
+    check_bundle_size(len(documents) + len(attachments))
+    
+    entries = []
+    for document in documents:
+        stem, extension = document.title, os.path.splitext(document.file_name or "")[1]
+        if include_versions:
+            stem = f"{stem} (v{document.version})"
+        entries.append(ZipEntry(
+            arcname=safe_arcname("documentos", document.category or "sin_categoria", f"{stem}{extension}"),
+            key=storage_key(document.file_path),
+            modified=document.created_at,
+            size=document.file_size,
+        ))
+    folders = attachment_folders(db, attachments)
+    for attachment in attachments:
+        folder = folders.get((attachment.entity_type, attachment.entity_id), f"{attachment.entity_type.value}_{attachment.entity_id}")
+        entries.append(attachment_entry(attachment, "adjuntos", folder))
+    
+    return zip_streaming_response(entries, f"documentos_{condominium_id}_{date.today().isoformat()}.zip")
+
+
 @router.get("/condominium/{condominium_id}", response_model=List[DocumentResponse])
 async def get_documents(
     condominium_id: int,
     category: str = None,
+    include_versions: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all documents for a condominium"""
+    """Get the documents of a condominium (current versions only unless include_versions)"""
     if not check_condominium_access(db, current_user, condominium_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -94,6 +447,8 @@ async def get_documents(
         )
     
     query = db.query(Document).filter(Document.condominium_id == condominium_id)
+    if not include_versions:
+        query = query.filter(Document.is_latest == True)  # ix_documents_condo_latest
     if category:
         query = query.filter(Document.category == category)
     
@@ -166,10 +521,14 @@ async def update_document(
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_document(
     document_id: int,
+    all_versions: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Delete a document"""
+    """
+    Delete a document version; the previous one becomes current if this was the latest.
+    all_versions deletes the whole document. Stored files shared with other versions are kept.
+    """
     document = db.query(Document).filter(Document.id == document_id).first()
     if not document:
         raise HTTPException(
@@ -191,12 +550,33 @@ async def delete_document(
             detail="Only administrators can delete documents"
         )
     
-    # Delete file
-    if os.path.exists(document.file_path):
-        os.remove(document.file_path)
+    versions = db.query(Document).filter(
+        Document.root_document_id == document.root_document_id
+    ).order_by(Document.version).all() if document.root_document_id else [document]
+    deleted = versions if all_versions else [document]
+    deleted_ids = {d.id for d in deleted}
+    remaining = [v for v in versions if v.id not in deleted_ids]
     
-    db.delete(document)
+    # Relink the chain around the deleted versions before deleting them (self-referencing FKs)
+    document.is_latest = False
+    previous_id = None
+    for version in versions:
+        if version.id in deleted_ids:
+            continue
+        version.previous_version_id = previous_id
+        version.root_document_id = remaining[0].id
+        previous_id = version.id
+    db.flush()
+    
+    file_paths = [d.file_path for d in deleted]
+    for version in deleted:
+        db.delete(version)
+    db.flush()
+    if remaining and not any(v.is_latest for v in remaining):
+        remaining[-1].is_latest = True
     db.commit()
     
+    await run_in_threadpool(remove_unreferenced_files, db, file_paths)
+    
     return None
 
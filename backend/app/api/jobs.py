@@ -0,0 +1,113 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Header, Response
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.core.database import get_db
+from app.core.permissions import check_condominium_access, is_super_admin
+from app.core.jobs import JOB_HANDLERS, JobError, enqueue_job, load_job_handlers, validate_job_payload
+from app.models.job import BackgroundJob, JobStatus
+from app.models.user import User
+from app.api.auth import get_current_user
+from app.schemas.job import JobCreate, JobResponse
+
+router = APIRouter()
+
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    job_data: JobCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Enqueue a background job; repeating an Idempotency-Key returns the original job"""
+    load_job_handlers()
+    definition = JOB_HANDLERS.get(job_data.job_type)
+    if not definition:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown job type. Available: {', '.join(sorted(JOB_HANDLERS))}"
+        )
+    
+    if job_data.condominium_id is None and not definition["global_scope"]:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="condominium_id is required for this job type"
+        )
+    if job_data.condominium_id is not None and not check_condominium_access(db, current_user, job_data.condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    permission = definition["permission"]
+    if permission and not permission(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions for this job"
+        )
+    
+    try:
+        payload = validate_job_payload(job_data.job_type, job_data.payload)
+    except JobError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    
+    job, created = enqueue_job(
+        db,
+        job_data.job_type,
+        payload,
+        created_by=current_user.id,
+        condominium_id=job_data.condominium_id,
+        idempotency_key=idempotency_key,
+    )
+    if not created:
+        response.status_code = status.HTTP_200_OK
+    
+    return job
+
+
+@router.get("/", response_model=List[JobResponse])
+async def get_jobs(
+    status_filter: Optional[str] = None,
+    limit: int = 50,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List the current user's most recent jobs"""
+    query = db.query(BackgroundJob).filter(BackgroundJob.created_by == current_user.id)
+    if status_filter:
+        try:
+            query = query.filter(BackgroundJob.status == JobStatus(status_filter))
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"status_filter must be one of: {', '.join(s.value for s in JobStatus)}"
+            )
+    
+    return query.order_by(BackgroundJob.id.desc()).limit(min(max(limit, 1), 200)).all()
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Poll a job's status, progress and result"""
+    job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    
+    if job.created_by != current_user.id and not is_super_admin(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this job"
+        )
+    
+    return job
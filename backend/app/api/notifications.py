@@ -1,15 +1,261 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from sqlalchemy import and_, or_, not_, insert, select, literal, func
+from sqlalchemy.dialects import postgresql, sqlite
+from typing import List, Optional
+from datetime import datetime, timedelta
 from app.core.database import get_db
-from app.core.permissions import check_condominium_access, Role
-from app.models.notification import Notification
+from app.core.config import settings
+from app.core.permissions import check_condominium_access, can_send_notifications, can_access_accounting, Role
+from app.core.cache import TTLCache
+from app.core.jobs import register_job, enqueue_job, JobContext, JobError
+from app.core.notification_delivery import deliver_notification, deliver_notifications
+from app.core.ownership import current_link
+from app.models.notification import (
+    Notification,
+    NotificationReceipt,
+    NotificationDelivery,
+    DeliveryStatus,
+    WebPushSubscription,
+)
 from app.models.user import User
+from app.models.administration_invoice import AdministrationInvoice, InvoiceStatus
+from app.models.property import PropertyResident
+from app.models.resident import Resident
 from app.api.auth import get_current_user
-from app.schemas.notification import NotificationCreate, NotificationUpdate, NotificationResponse
+from app.schemas.notification import (
+    NotificationCreate,
+    NotificationUpdate,
+    NotificationResponse,
+    NotificationUnreadCountResponse,
+    NotificationDeliveryJobPayload,
+    NotificationDeliverySummary,
+    WebPushSubscriptionCreate,
+    WebPushSubscriptionResponse,
+    PaymentReminderRunResponse,
+)
+from app.schemas.job import JobResponse
 
 router = APIRouter()
 
+# Unread badge counts keyed by (condominium_id, user_id)
+unread_count_cache = TTLCache("notification_unread_counts", ttl=30.0)
+
+
+def visible_to_user(user_id: int):
+    """Notifications addressed to the user or broadcast to the condominium"""
+    return or_(Notification.user_id == user_id, Notification.user_id.is_(None))
+
+
+def unread_by_user(user_id: int):
+    """No receipt for the user (legacy is_read still counts for targeted notifications)"""
+    return and_(
+        NotificationReceipt.id.is_(None),
+        not_(and_(Notification.user_id == user_id, Notification.is_read == True)),
+    )
+
+
+def _with_receipts(db: Session, user_id: int):
+    return db.query(Notification, NotificationReceipt.read_at).outerjoin(
+        NotificationReceipt,
+        and_(
+            NotificationReceipt.notification_id == Notification.id,
+            NotificationReceipt.user_id == user_id,
+        ),
+    )
+
+
+def _to_response(notification: Notification, read_at, user_id: int) -> NotificationResponse:
+    response = NotificationResponse.model_validate(notification)
+    response.is_read = read_at is not None or (notification.user_id == user_id and bool(notification.is_read))
+    return response
+
+
+def count_unread(db: Session, condominium_id: int, user_id: int) -> int:
+    return _with_receipts(db, user_id).filter(
+        Notification.condominium_id == condominium_id,
+        visible_to_user(user_id),
+        unread_by_user(user_id),
+    ).count()
+
+
+def invalidate_unread_counts(condominium_id: int, user_id: Optional[int] = None):
+    """Drop cached badges for one recipient, or for the whole condominium on broadcasts"""
+    if user_id is not None:
+        unread_count_cache.delete((condominium_id, user_id))
+    else:
+        unread_count_cache.delete_where(lambda key: key[0] == condominium_id)
+
+
+def receipt_insert(db: Session):
+    """
+    INSERT into notification_receipts that skips receipts already present (ON CONFLICT DO
+    NOTHING), so concurrent mark-read calls (double tap, two tabs) cannot fail on
+    uq_notification_receipts_user_notification
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        stmt = postgresql.insert(NotificationReceipt)
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(NotificationReceipt)
+    else:
+        return insert(NotificationReceipt)
+    return stmt.on_conflict_do_nothing(index_elements=["user_id", "notification_id"])
+
+
+def mark_read_for_user(db: Session, notification: Notification, user_id: int):
+    """Insert the user's receipt if missing (caller commits)"""
+    db.execute(receipt_insert(db).values(notification_id=notification.id, user_id=user_id))
+    if notification.user_id == user_id:
+        notification.is_read = True
+
+
+def enqueue_delivery(db: Session, notification: Notification, user_id: int):
+    """Fan out the notification to its recipients in the background"""
+    if not settings.NOTIFICATION_CHANNELS:
+        return None
+    job, _ = enqueue_job(
+        db,
+        "deliver_notification",
+        {"notification_id": notification.id},
+        created_by=user_id,
+        condominium_id=notification.condominium_id,
+    )
+    return job
+
+
+@register_job("deliver_notification", permission=can_send_notifications, payload_schema=NotificationDeliveryJobPayload)
+def deliver_notification_job(db: Session, payload: dict, ctx: JobContext) -> dict:
+    """Expand notifications of the job's condominium into per-recipient deliveries and send them"""
+    if ctx.condominium_id is None:
+        raise JobError("deliver_notification jobs require a condominium_id")
+    if payload.get("notification_ids"):
+        return deliver_notifications(db, payload["notification_ids"], ctx.condominium_id, ctx.progress)
+    return deliver_notification(db, payload["notification_id"], ctx.condominium_id, ctx.progress)
+
+
+PAYMENT_REMINDER_TYPE = "payment_reminder"
+REMINDER_INVOICE_STATUSES = [InvoiceStatus.PENDING, InvoiceStatus.PARTIAL, InvoiceStatus.OVERDUE]
+
+
+def _reminder_message(invoice_count: int, pending_total: float, oldest_due) -> str:
+    oldest = oldest_due.strftime("%Y-%m-%d") if hasattr(oldest_due, "strftime") else str(oldest_due)[:10]
+    return (
+        f"Tiene {invoice_count} factura(s) de administración vencida(s) por un total de "
+        f"${pending_total:,.2f}. La más antigua venció el {oldest}. "
+        f"Por favor póngase al día con sus pagos."
+    )
+
+
+def generate_payment_reminders(
+    db: Session,
+    condominium_id: Optional[int] = None,
+    dispatch: bool = True,
+) -> PaymentReminderRunResponse:
+    """
+    Create one payment_reminder notification per resident user with past-due
+    balances. Invoices are matched to users through current PropertyResident
+    links and aggregated in a single query; users reminded within
+    PAYMENT_REMINDER_DEDUP_DAYS are skipped. Covers every condominium when
+    condominium_id is None. Commits and enqueues one delivery job per
+    condominium.
+    """
+    now = datetime.utcnow()
+    cutoff = datetime(now.year, now.month, now.day) - timedelta(days=settings.PAYMENT_REMINDER_GRACE_DAYS)
+    dedup_since = now - timedelta(days=settings.PAYMENT_REMINDER_DEDUP_DAYS)
+    
+    # One row per (invoice, user): a user linked twice to a unit must not double its balance
+    debts = (
+        select(
+            AdministrationInvoice.id.label("invoice_id"),
+            AdministrationInvoice.condominium_id,
+            AdministrationInvoice.pending_amount,
+            AdministrationInvoice.due_date,
+            AdministrationInvoice.created_by,
+            Resident.user_id,
+        )
+        .join(PropertyResident, PropertyResident.property_id == AdministrationInvoice.property_id)
+        .join(Resident, Resident.id == PropertyResident.resident_id)
+        .join(User, User.id == Resident.user_id)
+        .where(
+            AdministrationInvoice.is_active == True,
+            AdministrationInvoice.status.in_(REMINDER_INVOICE_STATUSES),
+            AdministrationInvoice.pending_amount > 0,
+            AdministrationInvoice.due_date < cutoff,
+            current_link(),
+            User.is_active == True,
+        )
+        .distinct()
+    )
+    if condominium_id is not None:
+        debts = debts.where(AdministrationInvoice.condominium_id == condominium_id)
+    debts = debts.subquery()
+    
+    recently_reminded = (
+        select(Notification.id)
+        .where(
+            Notification.condominium_id == debts.c.condominium_id,
+            Notification.user_id == debts.c.user_id,
+            Notification.notification_type == PAYMENT_REMINDER_TYPE,
+            Notification.created_at >= dedup_since,
+        )
+        .exists()
+    )
+    rows = db.execute(
+        select(
+            debts.c.condominium_id,
+            debts.c.user_id,
+            func.count(debts.c.invoice_id).label("invoice_count"),
+            func.sum(debts.c.pending_amount).label("pending_total"),
+            func.min(debts.c.due_date).label("oldest_due"),
+            func.max(debts.c.created_by).label("created_by"),
+            recently_reminded.label("recent"),
+        )
+        .group_by(debts.c.condominium_id, debts.c.user_id)
+        .order_by(debts.c.condominium_id, debts.c.user_id)
+    ).all()
+    
+    result = PaymentReminderRunResponse()
+    notifications = []
+    for row in rows:
+        if row.recent:
+            result.skipped_recent += 1
+            continue
+        notifications.append(Notification(
+            condominium_id=row.condominium_id,
+            user_id=row.user_id,
+            title="Recordatorio de pago",
+            message=_reminder_message(row.invoice_count, row.pending_total or 0.0, row.oldest_due),
+            notification_type=PAYMENT_REMINDER_TYPE,
+            created_by=row.created_by,
+        ))
+        result.invoices_covered += row.invoice_count
+    
+    if notifications:
+        db.add_all(notifications)
+        db.flush()
+        # Read ids before the commit expires the objects (no SELECT per notification afterwards)
+        created = [(n.id, n.condominium_id, n.user_id, n.created_by) for n in notifications]
+        db.commit()
+        by_condominium = {}
+        for notification_id, notification_condominium_id, user_id, created_by in created:
+            invalidate_unread_counts(notification_condominium_id, user_id)
+            by_condominium.setdefault(notification_condominium_id, (created_by, []))[1].append(notification_id)
+        if settings.NOTIFICATION_CHANNELS:
+            # One delivery job per condominium instead of one per reminder
+            for notification_condominium_id, (created_by, notification_ids) in by_condominium.items():
+                enqueue_job(
+                    db,
+                    "deliver_notification",
+                    {"notification_ids": notification_ids},
+                    created_by=created_by,
+                    condominium_id=notification_condominium_id,
+                    dispatch=dispatch,
+                )
+                result.delivery_jobs += 1
+    result.reminders_created = len(notifications)
+    return result
+
 
 @router.post("/", response_model=NotificationResponse, status_code=status.HTTP_201_CREATED)
 async def create_notification(
@@ -39,6 +285,8 @@ async def create_notification(
     db.add(notification)
     db.commit()
     db.refresh(notification)
+    invalidate_unread_counts(notification.condominium_id, notification.user_id)
+    enqueue_delivery(db, notification, current_user.id)
     
     return notification
 
@@ -46,10 +294,14 @@ async def create_notification(
 @router.get("/condominium/{condominium_id}", response_model=List[NotificationResponse])
 async def get_notifications(
     condominium_id: int,
+    since_id: Optional[int] = Query(None, description="Only notifications newer than this id"),
+    before_id: Optional[int] = Query(None, description="Only notifications older than this id (next page)"),
+    unread_only: bool = False,
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all notifications for a condominium"""
+    """Get notifications for a condominium, newest first, with per-user read state"""
     if not check_condominium_access(db, current_user, condominium_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -57,13 +309,230 @@ async def get_notifications(
         )
     
     # Get notifications for user (broadcast or specific)
-    notifications = db.query(Notification).filter(
-        Notification.condominium_id == condominium_id
+    query = _with_receipts(db, current_user.id).filter(
+        Notification.condominium_id == condominium_id,
+        visible_to_user(current_user.id),
+    )
+    if since_id is not None:
+        query = query.filter(Notification.id > since_id)
+    if before_id is not None:
+        query = query.filter(Notification.id < before_id)
+    if unread_only:
+        query = query.filter(unread_by_user(current_user.id))
+    
+    rows = query.order_by(Notification.id.desc()).limit(limit).all()
+    return [_to_response(n, read_at, current_user.id) for n, read_at in rows]
+
+
+@router.get("/condominium/{condominium_id}/unread-count", response_model=NotificationUnreadCountResponse)
+async def get_unread_count(
+    condominium_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Unread notifications badge for the current user (cached)"""
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    unread = unread_count_cache.get_or_set(
+        (condominium_id, current_user.id),
+        lambda: count_unread(db, condominium_id, current_user.id),
+    )
+    return NotificationUnreadCountResponse(condominium_id=condominium_id, unread=unread)
+
+
+@router.put("/condominium/{condominium_id}/read-all", response_model=NotificationUnreadCountResponse)
+async def mark_all_notifications_read(
+    condominium_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Mark every visible notification of the condominium as read for the current user"""
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    unread_ids = (
+        select(Notification.id, literal(current_user.id))
+        .outerjoin(
+            NotificationReceipt,
+            and_(
+                NotificationReceipt.notification_id == Notification.id,
+                NotificationReceipt.user_id == current_user.id,
+            ),
+        )
+        .where(
+            Notification.condominium_id == condominium_id,
+            visible_to_user(current_user.id),
+            NotificationReceipt.id.is_(None),
+        )
+    )
+    db.execute(receipt_insert(db).from_select(["notification_id", "user_id"], unread_ids))
+    db.query(Notification).filter(
+        Notification.condominium_id == condominium_id,
+        Notification.user_id == current_user.id,
+        Notification.is_read == False
+    ).update({Notification.is_read: True}, synchronize_session=False)
+    db.commit()
+    
+    invalidate_unread_counts(condominium_id, current_user.id)
+    unread_count_cache.set((condominium_id, current_user.id), 0)
+    return NotificationUnreadCountResponse(condominium_id=condominium_id, unread=0)
+
+
+@router.post("/condominium/{condominium_id}/payment-reminders", response_model=PaymentReminderRunResponse)
+async def send_payment_reminders(
+    condominium_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Generate payment reminders for residents with overdue invoices (same run as the daily script)"""
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    if not can_access_accounting(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators and accountants can send payment reminders"
+        )
+    
+    return generate_payment_reminders(db, condominium_id)
+
+
+@router.post("/push-subscriptions", response_model=WebPushSubscriptionResponse, status_code=status.HTTP_201_CREATED)
+async def create_push_subscription(
+    subscription_data: WebPushSubscriptionCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Register (or move to the current user) a browser push subscription"""
+    subscription = db.query(WebPushSubscription).filter(
+        WebPushSubscription.endpoint == subscription_data.endpoint
+    ).first()
+    if subscription:
+        subscription.user_id = current_user.id
+        subscription.p256dh = subscription_data.p256dh
+        subscription.auth = subscription_data.auth
+    else:
+        subscription = WebPushSubscription(**subscription_data.model_dump(), user_id=current_user.id)
+        db.add(subscription)
+    db.commit()
+    db.refresh(subscription)
+    
+    return subscription
+
+
+@router.delete("/push-subscriptions/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_push_subscription(
+    subscription_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Remove one of the current user's push subscriptions"""
+    subscription = db.query(WebPushSubscription).filter(
+        WebPushSubscription.id == subscription_id,
+        WebPushSubscription.user_id == current_user.id
+    ).first()
+    if not subscription:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Push subscription not found"
+        )
+    
+    db.delete(subscription)
+    db.commit()
+    
+    return None
+
+
+@router.get("/{notification_id}/deliveries", response_model=NotificationDeliverySummary)
+async def get_notification_deliveries(
+    notification_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Delivery status counts per channel for a notification"""
+    notification = db.query(Notification).filter(Notification.id == notification_id).first()
+    if not notification:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
+        )
+    
+    if not check_condominium_access(db, current_user, notification.condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    if not can_send_notifications(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can view delivery status"
+        )
+    
+    rows = db.query(
+        NotificationDelivery.channel, NotificationDelivery.status, func.count(NotificationDelivery.id)
     ).filter(
-        (Notification.user_id == current_user.id) | (Notification.user_id.is_(None))
-    ).all()
+        NotificationDelivery.notification_id == notification_id
+    ).group_by(NotificationDelivery.channel, NotificationDelivery.status).all()
+    
+    summary = NotificationDeliverySummary(notification_id=notification_id)
+    for channel, delivery_status, count in rows:
+        summary.total += count
+        summary.by_status[delivery_status.value] = summary.by_status.get(delivery_status.value, 0) + count
+        summary.by_channel.setdefault(channel, {})[delivery_status.value] = count
     
-    return notifications
+    return summary
+
+
+@router.post("/{notification_id}/deliveries/retry", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def retry_notification_deliveries(
+    notification_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Re-queue failed deliveries and start a new delivery job"""
+    notification = db.query(Notification).filter(Notification.id == notification_id).first()
+    if not notification:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Notification not found"
+        )
+    
+    if not check_condominium_access(db, current_user, notification.condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    if not can_send_notifications(current_user):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can retry deliveries"
+        )
+    
+    if not settings.NOTIFICATION_CHANNELS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Notification delivery is disabled"
+        )
+    
+    db.query(NotificationDelivery).filter(
+        NotificationDelivery.notification_id == notification_id,
+        NotificationDelivery.status == DeliveryStatus.FAILED
+    ).update({NotificationDelivery.status: DeliveryStatus.PENDING}, synchronize_session=False)
+    db.commit()
+    
+    return enqueue_delivery(db, notification, current_user.id)
 
 
 @router.get("/{notification_id}", response_model=NotificationResponse)
@@ -73,12 +542,13 @@ async def get_notification(
     current_user: User = Depends(get_current_user)
 ):
     """Get a specific notification"""
-    notification = db.query(Notification).filter(Notification.id == notification_id).first()
-    if not notification:
+    row = _with_receipts(db, current_user.id).filter(Notification.id == notification_id).first()
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Notification not found"
         )
+    notification, read_at = row
     
     if not check_condominium_access(db, current_user, notification.condominium_id):
         raise HTTPException(
@@ -93,7 +563,7 @@ async def get_notification(
             detail="Access denied to this notification"
         )
     
-    return notification
+    return _to_response(notification, read_at, current_user.id)
 
 
 @router.put("/{notification_id}/read", response_model=NotificationResponse)
@@ -102,7 +572,7 @@ async def mark_notification_read(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Mark a notification as read"""
+    """Mark a notification as read for the current user"""
     notification = db.query(Notification).filter(Notification.id == notification_id).first()
     if not notification:
         raise HTTPException(
@@ -123,11 +593,14 @@ async def mark_notification_read(
             detail="Access denied to this notification"
         )
     
-    notification.is_read = True
+    mark_read_for_user(db, notification, current_user.id)
     db.commit()
     db.refresh(notification)
+    invalidate_unread_counts(notification.condominium_id, current_user.id)
     
-    return notification
+    response = NotificationResponse.model_validate(notification)
+    response.is_read = True
+    return response
 
 
 @router.delete("/{notification_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -158,8 +631,9 @@ async def delete_notification(
             detail="Access denied"
         )
     
+    condominium_id, user_id = notification.condominium_id, notification.user_id
     db.delete(notification)
     db.commit()
+    invalidate_unread_counts(condominium_id, user_id)
     
     return None
-
@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
-import shutil
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
 from pydantic import BaseModel
 from typing import Optional
 from app.core.database import get_db
-from app.core.config import settings
+from app.core.storage import get_storage
 from app.core.security import verify_password, get_password_hash
 from app.models.user import User
 from app.api.auth import get_current_user
@@ -13,21 +13,12 @@ from app.schemas.user import UserResponse, UserUpdate
 
 router = APIRouter()
 
-# Ensure upload directory exists
-UPLOAD_DIR = Path(settings.UPLOAD_DIR)
-UPLOAD_DIR.mkdir(exist_ok=True)
-USER_UPLOAD_DIR = UPLOAD_DIR / "users"
-USER_UPLOAD_DIR.mkdir(exist_ok=True)
-
 
 def save_user_photo(file: UploadFile, user_id: int) -> str:
     """Save uploaded user photo and return URL"""
     file_ext = Path(file.filename).suffix
     filename = f"photo_{user_id}{file_ext}"
-    file_path = USER_UPLOAD_DIR / filename
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    get_storage().save(f"users/{filename}", file.file, file.content_type)
     
     return f"/uploads/users/{filename}"
 
@@ -39,7 +30,7 @@ async def upload_profile_photo(
     current_user: User = Depends(get_current_user)
 ):
     """Upload profile photo for current user"""
-    photo_url = save_user_photo(file, current_user.id)
+    photo_url = await run_in_threadpool(save_user_photo, file, current_user.id)
     current_user.photo_url = photo_url
     db.commit()
     db.refresh(current_user)
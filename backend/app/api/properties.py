@@ -1,42 +1,128 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
+from fastapi.responses import Response
+from sqlalchemy import select, func, and_, or_, insert, update
+from sqlalchemy.orm import Session, joinedload, selectinload
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
 import json
-import shutil
 from pathlib import Path
 from datetime import datetime
-from app.core.database import get_db
+from app.core.database import get_db, as_naive_utc
 from app.core.permissions import check_condominium_access, Role, is_super_admin
 from app.core.config import settings
+from app.core.storage import get_storage
+from app.core.ownership import current_link, links_as_of, ownership_history
+from app.core.property_import import COLUMNS as IMPORT_COLUMNS, ImportFileError, import_properties
 from app.models.property import Property, PropertyResident
 from app.models.condominium import Condominium
 from app.models.resident import Resident
 from app.models.user import User
 from app.models.block import Block
 from app.api.auth import get_current_user
-from app.schemas.property import PropertyCreate, PropertyUpdate, PropertyResponse, PropertyResidentCreate, PropertyResidentResponse, PropertyResidentAssignment
+from app.schemas.property import PropertyCreate, PropertyUpdate, PropertyResponse, PropertyResidentCreate, PropertyResidentResponse, PropertyResidentAssignment, PropertySummary, PropertyPage, PropertyCompleteResponse, PropertyImportResponse
 
 router = APIRouter()
 
-# Ensure upload directory exists
-UPLOAD_DIR = Path(settings.UPLOAD_DIR)
-UPLOAD_DIR.mkdir(exist_ok=True)
-PROPERTY_UPLOAD_DIR = UPLOAD_DIR / "properties"
-PROPERTY_UPLOAD_DIR.mkdir(exist_ok=True)
-
 
 def save_property_photo(file: UploadFile, property_id: int) -> str:
     """Save uploaded property photo and return URL"""
     file_ext = Path(file.filename).suffix
     filename = f"photo_{property_id}{file_ext}"
-    file_path = PROPERTY_UPLOAD_DIR / filename
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    get_storage().save(f"properties/{filename}", file.file, file.content_type)
     
     return f"/uploads/properties/{filename}"
 
 
+def parse_resident_assignments(residents_json: Optional[str]) -> List[PropertyResidentAssignment]:
+    """Parse the residents_json form field; malformed input is a 400 instead of being ignored"""
+    if not residents_json:
+        return []
+    try:
+        data = json.loads(residents_json)
+        if not isinstance(data, list):
+            raise ValueError("expected a list")
+        return [PropertyResidentAssignment.model_validate(item) for item in data]
+    except (ValueError, TypeError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid residents_json: {e}"
+        )
+
+
+def assign_residents(db: Session, property: Property, assignments: List[PropertyResidentAssignment]) -> List[int]:
+    """
+    Make the property's current residents match assignments by diffing against the
+    open links, with a constant number of queries: residents that stay with the
+    same percentage are untouched, removed residents get their link closed
+    (end_date) and new residents or changed percentages open a new link, so the
+    ownership history is kept (see app.core.ownership). Returns the rejected
+    resident ids (unknown or from another condominium). The caller commits.
+    """
+    wanted = {}
+    for assignment in assignments:  # Last entry wins for repeated ids
+        if assignment.is_owner:
+            percentage = 100.0
+        elif "ownership_percentage" in assignment.model_fields_set:
+            percentage = assignment.ownership_percentage
+        else:
+            percentage = 0.0
+        wanted[assignment.resident_id] = percentage
+    
+    valid_ids = set()
+    if wanted:
+        valid_ids = set(db.execute(
+            select(Resident.id).where(
+                Resident.id.in_(list(wanted)),
+                Resident.condominium_id == property.condominium_id
+            )
+        ).scalars())
+    rejected = [resident_id for resident_id in wanted if resident_id not in valid_ids]
+    
+    current = {
+        resident_id: (link_id, percentage)
+        for link_id, resident_id, percentage in db.execute(
+            select(PropertyResident.id, PropertyResident.resident_id, PropertyResident.ownership_percentage).where(
+                PropertyResident.property_id == property.id,
+                current_link()
+            )
+        ).all()
+    }
+    
+    # Closing and opening at the same instant: exactly one link is active at any date
+    now = datetime.utcnow()
+    closed = [
+        link_id for resident_id, (link_id, percentage) in current.items()
+        if resident_id not in valid_ids or percentage != wanted[resident_id]
+    ]
+    inserts = [
+        {
+            "property_id": property.id,
+            "resident_id": resident_id,
+            "start_date": now,
+            "end_date": None,
+            "ownership_percentage": wanted[resident_id],
+        }
+        for resident_id in valid_ids
+        if resident_id not in current or current[resident_id][1] != wanted[resident_id]
+    ]
+    
+    if closed:
+        db.execute(
+            update(PropertyResident).where(PropertyResident.id.in_(closed)).values(end_date=now),
+            execution_options={"synchronize_session": False}
+        )
+    if inserts:
+        db.execute(insert(PropertyResident), inserts)
+    return rejected
+
+
+def _complete_response(db: Session, property: Property, rejected: List[int]) -> PropertyCompleteResponse:
+    db.refresh(property)
+    response = PropertyCompleteResponse.model_validate(property)
+    response.rejected_resident_ids = rejected
+    return response
+
+
 @router.post("/", response_model=PropertyResponse, status_code=status.HTTP_201_CREATED)
 async def create_property(
     property_data: PropertyCreate,
@@ -75,7 +161,7 @@ async def create_property(
     return property
 
 
-@router.post("/create-complete", response_model=PropertyResponse, status_code=status.HTTP_201_CREATED)
+@router.post("/create-complete", response_model=PropertyCompleteResponse, status_code=status.HTTP_201_CREATED)
 async def create_property_complete(
     condominium_id: int = Form(...),
     code: str = Form(...),
@@ -88,7 +174,10 @@ async def create_property_complete(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Create a new property with photo and residents in one operation"""
+    """
+    Create a new property with photo and residents in one operation.
+    Residents that do not belong to the condominium are reported in rejected_resident_ids.
+    """
     # Check condominium access
     if not check_condominium_access(db, current_user, condominium_id):
         raise HTTPException(
@@ -112,6 +201,8 @@ async def create_property_complete(
             detail="Condominium not found"
         )
     
+    assignments = parse_resident_assignments(residents_json)
+    
     # Convert area to float if provided
     area_float = None
     if area:
@@ -150,69 +241,201 @@ async def create_property_complete(
     
     # Upload photo if provided
     if photo:
-        photo_url = save_property_photo(photo, property.id)
+        photo_url = await run_in_threadpool(save_property_photo, photo, property.id)
         property.photo_url = photo_url
         db.commit()
         db.refresh(property)
     
     # Assign residents if provided
-    if residents_json:
-        try:
-            residents_data = json.loads(residents_json)
-            current_date = datetime.utcnow()
-            
-            for resident_assignment in residents_data:
-                resident_id = resident_assignment.get("resident_id")
-                is_owner = resident_assignment.get("is_owner", False)
-                ownership_percentage = resident_assignment.get("ownership_percentage", 100.0 if is_owner else 0.0)
-                
-                # Verify resident exists and belongs to same condominium
-                resident = db.query(Resident).filter(Resident.id == resident_id).first()
-                if not resident or resident.condominium_id != condominium_id:
-                    continue  # Skip invalid residents
-                
-                # If this is the owner, set ownership to 100% or adjust percentages
-                if is_owner:
-                    ownership_percentage = 100.0
-                
-                property_resident = PropertyResident(
-                    property_id=property.id,
-                    resident_id=resident_id,
-                    start_date=current_date,
-                    end_date=None,
-                    ownership_percentage=ownership_percentage
-                )
-                db.add(property_resident)
-            
-            db.commit()
-        except (json.JSONDecodeError, KeyError, ValueError) as e:
-            # Log error but don't fail the property creation
-            pass
+    rejected = []
+    if assignments:
+        rejected = assign_residents(db, property, assignments)
+        db.commit()
     
-    return property
+    return _complete_response(db, property, rejected)
+
+
+def filter_properties(query, condominium_id: int, block_id: Optional[int], type: Optional[str], code_prefix: Optional[str]):
+    """Listing filters shared by the full and the compact property lists"""
+    query = query.filter(Property.condominium_id == condominium_id)
+    if block_id is not None:
+        query = query.filter(Property.block_id == block_id)
+    if type:
+        query = query.filter(Property.type == type)
+    if code_prefix:
+        query = query.filter(Property.code.startswith(code_prefix, autoescape=True))
+    return query
+
+
+def _current_residents_of_property():
+    """Correlated condition: current residents of the outer Property row"""
+    return and_(PropertyResident.property_id == Property.id, current_link())
 
 
 @router.get("/condominium/{condominium_id}", response_model=List[PropertyResponse])
 async def get_properties_by_condominium(
     condominium_id: int,
+    block_id: Optional[int] = None,
+    type: Optional[str] = None,
+    code_prefix: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Omit to get every property"),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get all properties for a condominium"""
+    """
+    Get properties for a condominium with block and residents.
+    For large condominiums use /condominium/{id}/summary (paginated, compact rows).
+    """
     if not check_condominium_access(db, current_user, condominium_id):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied to this condominium"
         )
     
-    from sqlalchemy.orm import joinedload
-    from app.models.resident import Resident
-    
-    properties = db.query(Property).options(
+    # selectinload: one extra query per relationship instead of a row per property x resident
+    query = filter_properties(db.query(Property), condominium_id, block_id, type, code_prefix).options(
         joinedload(Property.block),
-        joinedload(Property.property_residents).joinedload(PropertyResident.resident)
-    ).filter(Property.condominium_id == condominium_id).all()
-    return properties
+        selectinload(Property.current_residents).joinedload(PropertyResident.resident)
+    ).order_by(Property.code, Property.id)
+    if skip:
+        query = query.offset(skip)
+    if limit:
+        query = query.limit(limit)
+    return query.all()
+
+
+@router.get("/condominium/{condominium_id}/summary", response_model=PropertyPage)
+async def get_property_summaries(
+    condominium_id: int,
+    block_id: Optional[int] = None,
+    type: Optional[str] = None,
+    code_prefix: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Paginated compact property list (id, code, type, block, owner name, resident count).
+    Rows come from one column-select query plus a count; no ORM objects are loaded.
+    """
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    current = _current_residents_of_property()
+    owner_name = (
+        select(Resident.full_name)
+        .join(PropertyResident, PropertyResident.resident_id == Resident.id)
+        .where(current)
+        .order_by(PropertyResident.ownership_percentage.desc(), PropertyResident.id)
+        .limit(1)
+        .correlate(Property)
+        .scalar_subquery()
+    )
+    resident_count = (
+        select(func.count(PropertyResident.id))
+        .where(current)
+        .correlate(Property)
+        .scalar_subquery()
+    )
+    
+    total = filter_properties(
+        db.query(func.count(Property.id)), condominium_id, block_id, type, code_prefix
+    ).scalar()
+    rows = filter_properties(
+        db.query(
+            Property.id,
+            Property.code,
+            Property.type,
+            Property.block_id,
+            Block.name.label("block_name"),
+            owner_name.label("owner_name"),
+            resident_count.label("resident_count"),
+        ).outerjoin(Block, Block.id == Property.block_id),
+        condominium_id, block_id, type, code_prefix
+    ).order_by(Property.code, Property.id).offset(skip).limit(limit).all()
+    
+    return PropertyPage(
+        items=[PropertySummary.model_validate(row) for row in rows],
+        total=total,
+        skip=skip,
+        limit=limit,
+    )
+
+
+@router.get("/import/template")
+async def get_import_template(current_user: User = Depends(get_current_user)):
+    """CSV header (and one example row) for the property/resident import"""
+    example = ["Bloque 1", "101", "apartment", "62.5", "Ana Gómez", "CC", "1020304050",
+               "ana@example.com", "3001234567", "si", "100"]
+    content = ",".join(IMPORT_COLUMNS) + "\n" + ",".join(example) + "\n"
+    return Response(
+        content=content,
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="plantilla_unidades.csv"'}
+    )
+
+
+@router.post("/condominium/{condominium_id}/import", response_model=PropertyImportResponse)
+async def import_properties_file(
+    condominium_id: int,
+    file: UploadFile = File(...),
+    dry_run: bool = Form(False),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Import blocks, properties, residents and ownership links from a CSV or XLSX file
+    (columns in GET /import/template). Units are deduplicated by code and residents
+    by document number; rows with errors are skipped and listed in the response,
+    the rest are inserted in one transaction. dry_run only validates.
+    """
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    user_roles = [ur.role.name for ur in current_user.user_roles]
+    if not is_super_admin(current_user) and Role.ADMIN not in user_roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can import properties"
+        )
+    
+    if not db.query(Condominium.id).filter(Condominium.id == condominium_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Condominium not found"
+        )
+    
+    if file.size is not None and file.size > settings.MAX_UPLOAD_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File size exceeds maximum allowed size of {settings.MAX_UPLOAD_SIZE} bytes"
+        )
+    
+    try:
+        result = import_properties(db, condominium_id, file.file, file.filename, dry_run=dry_run)
+    except (ImportFileError, UnicodeDecodeError) as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot import file: {e}"
+        )
+    except Exception:
+        db.rollback()
+        raise
+    
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+    return result
 
 
 @router.get("/{property_id}", response_model=PropertyResponse)
@@ -224,7 +447,7 @@ async def get_property(
     """Get a specific property"""
     property = db.query(Property).options(
         joinedload(Property.block),
-        joinedload(Property.property_residents).joinedload(PropertyResident.resident)
+        joinedload(Property.current_residents).joinedload(PropertyResident.resident)
     ).filter(Property.id == property_id).first()
     if not property:
         raise HTTPException(
@@ -241,6 +464,45 @@ async def get_property(
     return property
 
 
+def _get_accessible_property(db: Session, current_user: User, property_id: int) -> Property:
+    property = db.query(Property).filter(Property.id == property_id).first()
+    if not property:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found"
+        )
+    
+    if not check_condominium_access(db, current_user, property.condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this property"
+        )
+    return property
+
+
+@router.get("/{property_id}/residents", response_model=List[PropertyResidentResponse])
+async def get_property_residents_as_of(
+    property_id: int,
+    as_of: Optional[datetime] = Query(None, description="Instant to evaluate (UTC); defaults to now"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Residents linked to the property at a given date (for billing or voting rights of past periods)"""
+    property = _get_accessible_property(db, current_user, property_id)
+    return links_as_of(db, [property.id], as_naive_utc(as_of), with_residents=True).get(property.id, [])
+
+
+@router.get("/{property_id}/residents/history", response_model=List[PropertyResidentResponse])
+async def get_property_residents_history(
+    property_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Every ownership/residence link of the property, oldest first, including closed ones"""
+    property = _get_accessible_property(db, current_user, property_id)
+    return ownership_history(db, property.id)
+
+
 @router.put("/{property_id}", response_model=PropertyResponse)
 async def update_property(
     property_id: int,
@@ -280,7 +542,7 @@ async def update_property(
     return property
 
 
-@router.put("/update-complete/{property_id}", response_model=PropertyResponse)
+@router.put("/update-complete/{property_id}", response_model=PropertyCompleteResponse)
 async def update_property_complete(
     property_id: int,
     code: Optional[str] = Form(None),
@@ -293,7 +555,11 @@ async def update_property_complete(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Update a property with photo in one operation"""
+    """
+    Update a property with photo in one operation.
+    residents_json replaces the current residents ("[]" removes them all);
+    residents that do not belong to the condominium are reported in rejected_resident_ids.
+    """
     property = db.query(Property).filter(Property.id == property_id).first()
     if not property:
         raise HTTPException(
@@ -315,6 +581,8 @@ async def update_property_complete(
             detail="Only administrators can update properties"
         )
     
+    assignments = parse_resident_assignments(residents_json)
+    
     # Update basic fields
     if code is not None:
         property.code = code
@@ -350,50 +618,17 @@ async def update_property_complete(
     
     # Upload photo if provided
     if photo:
-        photo_url = save_property_photo(photo, property.id)
+        photo_url = await run_in_threadpool(save_property_photo, photo, property.id)
         property.photo_url = photo_url
     
     # Update residents if provided
-    if residents_json is not None:  # Use is not None to allow empty string
-        # Delete existing property-resident relationships
-        db.query(PropertyResident).filter(PropertyResident.property_id == property.id).delete()
-        
-        # Add new resident assignments if provided
-        if residents_json:
-            try:
-                residents_data = json.loads(residents_json)
-                current_date = datetime.utcnow()
-                
-                for resident_assignment in residents_data:
-                    resident_id = resident_assignment.get("resident_id")
-                    is_owner = resident_assignment.get("is_owner", False)
-                    ownership_percentage = resident_assignment.get("ownership_percentage", 100.0 if is_owner else 0.0)
-                    
-                    # Verify resident exists and belongs to same condominium
-                    resident = db.query(Resident).filter(Resident.id == resident_id).first()
-                    if not resident or resident.condominium_id != property.condominium_id:
-                        continue  # Skip invalid residents
-                    
-                    # If this is the owner, set ownership to 100% or adjust percentages
-                    if is_owner:
-                        ownership_percentage = 100.0
-                    
-                    property_resident = PropertyResident(
-                        property_id=property.id,
-                        resident_id=resident_id,
-                        start_date=current_date,
-                        end_date=None,
-                        ownership_percentage=ownership_percentage
-                    )
-                    db.add(property_resident)
-            except (json.JSONDecodeError, KeyError, ValueError) as e:
-                # Log error but don't fail the property update
-                pass
+    rejected = []
+    if residents_json is not None:
+        rejected = assign_residents(db, property, assignments)
     
     db.commit()
-    db.refresh(property)
     
-    return property
+    return _complete_response(db, property, rejected)
 
 
 @router.delete("/{property_id}", status_code=status.HTTP_204_NO_CONTENT)
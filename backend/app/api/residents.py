@@ -1,11 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from typing import List, Optional
-import shutil
 from pathlib import Path
 from app.core.database import get_db
 from app.core.permissions import check_condominium_access, Role
-from app.core.config import settings
+from app.core.storage import get_storage
 from app.models.resident import Resident
 from app.models.condominium import Condominium
 from app.models.user import User
@@ -14,21 +14,12 @@ from app.schemas.resident import ResidentCreate, ResidentUpdate, ResidentRespons
 
 router = APIRouter()
 
-# Ensure upload directory exists
-UPLOAD_DIR = Path(settings.UPLOAD_DIR)
-UPLOAD_DIR.mkdir(exist_ok=True)
-RESIDENT_UPLOAD_DIR = UPLOAD_DIR / "residents"
-RESIDENT_UPLOAD_DIR.mkdir(exist_ok=True)
-
 
 def save_resident_photo(file: UploadFile, resident_id: int) -> str:
     """Save uploaded resident photo and return URL"""
     file_ext = Path(file.filename).suffix
     filename = f"photo_{resident_id}{file_ext}"
-    file_path = RESIDENT_UPLOAD_DIR / filename
-    
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    get_storage().save(f"residents/{filename}", file.file, file.content_type)
     
     return f"/uploads/residents/{filename}"
 
@@ -122,7 +113,7 @@ async def create_resident_complete(
     
     # Upload photo if provided
     if photo:
-        photo_url = save_resident_photo(photo, resident.id)
+        photo_url = await run_in_threadpool(save_resident_photo, photo, resident.id)
         resident.photo_url = photo_url
         db.commit()
         db.refresh(resident)
@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.core.database import get_db
+from app.core.permissions import check_condominium_access
+from app.core.search import ENTITY_TYPES, search
+from app.models.user import User
+from app.api.auth import get_current_user
+from app.schemas.search import SearchPage
+
+router = APIRouter()
+
+
+@router.get("/condominium/{condominium_id}", response_model=SearchPage)
+async def search_condominium(
+    condominium_id: int,
+    q: str = Query(..., min_length=1, max_length=200, description="Words or word prefixes, accents optional"),
+    types: Optional[List[str]] = Query(None, description="Restrict to resident, property, block, document and/or attachment"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Search residents (name, document, phone, email), units (code), blocks, documents and attachments (title and content), best matches first"""
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    unknown = [t for t in types or [] if t not in ENTITY_TYPES]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown search type(s): {', '.join(unknown)}. Valid: {', '.join(ENTITY_TYPES)}"
+        )
+    
+    return search(db, condominium_id, q, entity_types=types, skip=skip, limit=limit)
@@ -1,18 +1,83 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
+from app.core.config import settings
+from app.core.database import get_db, as_naive_utc
 from app.core.permissions import check_condominium_access, Role
-from app.models.space_request import SpaceRequest, RequestStatus
+from app.models.space_request import SpaceRequest, RequestStatus, BOOKED_STATUSES
 from app.models.resident import Resident
 from app.models.user import User
 from app.api.auth import get_current_user
-from app.schemas.space_request import SpaceRequestCreate, SpaceRequestUpdate, SpaceRequestResponse
-from datetime import datetime
+from app.schemas.space_request import (
+    SpaceRequestCreate,
+    SpaceRequestUpdate,
+    SpaceRequestResponse,
+    SpaceSlot,
+    SpaceAvailabilityResponse,
+)
+from datetime import datetime, timedelta
 
 router = APIRouter()
 
 
+def validate_booking_window(start_time: datetime, end_time: datetime):
+    """Reject empty, inverted or longer than SPACE_BOOKING_MAX_HOURS bookings"""
+    if end_time <= start_time:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_time must be after start_time"
+        )
+    if end_time - start_time > timedelta(hours=settings.SPACE_BOOKING_MAX_HOURS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bookings cannot exceed {settings.SPACE_BOOKING_MAX_HOURS} hours"
+        )
+
+
+def _overlapping(condominium_id: int, space_name: str, start_time: datetime, end_time: datetime):
+    """
+    Filters for bookings of a space overlapping [start_time, end_time). Since no
+    booking is longer than SPACE_BOOKING_MAX_HOURS, the lower bound on start_time
+    turns the check into a bounded range scan of ix_space_requests_space_start.
+    """
+    return [
+        SpaceRequest.condominium_id == condominium_id,
+        SpaceRequest.space_name == space_name,
+        SpaceRequest.start_time < end_time,
+        SpaceRequest.start_time > start_time - timedelta(hours=settings.SPACE_BOOKING_MAX_HOURS),
+        SpaceRequest.end_time > start_time,
+    ]
+
+
+def find_booking_conflict(
+    db: Session,
+    condominium_id: int,
+    space_name: str,
+    start_time: datetime,
+    end_time: datetime,
+    exclude_id: Optional[int] = None,
+) -> Optional[SpaceRequest]:
+    """First approved booking of the space overlapping the interval, if any"""
+    query = db.query(SpaceRequest).filter(
+        *_overlapping(condominium_id, space_name, start_time, end_time),
+        SpaceRequest.status.in_(BOOKED_STATUSES),
+    )
+    if exclude_id is not None:
+        query = query.filter(SpaceRequest.id != exclude_id)
+    return query.order_by(SpaceRequest.start_time).first()
+
+
+def _conflict_error(conflict: SpaceRequest) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=(
+            f"{conflict.space_name} is already booked from {conflict.start_time.isoformat()} "
+            f"to {conflict.end_time.isoformat()}"
+        )
+    )
+
+
 @router.post("/", response_model=SpaceRequestResponse, status_code=status.HTTP_201_CREATED)
 async def create_space_request(
     request_data: SpaceRequestCreate,
@@ -42,7 +107,21 @@ async def create_space_request(
             detail="You can only create requests for yourself"
         )
     
-    space_request = SpaceRequest(**request_data.model_dump())
+    # Stored and compared as naive UTC, like the availability window
+    start_time, end_time = as_naive_utc(request_data.start_time), as_naive_utc(request_data.end_time)
+    validate_booking_window(start_time, end_time)
+    conflict = find_booking_conflict(
+        db, request_data.condominium_id, request_data.space_name, start_time, end_time
+    )
+    if conflict:
+        raise _conflict_error(conflict)
+    
+    space_request = SpaceRequest(**{
+        **request_data.model_dump(),
+        "request_date": as_naive_utc(request_data.request_date),
+        "start_time": start_time,
+        "end_time": end_time,
+    })
     db.add(space_request)
     db.commit()
     db.refresh(space_request)
@@ -81,6 +160,70 @@ async def get_space_requests(
     return requests
 
 
+@router.get("/condominium/{condominium_id}/availability", response_model=SpaceAvailabilityResponse)
+async def get_space_availability(
+    condominium_id: int,
+    space_name: str,
+    date_from: datetime,
+    date_to: datetime,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Bookings and free slots of a space between date_from and date_to"""
+    if not check_condominium_access(db, current_user, condominium_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this condominium"
+        )
+    
+    date_from, date_to = as_naive_utc(date_from), as_naive_utc(date_to)
+    if date_to <= date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must be after date_from"
+        )
+    if date_to - date_from > timedelta(days=settings.SPACE_AVAILABILITY_MAX_DAYS):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range cannot exceed {settings.SPACE_AVAILABILITY_MAX_DAYS} days"
+        )
+    
+    bookings = db.query(
+        SpaceRequest.id, SpaceRequest.start_time, SpaceRequest.end_time, SpaceRequest.status
+    ).filter(
+        *_overlapping(condominium_id, space_name, date_from, date_to),
+        SpaceRequest.status.in_(BOOKED_STATUSES + [RequestStatus.PENDING])
+    ).order_by(SpaceRequest.start_time).all()
+    
+    busy = [
+        SpaceSlot(start_time=b.start_time, end_time=b.end_time, status=b.status, request_id=b.id)
+        for b in bookings
+    ]
+    
+    # Free slots are the gaps between approved bookings (pending ones do not hold the space)
+    free = []
+    cursor = date_from
+    date_end = date_to
+    for booking in bookings:
+        if booking.status not in BOOKED_STATUSES:
+            continue
+        start = as_naive_utc(booking.start_time)
+        end = as_naive_utc(booking.end_time)
+        if start > cursor:
+            free.append(SpaceSlot(start_time=cursor, end_time=min(start, date_end)))
+        cursor = max(cursor, end)
+    if cursor < date_end:
+        free.append(SpaceSlot(start_time=cursor, end_time=date_end))
+    
+    return SpaceAvailabilityResponse(
+        space_name=space_name,
+        date_from=date_from,
+        date_to=date_to,
+        busy=busy,
+        free=free,
+    )
+
+
 @router.get("/{request_id}", response_model=SpaceRequestResponse)
 async def get_space_request(
     request_id: int,
@@ -142,11 +285,26 @@ async def approve_space_request(
             detail="Only administrators can approve requests"
         )
     
+    conflict = find_booking_conflict(
+        db, space_request.condominium_id, space_request.space_name,
+        space_request.start_time, space_request.end_time, exclude_id=space_request.id
+    )
+    if conflict:
+        raise _conflict_error(conflict)
+    
     space_request.status = RequestStatus.APPROVED
     space_request.approved_by = current_user.id
     space_request.approved_at = datetime.utcnow()
     
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # PostgreSQL exclusion constraint: a concurrent approval won the slot
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The space was booked by another request for this time"
+        )
     db.refresh(space_request)
     
     return space_request
@@ -1,10 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, selectinload
+from starlette.concurrency import run_in_threadpool
 from typing import List
 from pathlib import Path
-import shutil
 from app.core.database import get_db
-from app.core.config import settings
+from app.core.storage import get_storage
 from app.core.security import get_password_hash
 from app.core.permissions import can_manage_users, is_super_admin
 from app.models.user import User, UserRole, UserCondominium
@@ -22,35 +22,37 @@ from app.api.auth import get_current_user
 
 router = APIRouter()
 
-# Directorio para fotos de usuarios (admin sube foto de cualquier usuario)
-UPLOAD_DIR = Path(settings.UPLOAD_DIR)
-UPLOAD_DIR.mkdir(exist_ok=True)
-USER_UPLOAD_DIR = UPLOAD_DIR / "users"
-USER_UPLOAD_DIR.mkdir(exist_ok=True)
-
 
 def _save_user_photo(file: UploadFile, target_user_id: int) -> str:
     """Guarda la foto subida y devuelve la URL."""
     file_ext = Path(file.filename or "photo").suffix or ".jpg"
     filename = f"photo_{target_user_id}{file_ext}"
-    file_path = USER_UPLOAD_DIR / filename
-    with open(file_path, "wb") as buffer:
-        shutil.copyfileobj(file.file, buffer)
+    get_storage().save(f"users/{filename}", file.file, file.content_type)
     return f"/uploads/users/{filename}"
 
 
+def _role_responses(user_roles) -> List[RoleResponse]:
+    return [RoleResponse(id=ur.role.id, name=ur.role.name, description=ur.role.description) 
+            for ur in user_roles if ur.role]
+
+
+def _condominium_items(user_condos) -> List[dict]:
+    return [{"id": uc.condominium.id, "name": uc.condominium.name} 
+            for uc in user_condos if uc.condominium]
+
+
 def get_user_roles(db: Session, user_id: int) -> List[RoleResponse]:
     """Get user roles"""
-    user_roles = db.query(UserRole).filter(UserRole.user_id == user_id).all()
-    return [RoleResponse(id=ur.role.id, name=ur.role.name, description=ur.role.description) 
-            for ur in user_roles]
+    user_roles = db.query(UserRole).options(joinedload(UserRole.role)).filter(UserRole.user_id == user_id).all()
+    return _role_responses(user_roles)
 
 
 def get_user_condominiums(db: Session, user_id: int) -> List[dict]:
     """Get user condominiums"""
-    user_condos = db.query(UserCondominium).filter(UserCondominium.user_id == user_id).all()
-    return [{"id": uc.condominium.id, "name": uc.condominium.name} 
-            for uc in user_condos]
+    user_condos = db.query(UserCondominium)\
+        .options(joinedload(UserCondominium.condominium))\
+        .filter(UserCondominium.user_id == user_id).all()
+    return _condominium_items(user_condos)
 
 
 @router.get("/", response_model=List[UserDetailResponse])
@@ -71,7 +73,14 @@ async def get_users(
             detail="Only administrators can view all users"
         )
     
-    users = db.query(User).offset(skip).limit(limit).all()
+    # Roles and condominiums for the whole page in two extra queries (not two per user)
+    users = db.query(User)\
+        .options(
+            selectinload(User.user_roles).joinedload(UserRole.role),
+            selectinload(User.user_condominiums).joinedload(UserCondominium.condominium)
+        )\
+        .order_by(User.id)\
+        .offset(skip).limit(limit).all()
     result = []
     for user in users:
         user_dict = {
@@ -85,8 +94,8 @@ async def get_users(
             "is_active": user.is_active,
             "created_at": user.created_at,
             "updated_at": user.updated_at,
-            "roles": get_user_roles(db, user.id),
-            "condominiums": get_user_condominiums(db, user.id)
+            "roles": _role_responses(user.user_roles),
+            "condominiums": _condominium_items(user.user_condominiums)
         }
         result.append(user_dict)
     return result
@@ -391,7 +400,7 @@ async def upload_user_photo(
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
-    photo_url = _save_user_photo(photo, user_id)
+    photo_url = await run_in_threadpool(_save_user_photo, photo, user_id)
     user.photo_url = photo_url
     db.commit()
     db.refresh(user)
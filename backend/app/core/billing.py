@@ -0,0 +1,150 @@
+"""
+Administration fee engine used by generate_billing.
+
+Computes the charge of every unit of a condominium in one pass: rules and
+previous balances are fetched with one query each and the per-unit amounts are
+then resolved in memory, so billing thousands of units costs a constant number
+of queries.
+
+Segmented condominiums (administration_value_type='segmentado'):
+    base = base_amount * type_coefficient * block_coefficient + area * area_rate
+Global condominiums:
+    base = base_amount
+
+Both modes add late interest (monthly % over the pending balance of earlier
+periods) and recurring charges scoped to the condominium, a block, a property
+type or a single unit.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models.administration_invoice import (
+    AdministrationInvoice,
+    AdministrationFeeRule,
+    FeeRuleType,
+    InvoiceStatus,
+)
+from app.models.condominium import Condominium
+from app.models.property import Property
+from app.schemas.administration_invoice import FeeBreakdown
+
+SEGMENTED_VALUE_TYPE = "segmentado"
+
+
+def _money(value: float) -> float:
+    return round(max(0.0, value), 2)
+
+
+def get_previous_pending(
+    db: Session, condominium_id: int, month: int, year: int, property_ids: Iterable[int]
+) -> Dict[int, float]:
+    """Pending balance per property for invoices of periods before month/year"""
+    property_ids = list(property_ids)
+    if not property_ids:
+        return {}
+    period = AdministrationInvoice.year * 100 + AdministrationInvoice.month
+    rows = (
+        db.query(AdministrationInvoice.property_id, func.sum(AdministrationInvoice.pending_amount))
+        .filter(
+            AdministrationInvoice.condominium_id == condominium_id,
+            AdministrationInvoice.is_active == True,
+            AdministrationInvoice.status.in_([
+                InvoiceStatus.PENDING, InvoiceStatus.PARTIAL, InvoiceStatus.OVERDUE
+            ]),
+            AdministrationInvoice.property_id.in_(property_ids),
+            period < year * 100 + month,
+        )
+        .group_by(AdministrationInvoice.property_id)
+        .all()
+    )
+    return {property_id: float(total or 0.0) for property_id, total in rows}
+
+
+def compute_administration_fees(
+    db: Session,
+    condominium: Condominium,
+    properties: List[Property],
+    month: int,
+    year: int,
+    base_amount: float,
+) -> Dict[int, FeeBreakdown]:
+    """Return the fee breakdown for each property id"""
+    rules = (
+        db.query(AdministrationFeeRule)
+        .filter(
+            AdministrationFeeRule.condominium_id == condominium.id,
+            AdministrationFeeRule.is_active == True,
+        )
+        .all()
+    )
+
+    type_coefficients: Dict[str, float] = {}
+    block_coefficients: Dict[int, float] = {}
+    area_rate = 0.0
+    interest_rate = 0.0
+    recurring_global = 0.0
+    recurring_by_type: Dict[str, float] = defaultdict(float)
+    recurring_by_block: Dict[int, float] = defaultdict(float)
+    recurring_by_property: Dict[int, float] = defaultdict(float)
+
+    for rule in rules:
+        if rule.rule_type == FeeRuleType.PROPERTY_TYPE and rule.property_type:
+            type_coefficients[rule.property_type] = rule.value
+        elif rule.rule_type == FeeRuleType.BLOCK and rule.block_id:
+            block_coefficients[rule.block_id] = rule.value
+        elif rule.rule_type == FeeRuleType.AREA_RATE:
+            area_rate += rule.value
+        elif rule.rule_type == FeeRuleType.LATE_INTEREST:
+            interest_rate = rule.value
+        elif rule.rule_type == FeeRuleType.RECURRING_CHARGE:
+            if rule.property_id:
+                recurring_by_property[rule.property_id] += rule.value
+            elif rule.block_id:
+                recurring_by_block[rule.block_id] += rule.value
+            elif rule.property_type:
+                recurring_by_type[rule.property_type] += rule.value
+            else:
+                recurring_global += rule.value
+
+    segmented = condominium.administration_value_type == SEGMENTED_VALUE_TYPE
+    previous_pending = (
+        get_previous_pending(db, condominium.id, month, year, (p.id for p in properties))
+        if interest_rate > 0 else {}
+    )
+
+    fees: Dict[int, FeeBreakdown] = {}
+    for prop in properties:
+        base = base_amount
+        if segmented:
+            base = (
+                base_amount
+                * type_coefficients.get(prop.type, 1.0)
+                * block_coefficients.get(prop.block_id, 1.0)
+                + (prop.area or 0.0) * area_rate
+            )
+        pending = previous_pending.get(prop.id, 0.0)
+        recurring = (
+            recurring_global
+            + recurring_by_type.get(prop.type, 0.0)
+            + recurring_by_block.get(prop.block_id, 0.0)
+            + recurring_by_property.get(prop.id, 0.0)
+        )
+        fees[prop.id] = FeeBreakdown(
+            property_id=prop.id,
+            base_amount=_money(base),
+            late_interest=_money(pending * interest_rate / 100.0),
+            recurring_charges=_money(recurring),
+            previous_pending=pending,
+        )
+    return fees
+
+
+def describe_fee(fee: FeeBreakdown) -> str:
+    """Short invoice description listing the non-base components"""
+    parts = []
+    if fee.late_interest:
+        parts.append(f"Interés de mora: {fee.late_interest:,.2f} (saldo anterior {fee.previous_pending:,.2f})")
+    if fee.recurring_charges:
+        parts.append(f"Cargos recurrentes: {fee.recurring_charges:,.2f}")
+    return "; ".join(parts)
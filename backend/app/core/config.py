@@ -6,6 +6,7 @@ class Settings(BaseSettings):
     # Database
     # Using SQLite for development/testing. Change to PostgreSQL for production
     DATABASE_URL: str = "sqlite:///./admcondm.db"
+    DB_STARTUP_MODE: str = "check"  # check: verify Alembic head, create: create_all (development), skip
     
     # JWT
     SECRET_KEY: str = "your-secret-key-change-in-production"
@@ -24,6 +25,88 @@ class Settings(BaseSettings):
     UPLOAD_DIR: str = "uploads"
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
     
+    # Storage backend of uploaded files (app.core.storage): local (UPLOAD_DIR) or s3
+    STORAGE_BACKEND: str = "local"
+    S3_BUCKET: str = ""
+    S3_ENDPOINT_URL: str = ""  # Empty for AWS; e.g. http://localhost:9000 for a local MinIO
+    S3_PUBLIC_ENDPOINT_URL: str = ""  # Host in presigned URLs when browsers reach S3 elsewhere
+    S3_REGION: str = "us-east-1"
+    S3_ACCESS_KEY_ID: str = ""
+    S3_SECRET_ACCESS_KEY: str = ""
+    S3_KEY_PREFIX: str = ""  # Optional folder inside the bucket
+    S3_MULTIPART_CHUNK_SIZE: int = 8 * 1024 * 1024  # Part size of streamed multipart uploads
+    
+    # Spreadsheet import of properties and residents
+    IMPORT_MAX_ROWS: int = 20000
+    IMPORT_BATCH_SIZE: int = 1000  # Rows per INSERT batch
+    
+    # Text extraction of uploaded documents (background job extract_document_text)
+    DOCUMENT_TEXT_EXTRACTION: bool = True
+    DOCUMENT_TEXT_MAX_CHARS: int = 200000  # Stored and indexed per file
+    
+    # ZIP bundle downloads (streamed, never buffered)
+    DOCUMENT_BUNDLE_MAX_FILES: int = 5000
+    
+    # Signed /uploads URLs (app.core.signed_urls)
+    SIGNED_URLS_ENFORCED: bool = True  # False serves /uploads publicly, as before signed URLs
+    SIGNED_URL_TTL_SECONDS: int = 3600
+    SIGNED_URL_GRANULARITY_SECONDS: int = 300  # Expiries rounded up so repeated links stay identical (cacheable)
+    SIGNED_URLS_ACCEL_REDIRECT_PREFIX: str = ""  # e.g. "/protected-uploads/": the front proxy serves the bytes
+    
+    # Full-text search index (app.core.search); disable only for bulk maintenance, then rebuild
+    SEARCH_INDEX_ENABLED: bool = True
+    
+    # Space bookings
+    SPACE_BOOKING_MAX_HOURS: int = 24  # Longest booking; bounds the overlap range scan
+    SPACE_AVAILABILITY_MAX_DAYS: int = 62
+    
+    # Calendar feed
+    CALENDAR_DEFAULT_PAST_DAYS: int = 30
+    CALENDAR_DEFAULT_FUTURE_DAYS: int = 180
+    CALENDAR_MAX_WINDOW_DAYS: int = 400
+    CALENDAR_EVENT_DEFAULT_HOURS: int = 2  # Duration of assemblies and meetings (no end time stored)
+    
+    # Background jobs
+    JOB_WORKERS: int = 2  # Processes in the job pool (0 = leave jobs queued for scripts/run_job_worker.py)
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 2.0
+    JOB_HEARTBEAT_SECONDS: int = 30  # Running jobs refresh heartbeat_at this often
+    JOB_LEASE_SECONDS: int = 300  # Running jobs without a heartbeat this long were lost and are queued again
+    JOB_RECOVERY_INTERVAL_SECONDS: int = 60  # API sweep for lost and undispatched jobs (0 = startup only)
+    
+    # Idempotency-Key response cache for write endpoints
+    IDEMPOTENCY_TTL_HOURS: int = 24
+    IDEMPOTENCY_MAX_RECORDS: int = 50000
+    IDEMPOTENCY_LOCK_SECONDS: int = 300  # In-flight key lease: a retry takes over the key of a request that died
+    
+    # Notification delivery
+    NOTIFICATION_CHANNELS: List[str] = ["email", "web_push"]  # Empty list disables delivery
+    NOTIFICATION_DELIVERY_BATCH_SIZE: int = 200
+    NOTIFICATION_DELIVERY_WORKERS: int = 4
+    NOTIFICATION_DELIVERY_RATE_PER_SECOND: float = 20.0
+    SMTP_HOST: str = "localhost"  # Local SMTP stand-in (MailHog, aiosmtpd) in development
+    SMTP_PORT: int = 1025
+    SMTP_USER: str = ""
+    SMTP_PASSWORD: str = ""
+    SMTP_USE_TLS: bool = False
+    SMTP_FROM: str = "notificaciones@admcondm.local"
+    VAPID_PRIVATE_KEY: str = ""  # Web push requires pywebpush and a VAPID key pair
+    VAPID_CLAIMS_EMAIL: str = "mailto:admin@admcondm.local"
+    
+    # Payment reminders (scripts/send_payment_reminders.py)
+    PAYMENT_REMINDER_GRACE_DAYS: int = 0  # Days past due before the first reminder
+    PAYMENT_REMINDER_DEDUP_DAYS: int = 7  # Minimum days between reminders to the same user
+    
+    # Prometheus-style /metrics endpoint
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str = ""  # When set, scrapes must send "Authorization: Bearer <token>"
+    
+    # Per-request SQL profiling (app/core/query_profiler.py); 0 disables a limit
+    SQL_QUERY_BUDGET: int = 30  # Statements per request before the request is logged
+    SQL_REQUEST_TIME_BUDGET_MS: float = 500.0  # Time in SQL per request before it is logged
+    SQL_SLOW_QUERY_MS: float = 200.0  # Single statements slower than this are logged
+    SQL_PROFILE_HEADERS: bool = False  # Add a Server-Timing header with query count and time
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
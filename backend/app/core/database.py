@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+from typing import Optional
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
@@ -28,3 +30,10 @@ def get_db():
     finally:
         db.close()
 
+
+
+def as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Convert an aware datetime to naive UTC, the form dates are stored in; naive values are kept as UTC"""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
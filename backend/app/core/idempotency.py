@@ -0,0 +1,234 @@
+"""
+Idempotency-Key support for write endpoints.
+
+Endpoints decorated with @idempotent accept an Idempotency-Key header. The first
+request with a key stores its response in idempotency_records; retries with the
+same key and body are answered from that record without running the endpoint
+(no writes, no validation queries). Reusing a key with a different body returns
+422, and a retry that arrives while the original is still running returns 409.
+An in-flight record only holds the key for IDEMPOTENCY_LOCK_SECONDS (its
+expires_at), so a retry can take over the key of a request whose worker died
+before answering. Stored responses expire after IDEMPOTENCY_TTL_HOURS and the
+table is trimmed to IDEMPOTENCY_MAX_RECORDS.
+"""
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+from jose import JWTError, jwt
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.idempotency import IdempotencyRecord
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = b"idempotency-key"
+REPLAY_HEADER = b"idempotent-replayed"
+EVICT_EVERY = 100  # Stores between eviction passes (per process)
+
+_stores_since_eviction = 0
+
+
+def idempotent(func):
+    """Mark an endpoint as accepting the Idempotency-Key header"""
+    func.__idempotent__ = True
+    return func
+
+
+def _user_id_from_headers(headers: dict) -> Optional[int]:
+    auth = headers.get(b"authorization", b"").decode("latin-1")
+    if not auth.lower().startswith("bearer "):
+        return None
+    try:
+        payload = jwt.decode(auth[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("type") != "access":
+        return None
+    return payload.get("user_id")
+
+
+def _is_idempotent_route(scope) -> bool:
+    app = scope.get("app")
+    for route in getattr(app, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(getattr(route, "endpoint", None), "__idempotent__", False)
+    return False
+
+
+def _begin(user_id: int, key: str, request_hash: str):
+    """Return ('new', None), ('replay', record), ('conflict', None) or ('mismatch', None)"""
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        record = db.query(IdempotencyRecord).filter(
+            IdempotencyRecord.user_id == user_id,
+            IdempotencyRecord.key == key,
+        ).first()
+        if record and record.expires_at.replace(tzinfo=None) <= now:
+            # Expired response, or in-flight lease of a request that never finished: the key is free again
+            db.delete(record)
+            db.commit()
+            record = None
+        if record:
+            if record.request_hash != request_hash:
+                return "mismatch", None
+            if record.status_code is None:
+                return "conflict", None
+            return "replay", (record.status_code, record.content_type, record.response_body)
+
+        db.add(IdempotencyRecord(
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+        ))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return "conflict", None
+        return "new", None
+    finally:
+        db.close()
+
+
+def _finish(user_id: int, key: str, status_code: int, content_type: Optional[str], body: bytes):
+    """Persist the response, or release the key when the request failed server-side"""
+    global _stores_since_eviction
+    db = SessionLocal()
+    try:
+        query = db.query(IdempotencyRecord).filter(
+            IdempotencyRecord.user_id == user_id,
+            IdempotencyRecord.key == key,
+            IdempotencyRecord.status_code.is_(None),
+        )
+        if status_code >= 500:
+            query.delete(synchronize_session=False)
+        else:
+            query.update({
+                IdempotencyRecord.status_code: status_code,
+                IdempotencyRecord.content_type: content_type,
+                IdempotencyRecord.response_body: body.decode("utf-8", errors="replace"),
+                IdempotencyRecord.expires_at: datetime.utcnow() + timedelta(hours=settings.IDEMPOTENCY_TTL_HOURS),
+            }, synchronize_session=False)
+        db.commit()
+
+        _stores_since_eviction += 1
+        if _stores_since_eviction >= EVICT_EVERY:
+            _stores_since_eviction = 0
+            evict_idempotency_records(db)
+    finally:
+        db.close()
+
+
+def evict_idempotency_records(db) -> int:
+    """Delete expired records and trim the table to IDEMPOTENCY_MAX_RECORDS"""
+    removed = db.query(IdempotencyRecord).filter(
+        IdempotencyRecord.expires_at <= datetime.utcnow()
+    ).delete(synchronize_session=False)
+    overflow = db.query(IdempotencyRecord.id).count() - settings.IDEMPOTENCY_MAX_RECORDS
+    if overflow > 0:
+        oldest = db.query(IdempotencyRecord.id).order_by(IdempotencyRecord.id).limit(overflow).subquery()
+        removed += db.query(IdempotencyRecord).filter(
+            IdempotencyRecord.id.in_(oldest.select())
+        ).delete(synchronize_session=False)
+    db.commit()
+    return removed
+
+
+async def _send_json(send, status_code: int, detail: str):
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware answering retried writes from the idempotency cache"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        key = headers.get(IDEMPOTENCY_HEADER, b"").decode("latin-1").strip()
+        if not key or not _is_idempotent_route(scope):
+            return await self.app(scope, receive, send)
+
+        user_id = _user_id_from_headers(headers)
+        if user_id is None:
+            # Let the endpoint reject the unauthenticated request
+            return await self.app(scope, receive, send)
+
+        # Buffer the body so it can be hashed and replayed to the endpoint
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        body = b"".join(chunks)
+
+        digest = hashlib.sha256()
+        digest.update(scope["method"].encode() + b" " + scope["path"].encode() + b"?" + scope.get("query_string", b""))
+        digest.update(b"\n" + body)
+        request_hash = digest.hexdigest()
+
+        state, cached = await run_in_threadpool(_begin, user_id, key[:255], request_hash)
+        if state == "mismatch":
+            return await _send_json(send, 422, "Idempotency-Key was already used with a different request")
+        if state == "conflict":
+            return await _send_json(send, 409, "A request with this Idempotency-Key is still being processed")
+        if state == "replay":
+            status_code, content_type, response_body = cached
+            data = (response_body or "").encode("utf-8")
+            response_headers = [(b"content-length", str(len(data)).encode()), (REPLAY_HEADER, b"true")]
+            if content_type:
+                response_headers.append((b"content-type", content_type.encode("latin-1")))
+            await send({"type": "http.response.start", "status": status_code, "headers": response_headers})
+            await send({"type": "http.response.body", "body": data})
+            return
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        response = {"status": 500, "content_type": None, "body": []}
+
+        async def capture_send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", []):
+                    if name.lower() == b"content-type":
+                        response["content_type"] = value.decode("latin-1")
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, capture_send)
+        finally:
+            try:
+                await run_in_threadpool(
+                    _finish, user_id, key[:255], response["status"],
+                    response["content_type"], b"".join(response["body"]),
+                )
+            except Exception as e:
+                logger.error(f"[IDEMPOTENCY] Could not store response for key {key}: {e}")
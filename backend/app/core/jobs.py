@@ -0,0 +1,371 @@
+"""
+Lightweight background job runner.
+
+Jobs are rows in background_jobs. Enqueuing commits the row and hands its id to
+a process pool so long tasks (billing, imports, exports) run on separate cores
+without holding the HTTP request. Every runner claims a job with a
+conditional UPDATE, so a job never runs twice concurrently.
+
+A running job holds a lease: a thread refreshes heartbeat_at every
+JOB_HEARTBEAT_SECONDS. recover_stale_jobs() queues again the jobs whose lease
+expired (worker crashed or killed by a restart) and fails those out of
+attempts; dispatch_queued_jobs() hands queued jobs nobody is running (pool
+shut down with cancel_futures, dispatch failures) back to the pool. The API
+runs both at startup and every JOB_RECOVERY_INTERVAL_SECONDS, and
+scripts/run_job_worker.py before each poll.
+
+Job types are condominium-scoped unless registered with global_scope=True:
+POST /api/jobs then requires a condominium_id the user can access, so
+handlers only act on data of ctx.condominium_id.
+"""
+import asyncio
+import importlib
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, engine
+from app.models.job import BackgroundJob, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Modules whose import registers job handlers (spawned workers must import them)
+JOB_HANDLER_MODULES = [
+    "app.api.administration_invoices",
+    "app.api.notifications",
+    "app.api.documents",
+]
+
+JOB_HANDLERS: Dict[str, Dict[str, Any]] = {}
+
+_executor: Optional[ProcessPoolExecutor] = None
+_dispatched: Set[int] = set()  # Jobs submitted to this process's pool and not finished yet
+
+
+class JobError(Exception):
+    """Non-retryable job failure (invalid payload, missing data)"""
+
+
+def register_job(
+    job_type: str,
+    permission: Optional[Callable] = None,
+    payload_schema: Optional[Type[BaseModel]] = None,
+    global_scope: bool = False,
+):
+    """Decorator registering handler(db, payload, ctx) -> dict for a job type"""
+    def decorator(func):
+        JOB_HANDLERS[job_type] = {
+            "handler": func,
+            "permission": permission,
+            "payload_schema": payload_schema,
+            "global_scope": global_scope,  # False: enqueued only with a condominium_id the user can access
+        }
+        return func
+    return decorator
+
+
+def load_job_handlers():
+    for module in JOB_HANDLER_MODULES:
+        importlib.import_module(module)
+
+
+class JobContext:
+    """Job metadata and progress reporting handed to handlers"""
+
+    def __init__(self, job_id: int, created_by: int, condominium_id: Optional[int]):
+        self.job_id = job_id
+        self.created_by = created_by
+        self.condominium_id = condominium_id
+
+    def progress(self, percent: float, message: Optional[str] = None):
+        # Separate short-lived session: committing here must not commit the handler's work
+        db = SessionLocal()
+        try:
+            db.query(BackgroundJob).filter(BackgroundJob.id == self.job_id).update(
+                {
+                    BackgroundJob.progress: max(0.0, min(100.0, percent)),
+                    BackgroundJob.progress_message: message,
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+        finally:
+            db.close()
+
+
+def validate_job_payload(job_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate payload against the handler schema; raises JobError"""
+    definition = JOB_HANDLERS.get(job_type)
+    if not definition:
+        raise JobError(f"Unknown job type: {job_type}")
+    schema = definition["payload_schema"]
+    if schema is None:
+        return payload
+    try:
+        return schema(**payload).model_dump(mode="json")
+    except ValidationError as e:
+        raise JobError(str(e))
+
+
+def enqueue_job(
+    db: Session,
+    job_type: str,
+    payload: Dict[str, Any],
+    created_by: int,
+    condominium_id: Optional[int] = None,
+    idempotency_key: Optional[str] = None,
+    dispatch: bool = True,
+) -> Tuple[BackgroundJob, bool]:
+    """
+    Persist and dispatch a job. Returns (job, created); replays return the existing job.
+    With dispatch=False the job stays queued for scripts/run_job_worker.py.
+    """
+    if idempotency_key:
+        existing = db.query(BackgroundJob).filter(
+            BackgroundJob.created_by == created_by,
+            BackgroundJob.idempotency_key == idempotency_key,
+        ).first()
+        if existing:
+            return existing, False
+
+    job = BackgroundJob(
+        job_type=job_type,
+        status=JobStatus.QUEUED,
+        condominium_id=condominium_id,
+        payload=payload,
+        idempotency_key=idempotency_key,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        created_by=created_by,
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # Concurrent request with the same key won the insert
+        db.rollback()
+        existing = db.query(BackgroundJob).filter(
+            BackgroundJob.created_by == created_by,
+            BackgroundJob.idempotency_key == idempotency_key,
+        ).first()
+        return existing, False
+    db.refresh(job)
+
+    if dispatch:
+        dispatch_job(job.id)
+    return job, True
+
+
+def claim_job(db: Session, job_id: int) -> bool:
+    """Atomically move a queued job to running"""
+    claimed = db.query(BackgroundJob).filter(
+        BackgroundJob.id == job_id,
+        BackgroundJob.status == JobStatus.QUEUED,
+    ).update(
+        {
+            BackgroundJob.status: JobStatus.RUNNING,
+            BackgroundJob.started_at: datetime.utcnow(),
+            BackgroundJob.heartbeat_at: datetime.utcnow(),
+            BackgroundJob.attempts: BackgroundJob.attempts + 1,
+        },
+        synchronize_session=False,
+    )
+    db.commit()
+    return claimed == 1
+
+
+class JobHeartbeat(threading.Thread):
+    """Refreshes heartbeat_at of a running job until stopped (renews its lease)"""
+
+    def __init__(self, job_id: int):
+        super().__init__(name=f"job-heartbeat-{job_id}", daemon=True)
+        self.job_id = job_id
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(settings.JOB_HEARTBEAT_SECONDS):
+            db = SessionLocal()
+            try:
+                db.query(BackgroundJob).filter(
+                    BackgroundJob.id == self.job_id,
+                    BackgroundJob.status == JobStatus.RUNNING,
+                ).update({BackgroundJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+                db.commit()
+            except Exception as e:
+                logger.warning(f"[JOBS] Heartbeat of job {self.job_id} failed: {e}")
+            finally:
+                db.close()
+
+    def stop(self):
+        self._stopped.set()
+
+
+def _finish(db: Session, job_id: int, status: JobStatus, result=None, error: Optional[str] = None):
+    job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+    job.status = status
+    job.result = result
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    if status == JobStatus.SUCCEEDED:
+        job.progress = 100.0
+        job.progress_message = "Completado"
+    db.commit()
+
+
+def run_job(job_id: int):
+    """Execute a job with retries; safe to call from any process"""
+    load_job_handlers()
+    db = SessionLocal()
+    try:
+        if not claim_job(db, job_id):
+            return
+        job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+        definition = JOB_HANDLERS.get(job.job_type)
+        if not definition:
+            _finish(db, job_id, JobStatus.FAILED, error=f"Unknown job type: {job.job_type}")
+            return
+
+        ctx = JobContext(job.id, job.created_by, job.condominium_id)
+        payload = dict(job.payload or {})
+        heartbeat = JobHeartbeat(job_id)
+        heartbeat.start()
+        try:
+            _run_with_retries(db, job, definition, payload, ctx)
+        finally:
+            heartbeat.stop()
+    finally:
+        db.close()
+
+
+def _run_with_retries(db: Session, job: BackgroundJob, definition: Dict[str, Any], payload: Dict[str, Any], ctx: JobContext):
+    job_id = job.id
+    while True:
+        try:
+            result = definition["handler"](db, payload, ctx)
+            _finish(db, job_id, JobStatus.SUCCEEDED, result=result)
+            return
+        except (JobError, HTTPException) as e:
+            db.rollback()
+            detail = e.detail if isinstance(e, HTTPException) else str(e)
+            _finish(db, job_id, JobStatus.FAILED, error=str(detail))
+            return
+        except Exception as e:
+            db.rollback()
+            logger.exception(f"[JOBS] Job {job_id} ({job.job_type}) failed")
+            job = db.query(BackgroundJob).filter(BackgroundJob.id == job_id).first()
+            if job.attempts >= job.max_attempts:
+                _finish(db, job_id, JobStatus.FAILED, error=f"{type(e).__name__}: {e}")
+                return
+            job.error = f"{type(e).__name__}: {e}"
+            job.attempts += 1
+            db.commit()
+            time.sleep(settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (job.attempts - 2))
+
+
+def init_job_worker():
+    # Forked workers must not reuse the parent's pooled connections
+    engine.dispose(close=False)
+
+
+def get_job_executor() -> Optional[ProcessPoolExecutor]:
+    global _executor
+    if _executor is None and settings.JOB_WORKERS > 0:
+        _executor = ProcessPoolExecutor(max_workers=settings.JOB_WORKERS, initializer=init_job_worker)
+    return _executor
+
+
+def dispatch_job(job_id: int) -> bool:
+    """Submit a job to the process pool; it stays queued if the pool is unavailable"""
+    executor = get_job_executor()
+    if executor is None:
+        return False
+    try:
+        future = executor.submit(run_job, job_id)
+    except Exception as e:
+        logger.error(f"[JOBS] Could not dispatch job {job_id}: {e}")
+        return False
+    _dispatched.add(job_id)
+    future.add_done_callback(lambda _: _dispatched.discard(job_id))
+    return True
+
+
+def recover_stale_jobs() -> Dict[str, int]:
+    """Queue again running jobs whose lease expired; jobs without attempts left fail"""
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+    db = SessionLocal()
+    try:
+        stale = db.query(BackgroundJob).filter(
+            BackgroundJob.status == JobStatus.RUNNING,
+            func.coalesce(BackgroundJob.heartbeat_at, BackgroundJob.started_at) < cutoff,
+        )
+        failed = stale.filter(BackgroundJob.attempts >= BackgroundJob.max_attempts).update(
+            {
+                BackgroundJob.status: JobStatus.FAILED,
+                BackgroundJob.error: "Worker lost while running the job (lease expired)",
+                BackgroundJob.finished_at: datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+        requeued = stale.filter(BackgroundJob.attempts < BackgroundJob.max_attempts).update(
+            {
+                BackgroundJob.status: JobStatus.QUEUED,
+                BackgroundJob.started_at: None,
+                BackgroundJob.heartbeat_at: None,
+            },
+            synchronize_session=False,
+        )
+        db.commit()
+    finally:
+        db.close()
+    if failed or requeued:
+        logger.warning(f"[JOBS] Lost jobs: {requeued} queued again, {failed} failed")
+    return {"requeued": requeued, "failed": failed}
+
+
+def dispatch_queued_jobs(min_age_seconds: float = 0, limit: int = 500) -> List[int]:
+    """Hand queued jobs this process has not submitted back to the pool (no-op without a pool)"""
+    if get_job_executor() is None:
+        return []
+    db = SessionLocal()
+    try:
+        query = db.query(BackgroundJob.id).filter(BackgroundJob.status == JobStatus.QUEUED)
+        if min_age_seconds:
+            # Leave fresh jobs to the enqueue_job call that is dispatching them
+            query = query.filter(BackgroundJob.created_at < datetime.utcnow() - timedelta(seconds=min_age_seconds))
+        job_ids = [job_id for (job_id,) in query.order_by(BackgroundJob.id).limit(limit) if job_id not in _dispatched]
+    finally:
+        db.close()
+    return [job_id for job_id in job_ids if dispatch_job(job_id)]
+
+
+def run_job_recovery(min_queued_age_seconds: float = 0):
+    """recover_stale_jobs() then dispatch_queued_jobs(); errors are logged, never raised"""
+    try:
+        recover_stale_jobs()
+        dispatched = dispatch_queued_jobs(min_queued_age_seconds)
+        if dispatched:
+            logger.info(f"[JOBS] Dispatched {len(dispatched)} queued job(s)")
+    except Exception as e:
+        logger.error(f"[JOBS] Job recovery failed: {e}")
+
+
+async def job_recovery_loop():
+    """API background task: periodic run_job_recovery() every JOB_RECOVERY_INTERVAL_SECONDS"""
+    interval = settings.JOB_RECOVERY_INTERVAL_SECONDS
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(run_job_recovery, interval)
+
+
+def shutdown_job_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,294 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+MetricsMiddleware times every request by route template; SQL statement
+counts come from app.core.query_profiler (per request when
+QueryProfilerMiddleware wraps it) and SQLAlchemy pool event hooks count
+connection checkouts. Cache statistics are read from app.core.cache.CACHES
+when /metrics is scraped.
+
+Metrics are kept per process; with several uvicorn workers each one reports
+its own values (the worker_pid label tells them apart).
+"""
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.cache import CACHES
+from app.core.query_profiler import current_query_stats, install_query_profiler, route_template, statement_observers
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+QUERY_TIME_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+WORKER_PID = str(os.getpid())
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """
+    Base metric. Values are either recorded in-process or, when collect is
+    given, read at scrape time from a callback returning {label values: value}.
+    """
+    kind = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        collect: Optional[Callable[[], Dict[LabelValues, float]]] = None,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[LabelValues, float] = {}
+        self._collect = collect
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        if self._collect is not None:
+            items = sorted(self._collect().items())
+        else:
+            with self._lock:
+                items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labels, k)} {_format_value(v)}" for k, v in items]
+
+    def render(self) -> str:
+        header = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(header + self.samples())
+
+
+class Counter(Metric):
+    kind = "counter"
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        self._states: Dict[LabelValues, List[float]] = {}  # bucket counts..., sum, count
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = [0.0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._states.items())
+        lines = []
+        inf = 'le="+Inf"'
+        for key, state in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, inf)} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {_format_value(state[-1])}")
+        return lines
+
+
+REGISTRY: List[Metric] = []
+
+
+# HTTP
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+http_requests_in_progress = Gauge("http_requests_in_progress", "HTTP requests being handled", ("method",))
+
+# Database
+db_queries_total = Counter("db_queries_total", "SQL statements executed")
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds", "Duration of single SQL statements", buckets=QUERY_TIME_BUCKETS
+)
+db_queries_per_request = Histogram(
+    "db_queries_per_request", "SQL statements per HTTP request", ("route",), buckets=QUERY_COUNT_BUCKETS
+)
+db_query_seconds_per_request = Histogram(
+    "db_query_seconds_per_request", "Time spent in SQL per HTTP request", ("route",)
+)
+db_pool_checkouts_total = Counter("db_pool_checkouts_total", "Connections checked out of the pool")
+db_pool_connects_total = Counter("db_pool_connects_total", "New DBAPI connections opened by the pool")
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds", "Time waiting for a pooled connection", buckets=QUERY_TIME_BUCKETS
+)
+
+_pool_engines: List[Engine] = []
+
+
+def _pool_status(attribute: str) -> Dict[LabelValues, float]:
+    values = {}
+    for engine in _pool_engines:
+        method = getattr(engine.pool, attribute, None)
+        if callable(method):
+            values[()] = values.get((), 0.0) + float(method())
+    return values
+
+
+db_pool_checked_out = Gauge("db_pool_checked_out", "Connections currently checked out",
+                            collect=lambda: _pool_status("checkedout"))
+db_pool_overflow = Gauge("db_pool_overflow", "Connections opened beyond pool_size",
+                         collect=lambda: _pool_status("overflow"))
+
+# Caches
+cache_hits_total = Counter(
+    "cache_hits_total", "In-process cache hits", ("cache",),
+    collect=lambda: {(name,): c.hits for name, c in CACHES.items()},
+)
+cache_misses_total = Counter(
+    "cache_misses_total", "In-process cache misses", ("cache",),
+    collect=lambda: {(name,): c.misses for name, c in CACHES.items()},
+)
+cache_hit_ratio = Gauge(
+    "cache_hit_ratio", "In-process cache hit ratio", ("cache",),
+    collect=lambda: {(name,): c.hit_ratio for name, c in CACHES.items()},
+)
+cache_entries = Gauge(
+    "cache_entries", "Entries held by in-process caches", ("cache",),
+    collect=lambda: {(name,): len(c) for name, c in CACHES.items()},
+)
+
+process_info = Gauge(
+    "process_worker_info", "API worker process", ("worker_pid",),
+    collect=lambda: {(WORKER_PID,): 1.0},
+)
+process_start_time_seconds = Gauge("process_start_time_seconds", "Worker start time (unix epoch)")
+process_start_time_seconds.set(time.time())
+
+
+def render_metrics() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+def _observe_statement(statement: str, elapsed: float):
+    db_queries_total.inc()
+    db_query_duration_seconds.observe(elapsed)
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    db_pool_checkouts_total.inc()
+
+
+def _on_connect(dbapi_connection, connection_record):
+    db_pool_connects_total.inc()
+
+
+def _time_pool_connect(pool):
+    """Wrap pool.connect() to measure how long callers wait for a connection"""
+    connect = pool.connect
+    if getattr(connect, "__timed__", False):
+        return
+
+    def timed_connect(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return connect(*args, **kwargs)
+        finally:
+            db_pool_checkout_wait_seconds.observe(time.perf_counter() - started)
+
+    timed_connect.__timed__ = True
+    pool.connect = timed_connect
+
+
+def install_sqlalchemy_metrics(engine: Engine):
+    if engine in _pool_engines:
+        return
+    _pool_engines.append(engine)
+    install_query_profiler(engine)
+    if _observe_statement not in statement_observers:
+        statement_observers.append(_observe_statement)
+    event.listen(engine.pool, "checkout", _on_checkout)
+    event.listen(engine.pool, "connect", _on_connect)
+    _time_pool_connect(engine.pool)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, status and SQL usage per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status_code = 500
+        stats = current_query_stats.get()  # Set by QueryProfilerMiddleware when it wraps this one
+        http_requests_in_progress.inc(method=method)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_progress.dec(method=method)
+            route = route_template(scope)
+            http_requests_total.inc(method=method, route=route, status=str(status_code))
+            http_request_duration_seconds.observe(elapsed, method=method, route=route)
+            if stats is not None:
+                db_queries_per_request.observe(stats.count, route=route)
+                db_query_seconds_per_request.observe(stats.seconds, route=route)
@@ -0,0 +1,110 @@
+"""
+Helpers for Alembic revisions (alembic/versions).
+
+Databases in the field were built by Base.metadata.create_all plus the old
+hand-run scripts, so every revision must be safe on a database that already
+has some of its changes: tables, columns and indexes are only created when
+missing. Index builds on PostgreSQL use CREATE INDEX CONCURRENTLY and data
+migrations run in committed id-range batches, so upgrades do not hold long
+locks on large tables such as administration_invoices.
+"""
+from typing import Dict, List, Optional
+import sqlalchemy as sa
+from alembic import op
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def _inspector():
+    return sa.inspect(op.get_bind())
+
+
+def is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def has_table(table: str) -> bool:
+    return _inspector().has_table(table)
+
+
+def has_column(table: str, column: str) -> bool:
+    if not has_table(table):
+        return False
+    return any(c["name"] == column for c in _inspector().get_columns(table))
+
+
+def column_info(table: str, column: str) -> Optional[Dict]:
+    """Reflected column (name, type, nullable, ...) or None"""
+    if not has_table(table):
+        return None
+    return next((c for c in _inspector().get_columns(table) if c["name"] == column), None)
+
+
+def has_index(table: str, name: str) -> bool:
+    if not has_table(table):
+        return False
+    return any(i["name"] == name for i in _inspector().get_indexes(table))
+
+
+def has_foreign_key(table: str, columns: List[str], referred_table: str) -> bool:
+    """Whether a foreign key on columns to referred_table exists, whatever its name (create_all leaves them unnamed on SQLite)"""
+    if not has_table(table):
+        return False
+    return any(
+        fk["constrained_columns"] == columns and fk["referred_table"] == referred_table
+        for fk in _inspector().get_foreign_keys(table)
+    )
+
+
+def create_table_if_missing(name: str, *columns, **kwargs) -> bool:
+    if has_table(name):
+        return False
+    op.create_table(name, *columns, **kwargs)
+    return True
+
+
+def add_column_if_missing(table: str, column: sa.Column) -> bool:
+    """Add a nullable column to an existing table (no-op if the table is absent)"""
+    if not has_table(table) or has_column(table, column.name):
+        return False
+    op.add_column(table, column)
+    return True
+
+
+def create_index_if_missing(name: str, table: str, columns: List[str], unique: bool = False, **kwargs) -> bool:
+    """Create an index; on PostgreSQL it is built CONCURRENTLY, outside the migration transaction"""
+    if has_index(table, name):
+        return False
+    if is_postgresql():
+        with op.get_context().autocommit_block():
+            op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True, **kwargs)
+    else:
+        op.create_index(name, table, columns, unique=unique, **kwargs)
+    return True
+
+
+def batched_update(
+    table: str,
+    assignments: str,
+    where: str = "1 = 1",
+    params: Optional[Dict] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """
+    Run UPDATE table SET assignments WHERE where in id ranges of batch_size,
+    committing each batch so row locks are held only for one batch.
+    """
+    bind = op.get_bind()
+    bounds = bind.execute(sa.text(f"SELECT MIN(id), MAX(id) FROM {table}")).one()
+    if bounds[0] is None:
+        return 0
+
+    statement = sa.text(
+        f"UPDATE {table} SET {assignments} WHERE id >= :batch_lo AND id < :batch_hi AND ({where})"
+    )
+    updated = 0
+    with op.get_context().autocommit_block():
+        for lo in range(bounds[0], bounds[1] + 1, batch_size):
+            result = bind.execute(statement, {**(params or {}), "batch_lo": lo, "batch_hi": lo + batch_size})
+            updated += max(result.rowcount or 0, 0)
+    return updated
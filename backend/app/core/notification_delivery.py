@@ -0,0 +1,381 @@
+"""
+Notification fan-out and delivery.
+
+A notification is expanded into one notification_deliveries row per recipient
+and channel with a single INSERT ... SELECT (broadcasts go to every active user
+of the condominium). Pending rows are then processed in keyset-paginated
+batches: each batch is split across a bounded thread pool, every send passes
+through a shared token-bucket rate limiter, and the outcome is written back
+with bulk updates. This runs inside the 'deliver_notification' background job,
+never in the API request.
+
+Channels are pluggable: subclass DeliveryChannel and call register_channel().
+"""
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.message import EmailMessage
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import and_, exists, insert, literal, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.jobs import JobError
+from app.models.notification import (
+    DeliveryStatus,
+    Notification,
+    NotificationDelivery,
+    WebPushSubscription,
+)
+from app.models.user import User, UserCondominium
+
+logger = logging.getLogger(__name__)
+
+DeliveryResult = Tuple[int, DeliveryStatus, Optional[str]]
+
+
+class SkipDelivery(Exception):
+    """The recipient cannot be reached through this channel"""
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by all delivery workers"""
+
+    def __init__(self, rate_per_second: float, burst: Optional[float] = None):
+        self.rate = max(rate_per_second, 0.001)
+        self.capacity = burst or max(1.0, self.rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class DeliveryChannel(ABC):
+    """Base class for delivery channels; one connection is opened per chunk"""
+    name = ""
+
+    def unavailable_reason(self) -> Optional[str]:
+        return None
+
+    def recipients_query(self, base):
+        """Restrict the recipient select (User.id, ...) to users reachable by this channel"""
+        return base
+
+    def open(self):
+        return None
+
+    def close(self, connection):
+        pass
+
+    @abstractmethod
+    def send(self, connection, recipient: dict, notification: dict):
+        """Deliver to one recipient; raise SkipDelivery when it is unreachable through this channel"""
+
+
+class EmailChannel(DeliveryChannel):
+    name = "email"
+
+    def recipients_query(self, base):
+        return base.where(User.email.isnot(None))
+
+    def open(self):
+        import smtplib
+
+        connection = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=10)
+        if settings.SMTP_USE_TLS:
+            connection.starttls()
+        if settings.SMTP_USER:
+            connection.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        return connection
+
+    def close(self, connection):
+        try:
+            connection.quit()
+        except Exception:
+            pass
+
+    def send(self, connection, recipient: dict, notification: dict):
+        if not recipient.get("email"):
+            raise SkipDelivery("User has no email")
+        message = EmailMessage()
+        message["From"] = settings.SMTP_FROM
+        message["To"] = recipient["email"]
+        message["Subject"] = notification["title"]
+        message.set_content(notification["message"])
+        connection.send_message(message)
+
+
+class WebPushChannel(DeliveryChannel):
+    name = "web_push"
+
+    def unavailable_reason(self) -> Optional[str]:
+        try:
+            import pywebpush  # noqa: F401
+        except ImportError:
+            return "pywebpush is not installed"
+        if not settings.VAPID_PRIVATE_KEY:
+            return "VAPID_PRIVATE_KEY is not configured"
+        return None
+
+    def recipients_query(self, base):
+        return base.where(exists().where(WebPushSubscription.user_id == User.id))
+
+    def send(self, connection, recipient: dict, notification: dict):
+        from pywebpush import webpush
+
+        subscriptions = recipient.get("subscriptions") or []
+        if not subscriptions:
+            raise SkipDelivery("User has no push subscriptions")
+        data = json.dumps({
+            "title": notification["title"],
+            "body": notification["message"],
+            "notification_id": notification["id"],
+            "type": notification["notification_type"],
+        })
+        for sub in subscriptions:
+            webpush(
+                subscription_info={"endpoint": sub["endpoint"], "keys": {"p256dh": sub["p256dh"], "auth": sub["auth"]}},
+                data=data,
+                vapid_private_key=settings.VAPID_PRIVATE_KEY,
+                vapid_claims={"sub": settings.VAPID_CLAIMS_EMAIL},
+            )
+
+
+CHANNELS: Dict[str, DeliveryChannel] = {}
+
+
+def register_channel(channel: DeliveryChannel):
+    CHANNELS[channel.name] = channel
+
+
+register_channel(EmailChannel())
+register_channel(WebPushChannel())
+
+
+def enabled_channels() -> List[DeliveryChannel]:
+    channels = []
+    for name in settings.NOTIFICATION_CHANNELS:
+        channel = CHANNELS.get(name)
+        if not channel:
+            logger.warning(f"[DELIVERY] Unknown channel '{name}'")
+            continue
+        reason = channel.unavailable_reason()
+        if reason:
+            logger.info(f"[DELIVERY] Channel '{name}' disabled: {reason}")
+            continue
+        channels.append(channel)
+    return channels
+
+
+def expand_deliveries(db: Session, notification: Notification, channels: List[DeliveryChannel]) -> int:
+    """Create the missing delivery rows for every recipient and channel (caller commits)"""
+    created = 0
+    for channel in channels:
+        recipients = select(literal(notification.id), User.id, literal(channel.name)).where(User.is_active == True)
+        if notification.user_id:
+            recipients = recipients.where(User.id == notification.user_id)
+        else:
+            recipients = recipients.join(UserCondominium, UserCondominium.user_id == User.id).where(
+                UserCondominium.condominium_id == notification.condominium_id
+            )
+        recipients = channel.recipients_query(recipients).where(
+            ~exists().where(and_(
+                NotificationDelivery.notification_id == notification.id,
+                NotificationDelivery.user_id == User.id,
+                NotificationDelivery.channel == channel.name,
+            ))
+        ).distinct()
+        result = db.execute(
+            insert(NotificationDelivery).from_select(["notification_id", "user_id", "channel"], recipients)
+        )
+        created += max(result.rowcount or 0, 0)
+    return created
+
+
+def _send_chunk(channel: DeliveryChannel, recipients: List[dict], notification: dict, limiter: RateLimiter) -> List[DeliveryResult]:
+    try:
+        connection = channel.open()
+    except Exception as e:
+        return [(r["delivery_id"], DeliveryStatus.FAILED, f"{type(e).__name__}: {e}") for r in recipients]
+
+    results = []
+    try:
+        for recipient in recipients:
+            limiter.acquire()
+            try:
+                channel.send(connection, recipient, notification)
+                results.append((recipient["delivery_id"], DeliveryStatus.SENT, None))
+            except SkipDelivery as e:
+                results.append((recipient["delivery_id"], DeliveryStatus.SKIPPED, str(e)))
+            except Exception as e:
+                results.append((recipient["delivery_id"], DeliveryStatus.FAILED, f"{type(e).__name__}: {e}"))
+    finally:
+        channel.close(connection)
+    return results
+
+
+def _chunks(items: list, parts: int) -> List[list]:
+    size = max(1, -(-len(items) // max(parts, 1)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def deliver_notification(
+    db: Session,
+    notification_id: int,
+    condominium_id: int,
+    progress: Optional[Callable[[float, Optional[str]], None]] = None,
+) -> Dict[str, int]:
+    """Expand and send a notification of condominium_id; returns counts per delivery status"""
+    progress = progress or (lambda percent, message=None: None)
+    notification = db.query(Notification).filter(Notification.id == notification_id).first()
+    if not notification:
+        return {}
+    if notification.condominium_id != condominium_id:
+        raise JobError("The notification does not belong to the job's condominium")
+
+    channels = enabled_channels()
+    by_name = {c.name: c for c in channels}
+    expand_deliveries(db, notification, channels)
+    db.commit()
+
+    payload = {
+        "id": notification.id,
+        "title": notification.title,
+        "message": notification.message,
+        "notification_type": notification.notification_type,
+    }
+    total_pending = db.query(NotificationDelivery.id).filter(
+        NotificationDelivery.notification_id == notification_id,
+        NotificationDelivery.status == DeliveryStatus.PENDING,
+    ).count()
+    progress(5.0, f"{total_pending} envío(s) pendientes")
+
+    limiter = RateLimiter(settings.NOTIFICATION_DELIVERY_RATE_PER_SECOND)
+    workers = max(1, settings.NOTIFICATION_DELIVERY_WORKERS)
+    counts = {status.value: 0 for status in DeliveryStatus}
+    processed = 0
+    last_id = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while True:
+            batch = (
+                db.query(NotificationDelivery.id, NotificationDelivery.user_id, NotificationDelivery.channel, User.email, User.full_name)
+                .join(User, User.id == NotificationDelivery.user_id)
+                .filter(
+                    NotificationDelivery.notification_id == notification_id,
+                    NotificationDelivery.status == DeliveryStatus.PENDING,
+                    NotificationDelivery.id > last_id,
+                )
+                .order_by(NotificationDelivery.id)
+                .limit(settings.NOTIFICATION_DELIVERY_BATCH_SIZE)
+                .all()
+            )
+            if not batch:
+                break
+            last_id = batch[-1].id
+
+            by_channel: Dict[str, List[dict]] = {}
+            for row in batch:
+                by_channel.setdefault(row.channel, []).append({
+                    "delivery_id": row.id,
+                    "user_id": row.user_id,
+                    "email": row.email,
+                    "full_name": row.full_name,
+                })
+
+            if "web_push" in by_channel:
+                user_ids = {r["user_id"] for r in by_channel["web_push"]}
+                subscriptions: Dict[int, List[dict]] = {}
+                for sub in db.query(WebPushSubscription).filter(WebPushSubscription.user_id.in_(user_ids)).all():
+                    subscriptions.setdefault(sub.user_id, []).append(
+                        {"endpoint": sub.endpoint, "p256dh": sub.p256dh, "auth": sub.auth}
+                    )
+                for r in by_channel["web_push"]:
+                    r["subscriptions"] = subscriptions.get(r["user_id"], [])
+
+            futures = []
+            results: List[DeliveryResult] = []
+            for channel_name, recipients in by_channel.items():
+                channel = by_name.get(channel_name)
+                if not channel:
+                    results.extend((r["delivery_id"], DeliveryStatus.SKIPPED, "Channel disabled") for r in recipients)
+                    continue
+                for chunk in _chunks(recipients, workers):
+                    futures.append(pool.submit(_send_chunk, channel, chunk, payload, limiter))
+            for future in futures:
+                results.extend(future.result())
+
+            now = datetime.utcnow()
+            sent_ids = [delivery_id for delivery_id, status, _ in results if status == DeliveryStatus.SENT]
+            if sent_ids:
+                db.query(NotificationDelivery).filter(NotificationDelivery.id.in_(sent_ids)).update(
+                    {
+                        NotificationDelivery.status: DeliveryStatus.SENT,
+                        NotificationDelivery.sent_at: now,
+                        NotificationDelivery.attempts: NotificationDelivery.attempts + 1,
+                        NotificationDelivery.error: None,
+                    },
+                    synchronize_session=False,
+                )
+            others = [
+                {"id": delivery_id, "status": status, "error": error}
+                for delivery_id, status, error in results if status != DeliveryStatus.SENT
+            ]
+            if others:
+                db.bulk_update_mappings(NotificationDelivery, others)
+                db.query(NotificationDelivery).filter(
+                    NotificationDelivery.id.in_([o["id"] for o in others])
+                ).update(
+                    {NotificationDelivery.attempts: NotificationDelivery.attempts + 1},
+                    synchronize_session=False,
+                )
+            db.commit()
+
+            for _, status, _ in results:
+                counts[status.value] += 1
+            processed += len(results)
+            if total_pending:
+                progress(5.0 + 95.0 * min(processed / total_pending, 1.0), f"{processed}/{total_pending} envío(s)")
+
+    return counts
+
+
+def deliver_notifications(
+    db: Session,
+    notification_ids: List[int],
+    condominium_id: int,
+    progress: Optional[Callable[[float, Optional[str]], None]] = None,
+) -> Dict[str, int]:
+    """Deliver several notifications of condominium_id in one job (payment reminder runs); returns the summed counts"""
+    progress = progress or (lambda percent, message=None: None)
+    # Checked before anything is sent: a foreign id rejects the whole batch
+    foreign = db.query(Notification.id).filter(
+        Notification.id.in_(notification_ids),
+        Notification.condominium_id != condominium_id,
+    ).first()
+    if foreign:
+        raise JobError("The notifications do not belong to the job's condominium")
+    counts = {status.value: 0 for status in DeliveryStatus}
+    total = len(notification_ids)
+    for index, notification_id in enumerate(notification_ids):
+        def scaled(percent: float, message: Optional[str] = None, index=index):
+            progress(100.0 * (index + percent / 100.0) / total, f"{index + 1}/{total}: {message}" if message else None)
+
+        for status, count in deliver_notification(db, notification_id, condominium_id, scaled).items():
+            counts[status] = counts.get(status, 0) + count
+    progress(100.0, f"{total} notificación(es) entregadas")
+    return counts
@@ -0,0 +1,82 @@
+"""
+Temporal ownership of properties.
+
+PropertyResident rows are never deleted when residents change: the link is
+closed by setting end_date and a new link is opened, so the table is the
+ownership history of every unit. A link is active at instant t when
+
+    start_date <= t AND (end_date IS NULL OR end_date > t)
+
+which ix_property_residents_property_period (property_id, start_date,
+end_date) answers with an index range scan per property.
+
+Links are opened at the current instant and closed by setting end_date to
+the current instant, so the current links are exactly those with end_date
+IS NULL. current_link() is that predicate, shared by every "current
+residents" query (listings, /auth/me, quorum, statements, reminders) and
+mirrored by the Property.current_residents relationship.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session, joinedload
+from app.models.property import PropertyResident
+
+
+def current_link():
+    """Condition selecting the current PropertyResident links (same as active_at(now))"""
+    return PropertyResident.end_date.is_(None)
+
+
+def active_at(as_of: datetime):
+    """Condition selecting the PropertyResident links active at as_of"""
+    return and_(
+        PropertyResident.start_date <= as_of,
+        or_(PropertyResident.end_date.is_(None), PropertyResident.end_date > as_of),
+    )
+
+
+def links_as_of(
+    db: Session, property_ids: Iterable[int], as_of: Optional[datetime] = None, with_residents: bool = False
+) -> Dict[int, List[PropertyResident]]:
+    """Links active at as_of (now by default) for several properties, in one query"""
+    property_ids = list(property_ids)
+    if not property_ids:
+        return {}
+    stmt = select(PropertyResident).where(
+        PropertyResident.property_id.in_(property_ids),
+        active_at(as_of or datetime.utcnow()),
+    ).order_by(PropertyResident.property_id, PropertyResident.start_date, PropertyResident.id)
+    if with_residents:
+        stmt = stmt.options(joinedload(PropertyResident.resident))
+
+    result = defaultdict(list)
+    for link in db.execute(stmt).scalars():
+        result[link.property_id].append(link)
+    return dict(result)
+
+
+def ownership_as_of(db: Session, property_ids: Iterable[int], as_of: Optional[datetime] = None) -> Dict[int, Dict[int, float]]:
+    """{property_id: {resident_id: ownership_percentage}} at as_of: the voting weights of assembly quorum"""
+    property_ids = list(property_ids)
+    if not property_ids:
+        return {}
+    rows = db.execute(
+        select(PropertyResident.property_id, PropertyResident.resident_id, PropertyResident.ownership_percentage)
+        .where(PropertyResident.property_id.in_(property_ids), active_at(as_of or datetime.utcnow()))
+    ).all()
+    result = defaultdict(dict)
+    for property_id, resident_id, percentage in rows:
+        result[property_id][resident_id] = percentage
+    return dict(result)
+
+
+def ownership_history(db: Session, property_id: int) -> List[PropertyResident]:
+    """Every link of a property, oldest first"""
+    return db.execute(
+        select(PropertyResident)
+        .options(joinedload(PropertyResident.resident))
+        .where(PropertyResident.property_id == property_id)
+        .order_by(PropertyResident.start_date, PropertyResident.id)
+    ).scalars().all()
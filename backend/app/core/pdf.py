@@ -0,0 +1,100 @@
+"""
+Minimal streaming PDF writer for tabular text reports (estados de cuenta, listados).
+
+Pages are emitted as soon as they are full, so a report is never held entirely in
+memory. Only the byte offsets of each object are kept to build the xref table.
+"""
+from typing import Iterable, Iterator, List, Optional
+
+PAGE_WIDTH = 595  # A4 in points
+PAGE_HEIGHT = 842
+MARGIN = 40
+FONT_SIZE = 8
+LEADING = 11
+
+# Fixed object numbers; pages start at FIRST_PAGE_OBJ (page, content) pairs
+CATALOG_OBJ = 1
+PAGES_OBJ = 2
+FONT_OBJ = 3
+FIRST_PAGE_OBJ = 4
+
+
+def _escape(text: str) -> bytes:
+    """Encode a line for a PDF string literal (WinAnsi, escaped parentheses)"""
+    raw = text.encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+class StreamingPDFWriter:
+    """Incrementally serialize a text-only, monospaced PDF document"""
+
+    def __init__(self, title: str = "", header_lines: Optional[List[str]] = None):
+        self.title = title
+        self.header_lines = header_lines or []
+        self.lines_per_page = (PAGE_HEIGHT - 2 * MARGIN) // LEADING
+        self.offsets = {}
+        self.position = 0
+        self.page_objs: List[int] = []
+
+    def _emit(self, data: bytes) -> bytes:
+        self.position += len(data)
+        return data
+
+    def _object(self, number: int, body: bytes) -> bytes:
+        self.offsets[number] = self.position
+        return self._emit(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    def _page(self, lines: List[str]) -> bytes:
+        page_obj = FIRST_PAGE_OBJ + 2 * len(self.page_objs)
+        content_obj = page_obj + 1
+        self.page_objs.append(page_obj)
+
+        top = PAGE_HEIGHT - MARGIN
+        stream = [b"BT /F1 %d Tf %d TL %d %d Td" % (FONT_SIZE, LEADING, MARGIN, top)]
+        for line in lines:
+            stream.append(b"(" + _escape(line) + b") Tj T*")
+        stream.append(b"ET")
+        content = b"\n".join(stream)
+
+        out = self._object(page_obj, (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+            % (PAGES_OBJ, PAGE_WIDTH, PAGE_HEIGHT, FONT_OBJ, content_obj)
+        ))
+        out += self._object(content_obj, (
+            b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+        ))
+        return out
+
+    def stream(self, lines: Iterable[str]) -> Iterator[bytes]:
+        """Yield the PDF bytes, one chunk per page, for the given text lines"""
+        yield self._emit(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        yield self._object(CATALOG_OBJ, b"<< /Type /Catalog /Pages %d 0 R >>" % PAGES_OBJ)
+        yield self._object(FONT_OBJ, (
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>"
+        ))
+
+        heading = ([self.title, ""] if self.title else []) + self.header_lines
+        page: List[str] = list(heading)
+        for line in lines:
+            if len(page) >= self.lines_per_page:
+                yield self._page(page)
+                page = list(self.header_lines)
+            page.append(line)
+        if page or not self.page_objs:
+            yield self._page(page)
+
+        kids = b" ".join(b"%d 0 R" % n for n in self.page_objs)
+        yield self._object(PAGES_OBJ, (
+            b"<< /Type /Pages /Kids [" + kids + b"] /Count %d >>" % len(self.page_objs)
+        ))
+
+        total_objs = FIRST_PAGE_OBJ + 2 * len(self.page_objs)
+        xref_start = self.position
+        xref = [b"xref\n0 %d\n" % total_objs, b"0000000000 65535 f \n"]
+        for number in range(1, total_objs):
+            xref.append(b"%010d 00000 n \n" % self.offsets[number])
+        trailer = b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+            total_objs, CATALOG_OBJ, xref_start
+        )
+        yield self._emit(b"".join(xref) + trailer)
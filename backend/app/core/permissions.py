@@ -91,3 +91,14 @@ def can_manage_budgets(user: User) -> bool:
     user_roles = [ur.role.name for ur in (user.user_roles or []) if ur.role]
     return any(role in user_roles for role in [Role.SUPER_ADMIN, Role.ADMIN, Role.ACCOUNTANT])
 
+
+def can_send_notifications(user: User) -> bool:
+    """Check if user can create and deliver notifications"""
+    user_roles = [ur.role.name for ur in (user.user_roles or []) if ur.role]
+    return any(role in user_roles for role in [Role.SUPER_ADMIN, Role.ADMIN])
+
+
+def can_manage_documents(user: User) -> bool:
+    """Check if user can upload and reprocess documents"""
+    user_roles = [ur.role.name for ur in (user.user_roles or []) if ur.role]
+    return any(role in user_roles for role in [Role.SUPER_ADMIN, Role.ADMIN])
@@ -0,0 +1,382 @@
+"""
+Bulk onboarding of blocks, properties, residents and ownership links from a
+spreadsheet (CSV or XLSX).
+
+Every row describes one unit and, optionally, one of its residents:
+
+    block, property_code, property_type, area,
+    full_name, document_type, document_number, email, phone,
+    is_owner, ownership_percentage
+
+Rows are read as a stream and validated against in-memory indexes of the
+condominium's existing blocks (by name), properties (by block and code, since
+each block numbers its own units), residents (by document number) and current
+links, loaded with one query each. A row without a block matches the unit with
+that code when only one block has it. Units and
+people repeated across rows are created once. Valid rows are inserted in
+batches inside the caller's transaction; invalid rows are skipped and
+reported with their row number.
+
+XLSX files need openpyxl (optional dependency); CSV needs nothing extra.
+"""
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.search import reindex_entities
+from app.core.ownership import current_link
+from app.models.block import Block
+from app.models.property import Property, PropertyResident
+from app.models.resident import Resident
+from app.schemas.property import PropertyImportResponse, PropertyImportRowError
+
+COLUMNS = [
+    "block", "property_code", "property_type", "area",
+    "full_name", "document_type", "document_number", "email", "phone",
+    "is_owner", "ownership_percentage",
+]
+
+# Spanish headers used by the administrators' own spreadsheets
+COLUMN_ALIASES = {
+    "bloque": "block", "manzana": "block", "torre": "block",
+    "codigo": "property_code", "código": "property_code", "unidad": "property_code", "code": "property_code",
+    "tipo": "property_type", "type": "property_type",
+    "area_m2": "area", "área": "area",
+    "nombre": "full_name", "nombre_completo": "full_name", "name": "full_name",
+    "tipo_documento": "document_type",
+    "documento": "document_number", "numero_documento": "document_number", "número_documento": "document_number",
+    "correo": "email", "telefono": "phone", "teléfono": "phone",
+    "titular": "is_owner", "propietario": "is_owner",
+    "porcentaje": "ownership_percentage", "porcentaje_propiedad": "ownership_percentage",
+}
+
+TRUE_VALUES = {"1", "true", "yes", "si", "sí", "x"}
+RESIDENT_COLUMNS = ("full_name", "document_type", "document_number", "email", "phone")
+
+
+PropertyKey = Tuple[str, str]  # (block name in lower case or "", code in upper case)
+
+
+class ImportFileError(ValueError):
+    """The file as a whole cannot be read (format, header, size)"""
+
+
+def _normalize_header(name) -> str:
+    key = str(name or "").strip().lower().replace(" ", "_")
+    return COLUMN_ALIASES.get(key, key)
+
+
+def _clean(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Spreadsheet numbers such as document 1020304.0
+    return str(value).strip()
+
+
+def _rows_from_header(header, rows) -> Iterator[Tuple[int, Dict[str, str]]]:
+    columns = [_normalize_header(name) for name in header]
+    if "property_code" not in columns:
+        raise ImportFileError("The file must have a property_code column")
+    for number, values in enumerate(rows, start=2):  # Row 1 is the header
+        row = {column: _clean(value) for column, value in zip(columns, values) if column in COLUMNS}
+        if any(row.values()):
+            yield number, row
+
+
+def read_csv_rows(stream: BinaryIO) -> Iterator[Tuple[int, Dict[str, str]]]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")  # Spanish Excel exports use ';'
+    except csv.Error:
+        dialect = csv.excel
+    reader = csv.reader(text, dialect)
+    header = next(reader, None)
+    if not header:
+        raise ImportFileError("The file is empty")
+    yield from _rows_from_header(header, reader)
+
+
+def read_xlsx_rows(stream: BinaryIO) -> Iterator[Tuple[int, Dict[str, str]]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError("XLSX import requires openpyxl; install it or upload a CSV file")
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            raise ImportFileError("The file is empty")
+        yield from _rows_from_header(header, rows)
+    finally:
+        workbook.close()
+
+
+def read_rows(stream: BinaryIO, filename: str) -> Iterator[Tuple[int, Dict[str, str]]]:
+    name = (filename or "").lower()
+    if name.endswith(".xlsx"):
+        return read_xlsx_rows(stream)
+    if name.endswith((".csv", ".txt")):
+        return read_csv_rows(stream)
+    raise ImportFileError("Unsupported file type; upload a .csv or .xlsx file")
+
+
+@dataclass
+class _NewProperty:
+    code: str
+    type: str
+    block: str
+    area: Optional[float]
+
+
+@dataclass
+class PropertyImporter:
+    """Validates rows against in-memory indexes, then writes everything in batches"""
+    db: Session
+    condominium_id: int
+    errors: List[PropertyImportRowError] = field(default_factory=list)
+    rows_read: int = 0
+    rows_valid: int = 0
+    links_existing: int = 0
+
+    def __post_init__(self):
+        cid = self.condominium_id
+        self.blocks: Dict[str, int] = {
+            name.strip().lower(): block_id
+            for block_id, name in self.db.execute(select(Block.id, Block.name).where(Block.condominium_id == cid))
+        }
+        self.block_keys: Dict[int, str] = {block_id: key for key, block_id in self.blocks.items()}
+        self.properties: Dict[PropertyKey, Tuple[int, str]] = {}
+        self.code_blocks: Dict[str, Set[str]] = {}  # code -> block keys having it (existing and new)
+        for property_id, code, block_id, type in self.db.execute(
+            select(Property.id, Property.code, Property.block_id, Property.type)
+            .where(Property.condominium_id == cid).order_by(Property.id)
+        ):
+            key = self._property_key(block_id, code)
+            self.properties.setdefault(key, (property_id, type))
+            self.code_blocks.setdefault(key[1], set()).add(key[0])
+        self.residents: Dict[str, int] = {}
+        for resident_id, document in self.db.execute(
+            select(Resident.id, Resident.document_number)
+            .where(Resident.condominium_id == cid, Resident.document_number.isnot(None))
+            .order_by(Resident.id)
+        ):
+            self.residents.setdefault(self._document_key(document), resident_id)
+        self.links: Set[Tuple[int, int]] = set(self.db.execute(
+            select(PropertyResident.property_id, PropertyResident.resident_id)
+            .join(Property, Property.id == PropertyResident.property_id)
+            .where(Property.condominium_id == cid, current_link())
+        ).all())
+
+        self.new_blocks: Dict[str, str] = {}  # key -> display name
+        self.new_properties: Dict[PropertyKey, _NewProperty] = {}
+        self.new_residents: Dict[str, dict] = {}
+        self.new_links: Dict[Tuple[PropertyKey, str], float] = {}  # (property key, resident key) -> percentage
+
+    @staticmethod
+    def _document_key(document: str) -> str:
+        return "".join(ch for ch in document.upper() if ch.isalnum())
+
+    def _property_key(self, block_id: Optional[int], code: str) -> PropertyKey:
+        return (self.block_keys.get(block_id, "") if block_id else "", code.strip().upper())
+
+    def _error(self, row: int, field_name: Optional[str], message: str):
+        self.errors.append(PropertyImportRowError(row=row, field=field_name, message=message))
+
+    def add_row(self, number: int, row: Dict[str, str]):
+        self.rows_read += 1
+        errors_before = len(self.errors)
+
+        code = row.get("property_code", "")
+        if not code:
+            self._error(number, "property_code", "property_code is required")
+            return
+        block_name = row.get("block", "")
+        block_key = block_name.lower()
+        property_key = (block_key, code.upper())
+        property_type = row.get("property_type", "").lower()
+        if not block_key and property_key not in self.properties and property_key not in self.new_properties:
+            blocks_with_code = self.code_blocks.get(property_key[1], set())
+            if len(blocks_with_code) > 1:
+                self._error(number, "block", f"Property {code} exists in several blocks; block is required")
+                return
+            if blocks_with_code:
+                property_key = (next(iter(blocks_with_code)), property_key[1])
+
+        area = None
+        if row.get("area"):
+            try:
+                area = float(row["area"].replace(",", "."))
+            except ValueError:
+                self._error(number, "area", f"Invalid area: {row['area']}")
+
+        # Properties: existing in the database, defined by an earlier row, or new
+        existing = self.properties.get(property_key)
+        defined = self.new_properties.get(property_key)
+        if existing:
+            _, existing_type = existing
+            if property_type and property_type != (existing_type or "").lower():
+                self._error(number, "property_type", f"Property {code} already exists with type {existing_type}")
+        elif defined:
+            if property_type and property_type != defined.type:
+                self._error(number, "property_type", f"Property {code} appears earlier with type {defined.type}")
+        elif not property_type:
+            self._error(number, "property_type", "property_type is required for new properties")
+
+        # Resident (optional)
+        resident_key = None
+        if any(row.get(column) for column in RESIDENT_COLUMNS):
+            document = row.get("document_number", "")
+            if not document:
+                self._error(number, "document_number", "document_number is required to import a resident")
+            else:
+                resident_key = self._document_key(document)
+                if resident_key not in self.residents and resident_key not in self.new_residents and not row.get("full_name"):
+                    self._error(number, "full_name", "full_name is required for new residents")
+            email = row.get("email", "")
+            if email and "@" not in email:
+                self._error(number, "email", f"Invalid email: {email}")
+
+        percentage = 0.0
+        if row.get("is_owner", "").lower() in TRUE_VALUES:
+            percentage = 100.0
+        elif row.get("ownership_percentage"):
+            try:
+                percentage = float(row["ownership_percentage"].replace(",", ".").rstrip("%"))
+            except ValueError:
+                self._error(number, "ownership_percentage", f"Invalid percentage: {row['ownership_percentage']}")
+            if not 0 <= percentage <= 100:
+                self._error(number, "ownership_percentage", "ownership_percentage must be between 0 and 100")
+
+        if len(self.errors) > errors_before:
+            return
+
+        # Valid row: register what it adds
+        self.rows_valid += 1
+        if block_key and block_key not in self.blocks:
+            self.new_blocks.setdefault(block_key, block_name)
+        if not existing and not defined:
+            self.new_properties[property_key] = _NewProperty(code=code, type=property_type, block=block_name, area=area)
+            self.code_blocks.setdefault(property_key[1], set()).add(property_key[0])
+        if resident_key is None:
+            return
+        if resident_key not in self.residents and resident_key not in self.new_residents:
+            self.new_residents[resident_key] = {
+                "condominium_id": self.condominium_id,
+                "full_name": row["full_name"],
+                "document_type": row.get("document_type") or None,
+                "document_number": row["document_number"],
+                "email": row.get("email") or None,
+                "phone": row.get("phone") or None,
+            }
+        resident_id = self.residents.get(resident_key)
+        if existing and resident_id and (existing[0], resident_id) in self.links:
+            self.links_existing += 1
+            return
+        self.new_links[(property_key, resident_key)] = percentage
+
+    def _insert_returning(self, model, rows: List[dict], *columns) -> List[tuple]:
+        returned = []
+        for start in range(0, len(rows), settings.IMPORT_BATCH_SIZE):
+            returned.extend(self.db.execute(
+                insert(model).returning(*columns), rows[start:start + settings.IMPORT_BATCH_SIZE]
+            ).all())
+        return returned
+
+    def write(self) -> dict:
+        """Insert blocks, properties, residents and links in batches; the caller commits"""
+        if self.new_blocks:
+            for block_id, name in self._insert_returning(
+                Block, [{"condominium_id": self.condominium_id, "name": name} for name in self.new_blocks.values()],
+                Block.id, Block.name,
+            ):
+                self.blocks[name.strip().lower()] = block_id
+                self.block_keys[block_id] = name.strip().lower()
+            reindex_entities(self.db, Block, [self.blocks[key] for key in self.new_blocks])
+
+        if self.new_properties:
+            rows = [
+                {
+                    "condominium_id": self.condominium_id,
+                    "code": p.code,
+                    "type": p.type,
+                    "block_id": self.blocks.get(p.block.lower()) if p.block else None,
+                    "area": p.area,
+                }
+                for p in self.new_properties.values()
+            ]
+            for property_id, code, block_id, type in self._insert_returning(
+                Property, rows, Property.id, Property.code, Property.block_id, Property.type
+            ):
+                self.properties[self._property_key(block_id, code)] = (property_id, type)
+            reindex_entities(self.db, Property, [self.properties[key][0] for key in self.new_properties])
+
+        if self.new_residents:
+            for resident_id, document in self._insert_returning(
+                Resident, list(self.new_residents.values()), Resident.id, Resident.document_number
+            ):
+                self.residents[self._document_key(document)] = resident_id
+            reindex_entities(self.db, Resident, [self.residents[key] for key in self.new_residents])
+
+        now = datetime.utcnow()
+        links = []
+        for (property_key, resident_key), percentage in self.new_links.items():
+            pair = (self.properties[property_key][0], self.residents[resident_key])
+            if pair in self.links:
+                self.links_existing += 1
+                continue
+            self.links.add(pair)
+            links.append({
+                "property_id": pair[0],
+                "resident_id": pair[1],
+                "start_date": now,
+                "end_date": None,
+                "ownership_percentage": percentage,
+            })
+        for start in range(0, len(links), settings.IMPORT_BATCH_SIZE):
+            self.db.execute(insert(PropertyResident), links[start:start + settings.IMPORT_BATCH_SIZE])
+
+        return {
+            "blocks_created": len(self.new_blocks),
+            "properties_created": len(self.new_properties),
+            "residents_created": len(self.new_residents),
+            "links_created": len(links),
+        }
+
+
+def import_properties(
+    db: Session, condominium_id: int, stream: BinaryIO, filename: str, dry_run: bool = False
+) -> PropertyImportResponse:
+    """Validate and import a spreadsheet; with dry_run nothing is written. The caller commits."""
+    importer = PropertyImporter(db, condominium_id)
+    for number, row in read_rows(stream, filename):
+        if importer.rows_read >= settings.IMPORT_MAX_ROWS:
+            raise ImportFileError(f"The file has more than {settings.IMPORT_MAX_ROWS} rows")
+        importer.add_row(number, row)
+
+    if dry_run:
+        created = {
+            "blocks_created": len(importer.new_blocks),
+            "properties_created": len(importer.new_properties),
+            "residents_created": len(importer.new_residents),
+            "links_created": len(importer.new_links),
+        }
+    else:
+        created = importer.write()
+
+    return PropertyImportResponse(
+        dry_run=dry_run,
+        rows_read=importer.rows_read,
+        rows_imported=importer.rows_valid,
+        rows_failed=importer.rows_read - importer.rows_valid,
+        links_existing=importer.links_existing,
+        errors=importer.errors,
+        **created,
+    )
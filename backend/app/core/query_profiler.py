@@ -0,0 +1,180 @@
+"""
+Per-request SQL profiling.
+
+SQLAlchemy cursor events count the statements and time spent in SQL for the
+current request (QueryProfilerMiddleware keeps a QueryStats in a context
+variable). Requests over SQL_QUERY_BUDGET statements or
+SQL_REQUEST_TIME_BUDGET_MS are logged with their most repeated statements,
+which is usually enough to spot an N+1 lazy load; single statements slower
+than SQL_SLOW_QUERY_MS are logged as they finish.
+
+In tests, assert_max_queries() fails when a block issues more statements
+than expected:
+
+    with assert_max_queries(6):
+        client.get("/api/auth/me", headers=headers)
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+UNMATCHED_ROUTE = "unmatched"
+MAX_KEPT_STATEMENTS = 1000  # Per request; the count keeps going past it
+
+
+class QueryStats:
+    """SQL statements executed while handling one request (or one profiled block)"""
+    __slots__ = ("count", "seconds", "statements")
+
+    def __init__(self, keep_statements: bool = False):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements: Optional[List[Tuple[str, float]]] = [] if keep_statements else None
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.seconds += elapsed
+        if self.statements is not None and len(self.statements) < MAX_KEPT_STATEMENTS:
+            self.statements.append((statement, elapsed))
+
+    def report(self, limit: int = 10) -> str:
+        """Most repeated statements (by normalized text) with their counts and total time"""
+        if not self.statements:
+            return ""
+        counts = Counter()
+        seconds = Counter()
+        for statement, elapsed in self.statements:
+            key = normalize_statement(statement)
+            counts[key] += 1
+            seconds[key] += elapsed
+        lines = [
+            f"  {counts[key]}x {seconds[key] * 1000:.1f} ms  {key}"
+            for key, _ in counts.most_common(limit)
+        ]
+        return "\n".join(lines)
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+# Called with (statement, seconds) after every statement (used by app.core.metrics)
+statement_observers: List[Callable[[str, float], None]] = []
+
+# Process-wide recorders opened by assert_max_queries(); they see statements
+# from every thread, including the TestClient's event loop thread
+_recorders: List[QueryStats] = []
+
+
+def normalize_statement(statement: str) -> str:
+    return re.sub(r"\s+", " ", statement).strip()[:300]
+
+
+def route_template(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+    for recorder in _recorders:
+        recorder.record(statement, elapsed)
+    for observer in statement_observers:
+        observer(statement, elapsed)
+
+    if settings.SQL_SLOW_QUERY_MS and elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        logger.warning(f"[SQL] Slow statement ({elapsed * 1000:.1f} ms): {normalize_statement(statement)}")
+
+
+def install_query_profiler(engine: Engine):
+    if event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries(keep_statements: bool = True):
+    """Count the statements issued by the current context (thread or task)"""
+    stats = QueryStats(keep_statements=keep_statements)
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int):
+    """Test helper: raise AssertionError if the block issues more than limit statements"""
+    recorder = QueryStats(keep_statements=True)
+    _recorders.append(recorder)
+    try:
+        yield recorder
+    finally:
+        _recorders.remove(recorder)
+    if recorder.count > limit:
+        raise AssertionError(
+            f"Expected at most {limit} SQL statements, got {recorder.count}:\n{recorder.report()}"
+        )
+
+
+def check_query_budget(method: str, route: str, stats: QueryStats, elapsed: float) -> bool:
+    """Log the request if it went over the statement or SQL time budget"""
+    over_count = settings.SQL_QUERY_BUDGET and stats.count > settings.SQL_QUERY_BUDGET
+    over_time = settings.SQL_REQUEST_TIME_BUDGET_MS and stats.seconds * 1000 > settings.SQL_REQUEST_TIME_BUDGET_MS
+    if not (over_count or over_time):
+        return False
+    logger.warning(
+        f"[SQL] {method} {route} over query budget: {stats.count} statements, "
+        f"{stats.seconds * 1000:.1f} ms in SQL, {elapsed * 1000:.1f} ms total\n{stats.report()}"
+    )
+    return True
+
+
+class QueryProfilerMiddleware:
+    """ASGI middleware tracking SQL statements per request and enforcing the query budget"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        keep = bool(settings.SQL_QUERY_BUDGET or settings.SQL_REQUEST_TIME_BUDGET_MS)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and settings.SQL_PROFILE_HEADERS:
+                headers = list(message.get("headers", []))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries"'.encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with track_queries(keep_statements=keep) as stats:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                check_query_budget(scope["method"], route_template(scope), stats, time.perf_counter() - started)
@@ -0,0 +1,302 @@
+"""
+Full-text search over residents, properties, blocks, documents and
+attachments (including the text extracted from their files, see
+app.core.text_extraction).
+
+Every searchable row has one SearchEntry (condominium, entity, display title
+and an accent-folded, lower-cased search_text). The full-text index lives
+next to it: an FTS5 table on SQLite (ranked by bm25) and a generated tsvector
+with a GIN index on PostgreSQL (ranked by ts_rank); see app.models.search.
+Other backends, or SQLite builds without FTS5, fall back to LIKE.
+
+Entries are kept in sync by a Session after_flush hook for ORM writes. Bulk
+INSERT statements bypass the unit of work, so their callers call
+reindex_entities() (the property importer does); rebuild_search_index()
+regenerates everything (scripts/rebuild_search_index.py).
+
+Search terms are prefixes combined with AND: "gom 10" finds "Ana Gómez" in
+unit "101".
+"""
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import column, delete, event, func, insert, inspect, literal, literal_column, select, table, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.block import Block
+from app.models.document import Document
+from app.models.document_attachment import DocumentAttachment
+from app.models.property import Property
+from app.models.resident import Resident
+from app.models.search import SearchEntry
+from app.schemas.search import SearchPage, SearchResult
+
+MAX_QUERY_TERMS = 8
+REINDEX_BATCH_SIZE = 1000
+
+_NON_WORD = re.compile(r"[\W_]+")
+_SEPARATED_DIGITS = re.compile(r"\d[\d\s.\-/()+]*\d")
+
+
+def normalize_text(*values) -> str:
+    """Lower-case, strip accents (Gómez -> gomez, Peña -> pena) and keep word characters"""
+    joined = " ".join(str(value) for value in values if value)
+    decomposed = unicodedata.normalize("NFKD", joined)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(_NON_WORD.sub(" ", stripped.lower()).split())
+
+
+def _with_compact_digits(*values) -> str:
+    """Also index phone and document numbers without separators ("300 123-4567" -> 3001234567)"""
+    compact = []
+    for value in values:
+        for match in _SEPARATED_DIGITS.findall(value or ""):
+            digits = re.sub(r"\D", "", match)
+            if digits != match:
+                compact.append(digits)
+    return " ".join(compact)
+
+
+def _resident_entry(resident) -> Tuple[str, Optional[str], str]:
+    document = " ".join(filter(None, [resident.document_type, resident.document_number]))
+    return (
+        resident.full_name,
+        document or resident.phone,
+        normalize_text(
+            resident.full_name, resident.document_number, resident.email, resident.phone,
+            _with_compact_digits(resident.document_number, resident.phone),
+        ),
+    )
+
+
+def _property_entry(property) -> Tuple[str, Optional[str], str]:
+    return property.code, property.type, normalize_text(property.code, property.type, property.description)
+
+
+def _block_entry(block) -> Tuple[str, Optional[str], str]:
+    return block.name, block.description, normalize_text(block.name, block.description)
+
+
+def _document_entry(document) -> Optional[Tuple[str, Optional[str], str]]:
+    if not getattr(document, "is_latest", True):
+        return None  # Only the current version of a document is searchable
+    return (
+        document.title,
+        document.category,
+        normalize_text(
+            document.title, document.description, document.category, document.file_name,
+            getattr(document, "text_content", None),
+        ),
+    )
+
+
+def _attachment_entry(attachment) -> Tuple[str, Optional[str], str]:
+    return (
+        attachment.title,
+        attachment.file_name,
+        normalize_text(
+            attachment.title, attachment.description, attachment.file_name, getattr(attachment, "text_content", None)
+        ),
+    )
+
+
+# Model -> (entity_type, entry builder returning None for rows that are not
+# searchable). Builders only read columns, so they
+# work with ORM objects and Core rows alike (columns added by later revisions
+# are read with getattr: migrations rebuild the index before they exist).
+INDEXED_MODELS: Dict[type, Tuple[str, Callable]] = {
+    Resident: ("resident", _resident_entry),
+    Property: ("property", _property_entry),
+    Block: ("block", _block_entry),
+    Document: ("document", _document_entry),
+    DocumentAttachment: ("attachment", _attachment_entry),
+}
+ENTITY_TYPES = [entity_type for entity_type, _ in INDEXED_MODELS.values()]
+
+
+def _entry_row(model, obj) -> Optional[dict]:
+    entity_type, build = INDEXED_MODELS[model]
+    entry = build(obj)
+    if entry is None:
+        return None
+    title, subtitle, search_text = entry
+    return {
+        "condominium_id": obj.condominium_id,
+        "entity_type": entity_type,
+        "entity_id": obj.id,
+        "title": (title or "")[:255],
+        "subtitle": subtitle[:255] if subtitle else None,
+        "search_text": search_text,
+    }
+
+
+def _write_entries(connection, entity_type: str, entity_ids: Sequence[int], rows: List[dict]):
+    """Replace the entries of entity_ids by rows (which may cover fewer ids, e.g. deletions)"""
+    rows = [row for row in rows if row is not None]
+    for start in range(0, len(entity_ids), REINDEX_BATCH_SIZE):
+        connection.execute(
+            delete(SearchEntry.__table__).where(
+                SearchEntry.entity_type == entity_type,
+                SearchEntry.entity_id.in_(entity_ids[start:start + REINDEX_BATCH_SIZE]),
+            )
+        )
+    for start in range(0, len(rows), REINDEX_BATCH_SIZE):
+        connection.execute(insert(SearchEntry.__table__), rows[start:start + REINDEX_BATCH_SIZE])
+
+
+def _sync_after_flush(session: Session, flush_context):
+    if not settings.SEARCH_INDEX_ENABLED:
+        return
+    upserts = defaultdict(dict)
+    removed = defaultdict(set)
+    for obj in session.new:
+        if type(obj) in INDEXED_MODELS:
+            upserts[type(obj)][obj.id] = obj
+    for obj in session.dirty:
+        if type(obj) in INDEXED_MODELS and session.is_modified(obj, include_collections=False):
+            upserts[type(obj)][obj.id] = obj
+    for obj in session.deleted:
+        if type(obj) in INDEXED_MODELS:
+            removed[type(obj)].add(obj.id)
+    if not upserts and not removed:
+        return
+
+    connection = session.connection()
+    for model in set(upserts) | set(removed):
+        entity_ids = list(upserts[model]) + list(removed[model])
+        rows = [_entry_row(model, obj) for obj in upserts[model].values()]
+        _write_entries(connection, INDEXED_MODELS[model][0], entity_ids, rows)
+
+
+event.listen(Session, "after_flush", _sync_after_flush)
+
+
+def reindex_entities(db: Session, model, entity_ids: Iterable[int]):
+    """Rebuild the entries of rows written outside the unit of work (bulk INSERT/UPDATE)"""
+    if not settings.SEARCH_INDEX_ENABLED:
+        return
+    entity_ids = list(entity_ids)
+    entity_type = INDEXED_MODELS[model][0]
+    connection = db.connection()
+    for start in range(0, len(entity_ids), REINDEX_BATCH_SIZE):
+        batch = entity_ids[start:start + REINDEX_BATCH_SIZE]
+        rows = [
+            _entry_row(model, row)
+            for row in connection.execute(select(model.__table__).where(model.id.in_(batch)))
+        ]
+        _write_entries(connection, entity_type, batch, rows)
+
+
+def rebuild_search_index(connection, condominium_id: Optional[int] = None) -> Dict[str, int]:
+    """Regenerate every entry (optionally of one condominium); returns entries per entity type"""
+    counts = {}
+    inspector = inspect(connection)
+    for model, (entity_type, _) in INDEXED_MODELS.items():
+        existing = {c["name"] for c in inspector.get_columns(model.__tablename__)}
+        clear = delete(SearchEntry.__table__).where(SearchEntry.entity_type == entity_type)
+        source = select(*[c for c in model.__table__.c if c.name in existing]).order_by(model.id)
+        if condominium_id is not None:
+            clear = clear.where(SearchEntry.condominium_id == condominium_id)
+            source = source.where(model.condominium_id == condominium_id)
+        connection.execute(clear)
+
+        counts[entity_type] = 0
+        rows = []
+        for row in connection.execute(source):
+            entry = _entry_row(model, row)
+            if entry is not None:
+                rows.append(entry)
+            if len(rows) >= REINDEX_BATCH_SIZE:
+                connection.execute(insert(SearchEntry.__table__), rows)
+                counts[entity_type] += len(rows)
+                rows = []
+        if rows:
+            connection.execute(insert(SearchEntry.__table__), rows)
+            counts[entity_type] += len(rows)
+    return counts
+
+
+# Which full-text backend each database has ("fts5", "tsvector" or "like"), checked once per engine
+_backends: Dict[str, str] = {}
+
+
+def fulltext_backend(db: Session) -> str:
+    bind = db.get_bind()
+    key = str(bind.url)
+    if key not in _backends:
+        if bind.dialect.name == "postgresql":
+            backend = "tsvector"
+        elif bind.dialect.name == "sqlite" and db.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_entries_fts'")
+        ).first():
+            backend = "fts5"
+        else:
+            backend = "like"
+        _backends[key] = backend
+    return _backends[key]
+
+
+def search(
+    db: Session,
+    condominium_id: int,
+    query: str,
+    entity_types: Optional[List[str]] = None,
+    skip: int = 0,
+    limit: int = 20,
+    snippets: bool = False,
+) -> SearchPage:
+    """Ranked, paginated matches of query in one condominium (best first); snippets adds matched context"""
+    terms = normalize_text(query).split()[:MAX_QUERY_TERMS]
+    if not terms:
+        return SearchPage(items=[], total=0, skip=skip, limit=limit)
+
+    entries = SearchEntry.__table__
+    conditions = [entries.c.condominium_id == condominium_id]
+    if entity_types:
+        conditions.append(entries.c.entity_type.in_(entity_types))
+
+    backend = fulltext_backend(db)
+    source = entries
+    if backend == "fts5":
+        # Quoted prefix terms; tokens only hold word characters, so no FTS syntax can leak in
+        fts = table("search_entries_fts", column("rowid"))
+        source = entries.join(fts, fts.c.rowid == entries.c.id)
+        conditions.append(text("search_entries_fts MATCH :match").bindparams(
+            match=" ".join(f'"{term}"*' for term in terms)
+        ))
+        score = literal_column("-bm25(search_entries_fts)")
+        snippet = literal_column("snippet(search_entries_fts, 0, '[', ']', '...', 16)")
+    elif backend == "tsvector":
+        tsquery = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        vector = literal_column("search_entries.search_vector")
+        conditions.append(vector.op("@@")(tsquery))
+        score = func.ts_rank(vector, tsquery)
+        snippet = func.ts_headline(
+            "simple", entries.c.search_text, tsquery, "StartSel=[, StopSel=], MaxWords=20, MinWords=8"
+        )
+    else:
+        padded = literal(" ") + entries.c.search_text
+        conditions.extend(padded.like(f"% {term}%") for term in terms)
+        score = literal(0.0)
+        snippet = literal(None)
+
+    total = db.execute(select(func.count()).select_from(source).where(*conditions)).scalar() or 0
+    rows = db.execute(
+        select(
+            entries.c.entity_type, entries.c.entity_id, entries.c.title, entries.c.subtitle,
+            score.label("score"),
+            (snippet if snippets else literal(None)).label("snippet"),
+        )
+        .select_from(source)
+        .where(*conditions)
+        .order_by(text("score DESC"), entries.c.title, entries.c.id)
+        .offset(skip)
+        .limit(limit)
+    ).all()
+    return SearchPage(
+        items=[SearchResult.model_validate(row, from_attributes=True) for row in rows],
+        total=total,
+        skip=skip,
+        limit=limit,
+    )
@@ -0,0 +1,164 @@
+"""
+HMAC-signed, expiring URLs for files under /uploads.
+
+With the local storage backend (app.core.storage), documents, attachments and
+photos are served from the /uploads mount, which has no access control of its
+own. API responses hand out signed links instead
+(documents and attachments in download_url, photos and logos in place of their
+stored URL):
+
+    /uploads/documents/1/3fa1...c2.pdf?exp=1767225600&name=Acta.pdf&sig=...
+
+The signature covers the path below /uploads, the expiry and the download
+name, keyed with a key derived from SECRET_KEY, so SignedUploadsMiddleware
+checks it without touching the database or the session: any API node can
+validate any link. Expiries are rounded up to SIGNED_URL_GRANULARITY_SECONDS so
+repeated listings return identical URLs and browsers can cache the files.
+
+With SIGNED_URLS_ACCEL_REDIRECT_PREFIX set, a valid request is answered with
+an X-Accel-Redirect header and the front proxy sends the bytes, e.g. nginx:
+
+    location /protected-uploads/ {
+        internal;
+        alias /srv/admcondm/uploads/;
+    }
+"""
+import base64
+import hashlib
+import hmac
+import json
+import time
+from functools import lru_cache
+from pathlib import PurePosixPath
+from typing import Optional
+from urllib.parse import parse_qs, quote, urlencode, urlsplit
+from app.core.config import settings
+
+URL_PREFIX = "/uploads/"
+EXPIRES_PARAM = "exp"
+NAME_PARAM = "name"
+SIGNATURE_PARAM = "sig"
+
+
+@lru_cache(maxsize=4)
+def _signing_key(secret: str) -> bytes:
+    # Separate key: a download signature can never double as a JWT signature
+    return hashlib.sha256(b"signed-uploads:" + secret.encode()).digest()
+
+
+def _signature(relative_path: str, expires: int, name: str) -> str:
+    message = f"{relative_path}\n{expires}\n{name}".encode()
+    digest = hmac.new(_signing_key(settings.SECRET_KEY), message, hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def upload_relative_path(file_path: str) -> Optional[str]:
+    """
+    Path below the upload root of a stored value: "/uploads/residents/photo_1.jpg" (photos),
+    "{UPLOAD_DIR}/documents/1/ab12.pdf" (documents) or "attachments/property_1_1.pdf"
+    (attachments). None for external URLs and paths escaping the upload root.
+    """
+    if not file_path:
+        return None
+    parts = urlsplit(file_path)
+    if parts.scheme or parts.netloc:
+        return None
+    path = parts.path.replace("\\", "/")
+    upload_dir = settings.UPLOAD_DIR.replace("\\", "/").rstrip("/")
+    if path.startswith(URL_PREFIX):
+        path = path[len(URL_PREFIX):]
+    elif path.startswith(upload_dir + "/"):
+        path = path[len(upload_dir) + 1:]
+    relative = PurePosixPath(path.lstrip("/"))
+    if not relative.parts or ".." in relative.parts:
+        return None
+    return str(relative)
+
+
+def signed_upload_url(file_path: Optional[str], filename: Optional[str] = None, expires_in: Optional[int] = None) -> Optional[str]:
+    """Signed /uploads URL for a stored path; other values (external URLs, None) are returned unchanged"""
+    relative = upload_relative_path(file_path) if file_path else None
+    if relative is None:
+        return file_path
+    ttl = expires_in or settings.SIGNED_URL_TTL_SECONDS
+    granularity = max(settings.SIGNED_URL_GRANULARITY_SECONDS, 1)
+    expires = (int(time.time()) + ttl + granularity - 1) // granularity * granularity
+    params = {EXPIRES_PARAM: expires}
+    if filename:
+        params[NAME_PARAM] = filename
+    params[SIGNATURE_PARAM] = _signature(relative, expires, filename or "")
+    return f"{URL_PREFIX}{quote(relative)}?{urlencode(params)}"
+
+
+def verify_signed_request(relative_path: str, query_string: str) -> Optional[dict]:
+    """{"expires": ..., "name": ...} for a valid, unexpired signature; None otherwise"""
+    query = parse_qs(query_string)
+    try:
+        expires = int(query[EXPIRES_PARAM][0])
+        signature = query[SIGNATURE_PARAM][0]
+    except (KeyError, ValueError):
+        return None
+    name = query.get(NAME_PARAM, [""])[0]
+    if expires < time.time():
+        return None
+    if not hmac.compare_digest(signature, _signature(relative_path, expires, name)):
+        return None
+    return {"expires": expires, "name": name}
+
+
+def content_disposition(name: str) -> str:
+    """Download header value with an ASCII fallback and the UTF-8 name (RFC 6266)"""
+    fallback = name.encode("ascii", "replace").decode().replace('"', "'").replace("?", "_")
+    return f"attachment; filename=\"{fallback}\"; filename*=UTF-8''{quote(name)}"
+
+
+class SignedUploadsMiddleware:
+    """ASGI middleware rejecting /uploads requests without a valid signature (no database access)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or not settings.SIGNED_URLS_ENFORCED
+            or not scope["path"].startswith(URL_PREFIX)
+            or scope["method"] not in ("GET", "HEAD")
+        ):
+            return await self.app(scope, receive, send)
+
+        relative = upload_relative_path(scope["path"])
+        grant = relative and verify_signed_request(relative, scope.get("query_string", b"").decode("latin-1"))
+        if not grant:
+            body = json.dumps({"detail": "Invalid or expired download link"}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 403,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            return await send({"type": "http.response.body", "body": body})
+
+        max_age = max(int(grant["expires"] - time.time()), 0)
+        extra_headers = [(b"cache-control", f"private, max-age={max_age}".encode())]
+        if grant["name"]:
+            extra_headers.append((b"content-disposition", content_disposition(grant["name"]).encode("latin-1")))
+
+        accel_prefix = settings.SIGNED_URLS_ACCEL_REDIRECT_PREFIX
+        if accel_prefix:
+            # The proxy serves the file from its internal location; the API never reads it
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": extra_headers + [
+                    (b"x-accel-redirect", (accel_prefix.rstrip("/") + "/" + quote(relative)).encode()),
+                    (b"content-length", b"0"),
+                ],
+            })
+            return await send({"type": "http.response.body", "body": b""})
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                message = {**message, "headers": list(message.get("headers", [])) + extra_headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
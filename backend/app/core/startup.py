@@ -0,0 +1,70 @@
+"""
+Startup checks run from the application lifespan.
+
+Workers no longer create tables on import. By default startup only verifies
+that the database is at the Alembic head revision (one query against
+alembic_version); schema changes are applied with `alembic upgrade head`
+before rolling out new workers. DB_STARTUP_MODE=create keeps the old
+create_all behaviour for throwaway development databases.
+"""
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app.core.config import settings
+from app.core.database import Base, engine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+ALEMBIC_INI = BACKEND_DIR / "alembic.ini"
+
+
+class SchemaOutOfDate(RuntimeError):
+    """The database revision does not match the code"""
+
+
+@lru_cache(maxsize=1)
+def alembic_heads() -> FrozenSet[str]:
+    """Head revision(s) of alembic/versions (read from disk, no DB access)"""
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    return frozenset(ScriptDirectory.from_config(config).get_heads())
+
+
+def database_revisions() -> FrozenSet[str]:
+    try:
+        with engine.connect() as connection:
+            rows = connection.execute(text("SELECT version_num FROM alembic_version")).all()
+    except SQLAlchemyError:
+        return frozenset()
+    return frozenset(version for (version,) in rows)
+
+
+def check_schema_revision():
+    heads = alembic_heads()
+    if not heads:
+        logger.warning("[STARTUP] No Alembic revisions found; creating missing tables instead")
+        Base.metadata.create_all(bind=engine)
+        return
+    current = database_revisions()
+    if current != heads:
+        raise SchemaOutOfDate(
+            f"Database revision {sorted(current) or 'none'} does not match code head {sorted(heads)}; "
+            f"run 'alembic upgrade head' before starting the API"
+        )
+
+
+def prepare_database():
+    mode = settings.DB_STARTUP_MODE
+    if mode == "check":
+        check_schema_revision()
+    elif mode == "create":
+        Base.metadata.create_all(bind=engine)
+    elif mode != "skip":
+        raise ValueError(f"Unknown DB_STARTUP_MODE: {mode}")
@@ -0,0 +1,258 @@
+"""
+Storage of uploaded files (documents, attachments, photos and logos).
+
+Files are addressed by a key relative to the upload root, e.g.
+"documents/1/3fa1...c2.pdf", "attachments/property_1_3.pdf" or
+"users/photo_7.jpg". The columns keep their historical formats (documents
+store UPLOAD_DIR/..., attachments the bare key, photos and logos
+/uploads/...), and storage_key() maps any of them to the key, so switching
+backends needs no data migration; copy the files over with the same keys.
+
+Backends (STORAGE_BACKEND):
+
+- local: files under UPLOAD_DIR, served by the /uploads mount through the
+  signed links of app.core.signed_urls. Fine for a single node.
+- s3: any S3-compatible service (AWS S3, a local MinIO stand-in); needs the
+  optional boto3 package, imported lazily. Uploads are streamed as multipart
+  transfers of S3_MULTIPART_CHUNK_SIZE parts and reads are presigned GET
+  URLs, so several API nodes share the files and none of them serves bytes.
+
+Backends are pluggable: subclass StorageBackend and call register_storage_backend().
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Annotated, BinaryIO, Callable, Dict, Iterator, Optional, Tuple
+from pydantic import PlainSerializer
+from app.core.config import settings
+from app.core.signed_urls import content_disposition, signed_upload_url, upload_relative_path
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+def storage_key(file_path: Optional[str]) -> Optional[str]:
+    """Key of a stored file_path/photo_url value; None for external URLs and empty values"""
+    return upload_relative_path(file_path) if file_path else None
+
+
+def measure_upload(source: BinaryIO) -> Tuple[int, str]:
+    """(size, sha256) of an upload read in chunks, rewound afterwards: nothing is held in memory"""
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = source.read(COPY_CHUNK_SIZE)
+        if not chunk:
+            break
+        digest.update(chunk)
+        size += len(chunk)
+    source.seek(0)
+    return size, digest.hexdigest()
+
+
+class StorageBackend(ABC):
+    """Base class for storage backends; keys are relative, '/'-separated paths"""
+    name = ""
+
+    @abstractmethod
+    def save(self, key: str, source: BinaryIO, content_type: Optional[str] = None):
+        """Store the stream under key (replacing any existing file), reading it in chunks"""
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Readable stream of the file; FileNotFoundError when missing"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether a file is stored under key"""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Remove the file; missing files are ignored"""
+
+    @abstractmethod
+    def url(self, key: str, filename: Optional[str] = None, expires_in: Optional[int] = None) -> str:
+        """Expiring read URL; filename makes it download under that name"""
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[Path]:
+        """Path of a local copy of the file for readers that need a seekable file (zipfile, pypdf)"""
+        suffix = os.path.splitext(key)[1]
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(handle, "wb") as target, closing(self.open(key)) as source:
+                shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+            yield Path(path)
+        finally:
+            os.remove(path)
+
+
+class LocalStorage(StorageBackend):
+    name = "local"
+
+    def _path(self, key: str) -> Path:
+        return Path(settings.UPLOAD_DIR) / key
+
+    def save(self, key: str, source: BinaryIO, content_type: Optional[str] = None):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temp file per call: threads of one process may save the same key (deduplicated documents)
+        handle, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as target:
+                shutil.copyfileobj(source, target, COPY_CHUNK_SIZE)
+            os.chmod(temp_path, 0o644)  # mkstemp creates 0600; the proxy may serve the file
+            os.replace(temp_path, path)  # Concurrent writers of the same key never expose a partial file
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        return self._path(key).is_file()
+
+    def delete(self, key: str):
+        try:
+            self._path(key).unlink()
+        except FileNotFoundError:
+            pass
+
+    def url(self, key: str, filename: Optional[str] = None, expires_in: Optional[int] = None) -> str:
+        return signed_upload_url(key, filename=filename, expires_in=expires_in)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[Path]:
+        path = self._path(key)
+        if not path.is_file():
+            raise FileNotFoundError(str(path))
+        yield path
+
+
+class S3Storage(StorageBackend):
+    name = "s3"
+
+    def __init__(self):
+        self._client = None
+        self._presign_client = None
+
+    def _make_client(self, endpoint_url: str):
+        try:
+            import boto3
+            from botocore.config import Config
+        except ImportError:
+            raise RuntimeError("STORAGE_BACKEND=s3 requires the boto3 package (pip install boto3)")
+        return boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=settings.S3_REGION,
+            aws_access_key_id=settings.S3_ACCESS_KEY_ID or None,
+            aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY or None,
+            # Path-style addressing works with MinIO and other S3-compatible services
+            config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+        )
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._make_client(settings.S3_ENDPOINT_URL)
+        return self._client
+
+    @property
+    def presign_client(self):
+        """Signs URLs for the host browsers reach (S3_PUBLIC_ENDPOINT_URL), which may differ from the API's"""
+        if self._presign_client is None:
+            public_endpoint = settings.S3_PUBLIC_ENDPOINT_URL
+            self._presign_client = self._make_client(public_endpoint) if public_endpoint else self.client
+        return self._presign_client
+
+    def _key(self, key: str) -> str:
+        return f"{settings.S3_KEY_PREFIX.strip('/')}/{key}" if settings.S3_KEY_PREFIX.strip("/") else key
+
+    def _is_missing(self, error) -> bool:
+        return error.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def save(self, key: str, source: BinaryIO, content_type: Optional[str] = None):
+        from boto3.s3.transfer import TransferConfig
+
+        chunk_size = settings.S3_MULTIPART_CHUNK_SIZE
+        self.client.upload_fileobj(
+            source,
+            settings.S3_BUCKET,
+            self._key(key),
+            ExtraArgs={"ContentType": content_type} if content_type else None,
+            Config=TransferConfig(multipart_threshold=chunk_size, multipart_chunksize=chunk_size),
+        )
+
+    def open(self, key: str) -> BinaryIO:
+        from botocore.exceptions import ClientError
+
+        try:
+            return self.client.get_object(Bucket=settings.S3_BUCKET, Key=self._key(key))["Body"]
+        except ClientError as e:
+            if self._is_missing(e):
+                raise FileNotFoundError(key)
+            raise
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=settings.S3_BUCKET, Key=self._key(key))
+        except ClientError as e:
+            if self._is_missing(e):
+                return False
+            raise
+        return True
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=settings.S3_BUCKET, Key=self._key(key))
+
+    def url(self, key: str, filename: Optional[str] = None, expires_in: Optional[int] = None) -> str:
+        params = {"Bucket": settings.S3_BUCKET, "Key": self._key(key)}
+        if filename:
+            params["ResponseContentDisposition"] = content_disposition(filename)
+        return self.presign_client.generate_presigned_url(
+            "get_object", Params=params, ExpiresIn=expires_in or settings.SIGNED_URL_TTL_SECONDS
+        )
+
+
+STORAGE_BACKENDS: Dict[str, Callable[[], StorageBackend]] = {}
+_instances: Dict[str, StorageBackend] = {}
+
+
+def register_storage_backend(name: str, factory: Callable[[], StorageBackend]):
+    STORAGE_BACKENDS[name] = factory
+
+
+register_storage_backend("local", LocalStorage)
+register_storage_backend("s3", S3Storage)
+
+
+def get_storage() -> StorageBackend:
+    """The configured backend (one instance per process and backend name)"""
+    name = settings.STORAGE_BACKEND
+    if name not in _instances:
+        if name not in STORAGE_BACKENDS:
+            raise RuntimeError(f"Unknown STORAGE_BACKEND {name!r} (available: {', '.join(STORAGE_BACKENDS)})")
+        _instances[name] = STORAGE_BACKENDS[name]()
+    return _instances[name]
+
+
+def download_url(file_path: Optional[str], filename: Optional[str] = None) -> Optional[str]:
+    """Expiring read URL for a stored value; external URLs and None are returned unchanged"""
+    key = storage_key(file_path)
+    if key is None:
+        return file_path
+    return get_storage().url(key, filename=filename)
+
+
+# Response field holding a stored upload URL (photos, logos), turned into a read link when serialized
+SignedUploadUrl = Annotated[Optional[str], PlainSerializer(lambda value: download_url(value), return_type=Optional[str])]
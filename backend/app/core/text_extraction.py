@@ -0,0 +1,223 @@
+"""
+Plain-text extraction from uploaded documents and attachments.
+
+Runs in the background job pool (job type extract_document_text, enqueued
+after upload), so uploads never wait for it. Supported formats:
+
+- text/plain, CSV, Markdown, HTML (tags stripped)
+- Office Open XML and OpenDocument (docx, xlsx, pptx, odt, ods, odp): read
+  with zipfile + ElementTree, no extra dependency; parts are streamed and
+  reading stops at the text cap, so a zip bomb is never fully inflated
+- PDF: needs the optional pypdf package, imported lazily; without it the
+  document is marked unsupported and can be re-extracted after installing it
+
+Files are read through the storage backend (app.core.storage); remote
+backends are copied to a temporary file first, since zipfile and pypdf need
+a seekable file. The text is stored on the row (text_content, truncated to
+DOCUMENT_TEXT_MAX_CHARS) and indexed by app.core.search.
+"""
+import html
+import re
+import zipfile
+from pathlib import Path
+from typing import Iterator, Optional
+from xml.etree import ElementTree
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.jobs import enqueue_job
+from app.core.storage import get_storage, storage_key
+from app.models.document_attachment import DocumentAttachment
+
+
+class TextStatus:
+    """Valores de text_status en documents y document_attachments"""
+    PENDING = "pending"
+    EXTRACTED = "extracted"
+    EMPTY = "empty"  # Supported format without text (e.g. scanned PDF)
+    UNSUPPORTED = "unsupported"
+    FAILED = "failed"
+
+
+class UnsupportedDocument(Exception):
+    """Format we cannot read (or whose optional reader is not installed)"""
+
+
+TEXT_EXTENSIONS = {".txt", ".csv", ".md", ".json", ".xml"}
+HTML_EXTENSIONS = {".html", ".htm"}
+
+# Members holding the text of each zipped XML format
+OOXML_PARTS = {
+    ".docx": re.compile(r"word/(document|header\d*|footer\d*|footnotes)\.xml$"),
+    ".xlsx": re.compile(r"xl/sharedStrings\.xml$"),
+    ".pptx": re.compile(r"ppt/slides/slide\d+\.xml$"),
+}
+ODF_EXTENSIONS = {".odt", ".ods", ".odp"}
+XML_CHUNK_SIZE = 64 * 1024
+ZIPPED_XML_MAX_RATIO = 50  # Decompressed XML read per stored character (markup is most of an Office file)
+
+# Elements that end a line of text (paragraphs, table cells, line breaks)
+_BLOCK_TAGS = {"p", "br", "tab", "tc", "si", "h", "table-cell", "line-break"}
+_HTML_TAGS = re.compile(r"<(script|style)\b.*?</\1>|<[^>]+>", re.IGNORECASE | re.DOTALL)
+
+
+class _XmlTextTarget:
+    """
+    Parser target collecting the text of an XML part as it is parsed (no tree is
+    built): a line break before each paragraph-like element, the text of text
+    elements and the tail of inline ones.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+        self._stack = []
+        self._closed = None  # Tag of the last closed child: data after it is that child's tail
+
+    def _emit(self, text: str):
+        self.chunks.append(text)
+        self.size += len(text)
+
+    def start(self, tag, attrib):
+        tag = tag.rsplit("}", 1)[-1]
+        if tag in _BLOCK_TAGS:
+            self._emit("\n")
+        if tag in ("s", "tab"):
+            self._emit(" ")
+        self._stack.append(tag)
+        self._closed = None
+
+    def end(self, tag):
+        self._closed = self._stack.pop()
+
+    def data(self, text):
+        if self._closed is None:
+            if self._stack and self._stack[-1] in ("t", "p", "h", "span"):
+                self._emit(text)
+        elif self._closed in ("span", "s", "tab", "line-break"):
+            self._emit(text)
+
+    def end_part(self):
+        self._emit("\n")
+        self._stack.clear()
+        self._closed = None
+
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+
+def _read_zipped_xml(path: Path, extension: str) -> str:
+    """
+    Text of the XML parts, streamed from the archive: reading stops once the text
+    reaches DOCUMENT_TEXT_MAX_CHARS or the decompressed XML reaches
+    ZIPPED_XML_MAX_RATIO times that, whatever sizes the archive declares (zip bombs).
+    """
+    pattern = OOXML_PARTS.get(extension) or re.compile(r"content\.xml$")
+    max_text = settings.DOCUMENT_TEXT_MAX_CHARS * 2  # Whitespace is collapsed afterwards
+    budget = settings.DOCUMENT_TEXT_MAX_CHARS * ZIPPED_XML_MAX_RATIO
+    target = _XmlTextTarget()
+    with zipfile.ZipFile(path) as archive:
+        for name in sorted(archive.namelist()):
+            if not pattern.match(name):
+                continue
+            parser = ElementTree.XMLParser(target=target)
+            with archive.open(name) as member:
+                while target.size < max_text and budget > 0:
+                    chunk = member.read(min(XML_CHUNK_SIZE, budget))
+                    if not chunk:
+                        break
+                    budget -= len(chunk)
+                    parser.feed(chunk)
+                else:
+                    return target.text()  # Truncated: the rest of the archive is never inflated
+            parser.close()
+            target.end_part()
+    return target.text()
+
+
+def _read_plain(path: Path) -> str:
+    raw = path.read_bytes()[:settings.DOCUMENT_TEXT_MAX_CHARS * 4]
+    try:
+        return raw.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+def _read_pdf(path: Path) -> str:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise UnsupportedDocument("pypdf is not installed")
+    chunks = []
+    size = 0
+    try:
+        for page in PdfReader(str(path)).pages:
+            text = page.extract_text() or ""
+            chunks.append(text)
+            size += len(text)
+            if size >= settings.DOCUMENT_TEXT_MAX_CHARS:
+                break
+    except Exception as e:  # pypdf raises its own error hierarchy for damaged files
+        raise ValueError(f"Unreadable PDF: {e}")
+    return "\n".join(chunks)
+
+
+def extract_text(path: Path, file_name: Optional[str] = None, mime_type: Optional[str] = None) -> str:
+    """Text of the file, whitespace-collapsed and truncated; raises UnsupportedDocument"""
+    extension = Path(file_name or path.name).suffix.lower()
+    mime_type = (mime_type or "").lower()
+
+    if extension == ".pdf" or mime_type == "application/pdf":
+        text = _read_pdf(path)
+    elif extension in OOXML_PARTS or extension in ODF_EXTENSIONS:
+        try:
+            text = _read_zipped_xml(path, extension)
+        except (zipfile.BadZipFile, ElementTree.ParseError) as e:
+            raise UnsupportedDocument(f"Corrupt {extension} file: {e}")
+    elif extension in HTML_EXTENSIONS or mime_type == "text/html":
+        text = html.unescape(_HTML_TAGS.sub(" ", _read_plain(path)))
+    elif extension in TEXT_EXTENSIONS or mime_type.startswith("text/"):
+        text = _read_plain(path)
+    else:
+        raise UnsupportedDocument(f"No text extractor for {extension or mime_type or 'this file'}")
+
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)[:settings.DOCUMENT_TEXT_MAX_CHARS]
+
+
+def extract_into(record) -> str:
+    """Fill text_content/text_status of a Document or DocumentAttachment; returns the status"""
+    key = storage_key(record.file_path)
+    try:
+        if not key:
+            raise FileNotFoundError(record.file_path or "no file")
+        with get_storage().local_copy(key) as path:
+            text = extract_text(path, record.file_name, record.mime_type)
+        record.text_content = text or None
+        record.text_status = TextStatus.EXTRACTED if text else TextStatus.EMPTY
+        record.text_error = None
+    except UnsupportedDocument as e:
+        record.text_content = None
+        record.text_status = TextStatus.UNSUPPORTED
+        record.text_error = str(e)[:500]
+    except (OSError, ValueError) as e:
+        record.text_content = None
+        record.text_status = TextStatus.FAILED
+        record.text_error = f"{type(e).__name__}: {e}"[:500]
+    return record.text_status
+
+
+def enqueue_text_extraction(db: Session, record, created_by: int, dispatch: bool = True):
+    """Mark a Document/DocumentAttachment pending and queue its extraction (commits)"""
+    if not settings.DOCUMENT_TEXT_EXTRACTION:
+        return None
+    record.text_status = TextStatus.PENDING
+    record.text_error = None
+    job, _ = enqueue_job(
+        db,
+        "extract_document_text",
+        {"kind": "attachment" if isinstance(record, DocumentAttachment) else "document", "record_id": record.id},
+        created_by=created_by,
+        condominium_id=record.condominium_id,
+        dispatch=dispatch,
+    )
+    return job
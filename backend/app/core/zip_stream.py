@@ -0,0 +1,129 @@
+"""
+ZIP archives streamed while they are built.
+
+zipfile writes to a sink without seek/tell (it then uses data descriptors
+instead of rewriting local headers), and stream_zip() yields whatever the
+sink holds after every chunk of input. Memory stays at one chunk plus
+compressor state whatever the archive size, nothing touches the disk, and
+the first bytes reach the client right away. Files are read from the storage
+backend (app.core.storage), so local disk and S3 work alike. Use it with
+StreamingResponse: Starlette iterates sync generators in its threadpool.
+"""
+import os
+import re
+import zipfile
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+from app.core.storage import get_storage
+
+CHUNK_SIZE = 64 * 1024
+MISSING_FILES_NAME = "ARCHIVOS_FALTANTES.txt"
+# Most files (PDF, Office, images) are already compressed: the fastest level
+# still shrinks text files. Entries are always deflated because stored entries
+# followed by a data descriptor are rejected by some readers.
+COMPRESS_LEVEL = 1
+
+
+@dataclass
+class ZipEntry:
+    arcname: str  # Path inside the archive
+    key: Optional[str]  # Storage key (app.core.storage.storage_key)
+    modified: Optional[datetime] = None
+    size: Optional[int] = None  # Bytes, when known (selects ZIP64 up front)
+
+
+class _Sink:
+    """Write-only, unseekable buffer drained by stream_zip after each write"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def safe_arcname(*parts: str) -> str:
+    """Archive path from user-provided names (no separators, traversal or control characters)"""
+    cleaned = []
+    for part in parts:
+        part = re.sub(r'[\x00-\x1f\\/:*?"<>|]+', "_", (part or "").strip()).strip(". ")
+        cleaned.append(part or "_")
+    return "/".join(cleaned)
+
+
+def unique_arcnames(entries: Iterable[ZipEntry]) -> Iterator[ZipEntry]:
+    """Suffix repeated names: "acta.pdf", "acta (2).pdf" """
+    seen = set()
+    for entry in entries:
+        name = entry.arcname
+        stem, extension = os.path.splitext(name)
+        counter = 2
+        while name.lower() in seen:
+            name = f"{stem} ({counter}){extension}"
+            counter += 1
+        seen.add(name.lower())
+        entry.arcname = name
+        yield entry
+
+
+def stream_zip(entries: Iterable[ZipEntry]) -> Iterator[bytes]:
+    """Yield the archive incrementally; files missing on disk are listed in ARCHIVOS_FALTANTES.txt"""
+    sink = _Sink()
+    storage = get_storage()
+    missing = []
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=COMPRESS_LEVEL) as archive:
+        for entry in unique_arcnames(entries):
+            try:
+                if not entry.key:
+                    raise FileNotFoundError(entry.arcname)
+                source = storage.open(entry.key)
+            except OSError:
+                missing.append(entry.arcname)
+                continue
+            with closing(source):
+                modified = entry.modified or datetime.now()
+                info = zipfile.ZipInfo(entry.arcname, date_time=max(modified.timetuple()[:6], (1980, 1, 1, 0, 0, 0)))
+                info.file_size = entry.size or 0
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info._compresslevel = COMPRESS_LEVEL  # Not inherited from the archive for explicit ZipInfo (public in 3.13)
+                # Unknown sizes get ZIP64 headers, otherwise zipfile picks them from file_size
+                with archive.open(info, mode="w", force_zip64=entry.size is None) as target:
+                    while True:
+                        chunk = source.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        target.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+            data = sink.drain()
+            if data:
+                yield data
+        if missing:
+            archive.writestr(
+                MISSING_FILES_NAME,
+                "Archivos no encontrados en el almacenamiento:\n" + "\n".join(missing) + "\n",
+            )
+    yield sink.drain()  # Central directory
+
+
+def zip_streaming_response(entries: List[ZipEntry], filename: str):
+    """StreamingResponse sending the archive as an attachment download"""
+    from fastapi.responses import StreamingResponse
+
+    return StreamingResponse(
+        stream_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{safe_arcname(filename)}"'},
+    )
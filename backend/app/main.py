@@ -1,10 +1,24 @@
-from fastapi import FastAPI, Request
+import time
+
+_import_started = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
+import secrets
+from fastapi import FastAPI, Request, HTTPException, status
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from app.core.database import engine, Base
 from app.core.config import settings
-from app.api import auth, condominiums, blocks, residents, properties, accounting, space_requests, meetings, assemblies, documents, notifications, document_attachments, users, profile, administration_invoices
+from app.core.jobs import job_recovery_loop, run_job_recovery, shutdown_job_executor
+from app.core.startup import prepare_database
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.database import engine
+from app.core.metrics import MetricsMiddleware, install_sqlalchemy_metrics, render_metrics
+from app.core.query_profiler import QueryProfilerMiddleware, install_query_profiler
+from app.core.signed_urls import SignedUploadsMiddleware
+from app.api import auth, condominiums, blocks, residents, properties, accounting, space_requests, meetings, assemblies, documents, notifications, document_attachments, users, profile, administration_invoices, jobs, calendar, search
 # Import models to ensure they are registered with Base
 from app.models import assembly, administration_invoice
 import logging
@@ -12,19 +26,41 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
-# Create upload directory
-upload_dir = Path(settings.UPLOAD_DIR)
-upload_dir.mkdir(exist_ok=True)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runs once per worker, after imports: verify the schema, prepare the upload root
+    startup_started = time.perf_counter()
+    prepare_database()
+    if settings.STORAGE_BACKEND == "local":
+        Path(settings.UPLOAD_DIR).mkdir(parents=True, exist_ok=True)
+    # Jobs lost by a crash or the last shutdown: requeue expired leases, dispatch the queue
+    run_job_recovery()
+    recovery_task = None
+    if settings.JOB_RECOVERY_INTERVAL_SECONDS > 0:
+        recovery_task = asyncio.create_task(job_recovery_loop())
+    app.state.import_seconds = _import_finished - _import_started
+    app.state.startup_seconds = time.perf_counter() - startup_started
+    logger.info(
+        f"[STARTUP] Imports {app.state.import_seconds * 1000:.0f} ms, "
+        f"startup checks {app.state.startup_seconds * 1000:.0f} ms"
+    )
+    yield
+    if recovery_task:
+        recovery_task.cancel()
+    shutdown_job_executor()
+
 
 app = FastAPI(
     title="Sistema de Gestión Condominial API",
     description="API para gestión de condominios y propiedades horizontales",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Replay retried writes sent with an Idempotency-Key header
+app.add_middleware(IdempotencyMiddleware)
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -34,6 +70,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# /uploads only answers requests carrying a valid, unexpired signature
+app.add_middleware(SignedUploadsMiddleware)
+
+# Per-route latency, status and SQL usage for /metrics
+if settings.METRICS_ENABLED:
+    install_sqlalchemy_metrics(engine)
+    app.add_middleware(MetricsMiddleware)
+
+# Outermost: count SQL statements per request and log requests over the query budget
+install_query_profiler(engine)
+app.add_middleware(QueryProfilerMiddleware)
+
 # Debug middleware to log requests
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
@@ -47,8 +95,8 @@ async def log_requests(request: Request, call_next):
     logger.info(f"[RESPONSE] {request.method} {request.url.path} - Status: {response.status_code}")
     return response
 
-# Mount static files for uploads
-app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR), name="uploads")
+# Mount static files for uploads (signed links only, see SignedUploadsMiddleware)
+app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_DIR, check_dir=False), name="uploads")
 
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
@@ -66,6 +114,9 @@ app.include_router(document_attachments.router, prefix="/api/document-attachment
 app.include_router(notifications.router, prefix="/api/notifications", tags=["Notifications"])
 app.include_router(users.router, prefix="/api/users", tags=["Users Management"])
 app.include_router(profile.router, prefix="/api/profile", tags=["Profile"])
+app.include_router(jobs.router, prefix="/api/jobs", tags=["Background Jobs"])
+app.include_router(calendar.router, prefix="/api/calendar", tags=["Calendar"])
+app.include_router(search.router, prefix="/api/search", tags=["Search"])
 
 
 @app.get("/")
@@ -77,3 +128,18 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    if settings.METRICS_TOKEN:
+        provided = request.headers.get("authorization", "")
+        if not secrets.compare_digest(provided, f"Bearer {settings.METRICS_TOKEN}"):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+    
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+_import_finished = time.perf_counter()
@@ -8,10 +8,13 @@ from app.models.accounting import AccountingTransaction, Budget, BankReconciliat
 from app.models.space_request import SpaceRequest
 from app.models.meeting import Meeting, MeetingAttendance
 from app.models.assembly import Assembly, AssemblyVote, VoteRecord, AssemblyAttendance
-from app.models.administration_invoice import AdministrationInvoice, InvoicePayment, InvoiceStatus, PaymentMethod
+from app.models.administration_invoice import AdministrationInvoice, InvoicePayment, InvoiceStatus, PaymentMethod, ReceivableAgingSnapshot, AdministrationFeeRule, FeeRuleType
 from app.models.document import Document
-from app.models.notification import Notification
+from app.models.notification import Notification, NotificationReceipt, NotificationDelivery, DeliveryStatus, WebPushSubscription
 from app.models.document_attachment import DocumentAttachment, AttachmentEntityType
+from app.models.job import BackgroundJob, JobStatus
+from app.models.idempotency import IdempotencyRecord
+from app.models.search import SearchEntry
 
 __all__ = [
     "User",
@@ -38,9 +41,20 @@ __all__ = [
     "InvoicePayment",
     "InvoiceStatus",
     "PaymentMethod",
+    "ReceivableAgingSnapshot",
+    "AdministrationFeeRule",
+    "FeeRuleType",
     "Document",
     "Notification",
+    "NotificationReceipt",
+    "NotificationDelivery",
+    "DeliveryStatus",
+    "WebPushSubscription",
     "DocumentAttachment",
     "AttachmentEntityType",
+    "BackgroundJob",
+    "JobStatus",
+    "IdempotencyRecord",
+    "SearchEntry",
 ]
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Boolean, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -51,6 +51,11 @@ class AdministrationInvoice(Base):
     property = relationship("Property", back_populates="administration_invoices")
     payments = relationship("InvoicePayment", back_populates="invoice", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Aging report and overdue sweep filter by condominium and scan due dates
+        Index("ix_administration_invoices_condo_due", "condominium_id", "is_active", "due_date"),
+    )
+
 
 class InvoicePayment(Base):
     __tablename__ = "invoice_payments"
@@ -69,3 +74,48 @@ class InvoicePayment(Base):
     # Relationships
     invoice = relationship("AdministrationInvoice", back_populates="payments")
     recorder = relationship("User")
+
+
+class ReceivableAgingSnapshot(Base):
+    """Materialized accounts-receivable aging per property (refreshed by the overdue sweeper)"""
+    __tablename__ = "receivable_aging_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    condominium_id = Column(Integer, ForeignKey("condominiums.id"), nullable=False, index=True)
+    property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
+    block_id = Column(Integer, ForeignKey("blocks.id"), nullable=True)
+    current_amount = Column(Float, default=0.0)  # Aún no vencido
+    days_1_30 = Column(Float, default=0.0)  # Vencido 1-30 días
+    days_31_60 = Column(Float, default=0.0)  # Vencido 31-60 días
+    days_61_90 = Column(Float, default=0.0)  # Vencido 61-90 días
+    days_over_90 = Column(Float, default=0.0)  # Vencido más de 90 días
+    total_pending = Column(Float, default=0.0)
+    invoice_count = Column(Integer, default=0)
+    as_of = Column(DateTime(timezone=True), nullable=False)  # Fecha de corte usada en el cálculo
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class FeeRuleType(enum.Enum):
+    PROPERTY_TYPE = "property_type"  # Coeficiente por tipo de unidad (multiplica la base)
+    BLOCK = "block"  # Coeficiente por bloque/manzana (multiplica la base)
+    AREA_RATE = "area_rate"  # Valor por m² sumado a la base
+    LATE_INTEREST = "late_interest"  # % mensual sobre saldo pendiente anterior
+    RECURRING_CHARGE = "recurring_charge"  # Cargo fijo recurrente (parqueadero, etc.)
+
+
+class AdministrationFeeRule(Base):
+    """Reglas para el cálculo segmentado de la cuota de administración"""
+    __tablename__ = "administration_fee_rules"
+
+    id = Column(Integer, primary_key=True, index=True)
+    condominium_id = Column(Integer, ForeignKey("condominiums.id"), nullable=False, index=True)
+    rule_type = Column(Enum(FeeRuleType), nullable=False)
+    value = Column(Float, nullable=False)  # Coeficiente, valor por m², % de interés o monto
+    property_type = Column(String(50), nullable=True)  # Alcance: tipo de unidad
+    block_id = Column(Integer, ForeignKey("blocks.id"), nullable=True)  # Alcance: bloque
+    property_id = Column(Integer, ForeignKey("properties.id"), nullable=True)  # Alcance: unidad
+    description = Column(String(255), nullable=True)
+    is_active = Column(Boolean, default=True)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
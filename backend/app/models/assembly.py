@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Float, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -29,6 +29,11 @@ class Assembly(Base):
     votes = relationship("AssemblyVote", back_populates="assembly", cascade="all, delete-orphan")
     attendees = relationship("AssemblyAttendance", back_populates="assembly", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Calendar feed reads one condominium's events by date window
+        Index("ix_assemblies_condo_scheduled", "condominium_id", "scheduled_date"),
+    )
+
 
 class AssemblyVote(Base):
     __tablename__ = "assembly_votes"
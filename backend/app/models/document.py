@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index, true
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -18,11 +18,30 @@ class Document(Base):
     mime_type = Column(String(100), nullable=True)
     version = Column(Integer, default=1)
     previous_version_id = Column(Integer, ForeignKey("documents.id"), nullable=True)
+    root_document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)  # Versión 1 del documento lógico
+    is_latest = Column(Boolean, nullable=False, default=True, server_default=true())  # Cabeza de la cadena de versiones
+    content_hash = Column(String(64), nullable=True)  # SHA-256 del archivo (deduplicación)
     uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    text_content = deferred(Column(Text, nullable=True))  # Texto extraído del archivo (búsqueda); no se carga por defecto
+    text_status = Column(String(20), nullable=True)  # pending, extracted, empty, unsupported, failed (NULL: nunca procesado)
+    text_error = Column(String(500), nullable=True)  # Motivo si no se pudo extraer
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
     condominium = relationship("Condominium", back_populates="documents")
-    previous_version = relationship("Document", remote_side=[id])
+    previous_version = relationship("Document", remote_side=[id], foreign_keys=[previous_version_id])
+
+    __table_args__ = (
+        # Listing returns only the current version of each document
+        Index("ix_documents_condo_latest", "condominium_id", "is_latest"),
+        # Versions of one logical document, and at most one head per chain
+        Index("ix_documents_root_version", "root_document_id", "version"),
+        Index(
+            "ux_documents_root_latest", "root_document_id", unique=True,
+            sqlite_where=is_latest == true(), postgresql_where=is_latest == true(),
+        ),
+        # Deduplicated storage: files shared by several versions
+        Index("ix_documents_condo_hash", "condominium_id", "content_hash"),
+    )
 
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum as SQLEnum
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 import enum
 from app.core.database import Base
@@ -25,6 +25,9 @@ class DocumentAttachment(Base):
     file_size = Column(Integer, nullable=True)
     mime_type = Column(String(100), nullable=True)
     uploaded_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    text_content = deferred(Column(Text, nullable=True))  # Texto extraído del archivo (búsqueda); no se carga por defecto
+    text_status = Column(String(20), nullable=True)  # pending, extracted, empty, unsupported, failed (NULL: nunca procesado)
+    text_error = Column(String(500), nullable=True)  # Motivo si no se pudo extraer
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
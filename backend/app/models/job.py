@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, Float, Text, DateTime, ForeignKey, Enum, JSON, Index, UniqueConstraint
+from sqlalchemy.sql import func
+import enum
+from app.core.database import Base
+
+
+class JobStatus(enum.Enum):
+    QUEUED = "queued"  # En cola
+    RUNNING = "running"  # En ejecución
+    SUCCEEDED = "succeeded"  # Terminado correctamente
+    FAILED = "failed"  # Falló tras agotar reintentos
+
+
+class BackgroundJob(Base):
+    """Long-running task (billing, imports, reports) executed outside the request"""
+    __tablename__ = "background_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String(100), nullable=False, index=True)  # generate_billing, ...
+    status = Column(Enum(JobStatus), default=JobStatus.QUEUED, index=True)
+    condominium_id = Column(Integer, ForeignKey("condominiums.id"), nullable=True)
+    payload = Column(JSON, nullable=True)  # Parámetros de la tarea
+    result = Column(JSON, nullable=True)  # Resultado serializable
+    error = Column(Text, nullable=True)
+    progress = Column(Float, default=0.0)  # 0-100
+    progress_message = Column(String(255), nullable=True)
+    idempotency_key = Column(String(255), nullable=True)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # Renovado mientras corre (lease)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("created_by", "idempotency_key", name="uq_background_jobs_user_idempotency_key"),
+        Index("ix_background_jobs_status_heartbeat", "status", "heartbeat_at"),
+    )
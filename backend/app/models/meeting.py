@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -24,6 +24,11 @@ class Meeting(Base):
     condominium = relationship("Condominium", back_populates="meetings")
     attendances = relationship("MeetingAttendance", back_populates="meeting", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Calendar feed reads one condominium's events by date window
+        Index("ix_meetings_condo_scheduled", "condominium_id", "scheduled_date"),
+    )
+
 
 class MeetingAttendance(Base):
     __tablename__ = "meeting_attendances"
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, Enum, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+import enum
 from app.core.database import Base
 
 
@@ -12,11 +13,77 @@ class Notification(Base):
     title = Column(String(255), nullable=False)
     message = Column(Text, nullable=False)
     notification_type = Column(String(50), nullable=False)  # payment_reminder, announcement, etc.
-    is_read = Column(Boolean, default=False)
+    is_read = Column(Boolean, default=False)  # Legacy: per-user read state lives in NotificationReceipt
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # NULL means broadcast to all
     created_by = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     condominium = relationship("Condominium", back_populates="notifications")
+    receipts = relationship("NotificationReceipt", back_populates="notification", cascade="all, delete-orphan")
+    deliveries = relationship("NotificationDelivery", back_populates="notification", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Listing and unread counts filter by condominium and recipient, paginating by id
+        Index("ix_notifications_condo_user_id", "condominium_id", "user_id", "id"),
+    )
+
+
+class NotificationReceipt(Base):
+    """Per-user read state, so broadcast notifications can be read by each resident"""
+    __tablename__ = "notification_receipts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    notification_id = Column(Integer, ForeignKey("notifications.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    read_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    notification = relationship("Notification", back_populates="receipts")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "notification_id", name="uq_notification_receipts_user_notification"),
+    )
+
+
+
+class DeliveryStatus(enum.Enum):
+    PENDING = "pending"  # Pendiente de envío
+    SENT = "sent"  # Enviada
+    FAILED = "failed"  # Falló el envío
+    SKIPPED = "skipped"  # Canal no disponible para el destinatario
+
+
+class NotificationDelivery(Base):
+    """One notification sent to one recipient through one channel"""
+    __tablename__ = "notification_deliveries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    notification_id = Column(Integer, ForeignKey("notifications.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    channel = Column(String(20), nullable=False)  # email, web_push
+    status = Column(Enum(DeliveryStatus), default=DeliveryStatus.PENDING, nullable=False)
+    attempts = Column(Integer, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Relationships
+    notification = relationship("Notification", back_populates="deliveries")
+
+    __table_args__ = (
+        UniqueConstraint("notification_id", "user_id", "channel", name="uq_notification_deliveries_recipient_channel"),
+        Index("ix_notification_deliveries_notification_status", "notification_id", "status", "id"),
+    )
+
+
+class WebPushSubscription(Base):
+    """Browser push subscription registered by a user"""
+    __tablename__ = "web_push_subscriptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    endpoint = Column(String(1000), nullable=False, unique=True)
+    p256dh = Column(String(255), nullable=False)
+    auth = Column(String(255), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -21,9 +21,20 @@ class Property(Base):
     # Relationships
     condominium = relationship("Condominium", back_populates="properties")
     block = relationship("Block", back_populates="properties")
-    property_residents = relationship("PropertyResident", back_populates="property", cascade="all, delete-orphan")
+    property_residents = relationship("PropertyResident", back_populates="property", cascade="all, delete-orphan")  # Historial completo
+    current_residents = relationship(
+        "PropertyResident",
+        primaryjoin="and_(Property.id == PropertyResident.property_id, PropertyResident.end_date.is_(None))",
+        order_by="PropertyResident.id",
+        viewonly=True,
+    )  # Vínculos vigentes (end_date NULL, igual que app.core.ownership.current_link)
     administration_invoices = relationship("AdministrationInvoice", back_populates="property", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Property listing filters one condominium and pages by code (also serves code prefix search)
+        Index("ix_properties_condo_code", "condominium_id", "code"),
+    )
+
 
 class PropertyResident(Base):
     __tablename__ = "property_residents"
@@ -32,7 +43,7 @@ class PropertyResident(Base):
     property_id = Column(Integer, ForeignKey("properties.id"), nullable=False)
     resident_id = Column(Integer, ForeignKey("residents.id"), nullable=False)
     start_date = Column(DateTime(timezone=True), nullable=False)
-    end_date = Column(DateTime(timezone=True), nullable=True)  # NULL means current owner
+    end_date = Column(DateTime(timezone=True), nullable=True)  # NULL means current owner; closed links are kept as history
     ownership_percentage = Column(Float, default=100.0)  # For co-ownership
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -40,3 +51,10 @@ class PropertyResident(Base):
     property = relationship("Property", back_populates="property_residents")
     resident = relationship("Resident", back_populates="property_residents")
 
+    __table_args__ = (
+        # Current residents of a property (end_date IS NULL)
+        Index("ix_property_residents_property_end", "property_id", "end_date"),
+        # Ownership as of a date (start_date <= t < end_date)
+        Index("ix_property_residents_property_period", "property_id", "start_date", "end_date"),
+    )
+
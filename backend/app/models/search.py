@@ -0,0 +1,66 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, event
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class SearchEntry(Base):
+    """Fila del índice de búsqueda (mantenida por app.core.search)"""
+    __tablename__ = "search_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    condominium_id = Column(Integer, ForeignKey("condominiums.id"), nullable=False)
+    entity_type = Column(String(20), nullable=False)  # resident, property, block, document
+    entity_id = Column(Integer, nullable=False)
+    title = Column(String(255), nullable=False)  # Texto principal mostrado en el resultado
+    subtitle = Column(String(255), nullable=True)  # Documento, tipo de unidad, categoría...
+    search_text = Column(Text, nullable=False)  # Texto normalizado (minúsculas, sin tildes)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_search_entries_entity", "entity_type", "entity_id", unique=True),
+        Index("ix_search_entries_condo_type", "condominium_id", "entity_type"),
+    )
+
+
+# SQLite: FTS5 table over search_text, kept in sync with search_entries by triggers
+SQLITE_FULLTEXT_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_entries_fts USING fts5("
+    "search_text, content='search_entries', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS search_entries_ai AFTER INSERT ON search_entries BEGIN "
+    "INSERT INTO search_entries_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS search_entries_ad AFTER DELETE ON search_entries BEGIN "
+    "INSERT INTO search_entries_fts(search_entries_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS search_entries_au AFTER UPDATE ON search_entries BEGIN "
+    "INSERT INTO search_entries_fts(search_entries_fts, rowid, search_text) VALUES ('delete', old.id, old.search_text); "
+    "INSERT INTO search_entries_fts(rowid, search_text) VALUES (new.id, new.search_text); END",
+]
+
+# PostgreSQL: generated tsvector ('simple': no stemming, names and codes) with a GIN index.
+# search_text is already unaccented by app.core.search, so the expression stays immutable.
+POSTGRESQL_FULLTEXT_DDL = [
+    "ALTER TABLE search_entries ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', search_text)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_search_entries_vector ON search_entries USING gin (search_vector)",
+]
+
+
+def create_fulltext_index(connection) -> bool:
+    """Create the backend's full-text structures; False when unsupported (search falls back to LIKE)"""
+    if connection.dialect.name == "postgresql":
+        statements = POSTGRESQL_FULLTEXT_DDL
+    elif connection.dialect.name == "sqlite":
+        statements = SQLITE_FULLTEXT_DDL
+    else:
+        return False
+    try:
+        with connection.begin_nested():
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+    except Exception:
+        return False  # e.g. SQLite compiled without FTS5
+    return True
+
+
+@event.listens_for(SearchEntry.__table__, "after_create")
+def _create_fulltext_after_create(target, connection, **kw):
+    create_fulltext_index(connection)
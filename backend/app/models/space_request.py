@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Boolean, Index, DDL, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -12,6 +12,10 @@ class RequestStatus(enum.Enum):
     CANCELLED = "cancelled"
 
 
+# Statuses that hold the space; only these conflict with new bookings
+BOOKED_STATUSES = [RequestStatus.APPROVED]
+
+
 class SpaceRequest(Base):
     __tablename__ = "space_requests"
 
@@ -34,3 +38,20 @@ class SpaceRequest(Base):
     condominium = relationship("Condominium", back_populates="space_requests")
     resident = relationship("Resident", back_populates="space_requests")
 
+    __table_args__ = (
+        # Overlap checks scan one space's bookings by start_time within a bounded window
+        Index("ix_space_requests_space_start", "condominium_id", "space_name", "start_time", "end_time"),
+    )
+
+
+# On PostgreSQL the database itself rejects overlapping approved bookings
+event.listen(
+    SpaceRequest.__table__,
+    "after_create",
+    DDL(
+        "CREATE EXTENSION IF NOT EXISTS btree_gist; "
+        "ALTER TABLE space_requests ADD CONSTRAINT ex_space_requests_no_overlap "
+        "EXCLUDE USING gist (condominium_id WITH =, space_name WITH =, "
+        "tstzrange(start_time, end_time, '[)') WITH &&) WHERE (status = 'APPROVED')"
+    ).execute_if(dialect="postgresql"),
+)
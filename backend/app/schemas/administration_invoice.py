@@ -105,3 +105,102 @@ class GenerateBillingResponse(BaseModel):
     created: List[AdministrationInvoiceResponse] = []
     skipped_property_ids: List[int] = []
     message: str = ""
+
+
+class ReceivableAgingRow(BaseModel):
+    """Saldo pendiente por antigüedad para una unidad o un bloque."""
+    property_id: Optional[int] = None
+    property_code: Optional[str] = None
+    block_id: Optional[int] = None
+    block_name: Optional[str] = None
+    current: float = 0.0  # not yet due
+    days_1_30: float = 0.0
+    days_31_60: float = 0.0
+    days_61_90: float = 0.0
+    days_over_90: float = 0.0
+    total_pending: float = 0.0
+    invoice_count: int = 0
+
+
+class ReceivableAgingResponse(BaseModel):
+    """Accounts-receivable aging report (morosidad) for a condominium."""
+    condominium_id: int
+    group_by: str  # 'property' | 'block'
+    as_of: datetime
+    from_cache: bool = False
+    rows: List[ReceivableAgingRow] = []
+    totals: ReceivableAgingRow
+
+
+class OverdueSweepResponse(BaseModel):
+    """Result of marking past-due invoices as overdue."""
+    marked_overdue: int = 0
+    snapshot_rows: int = 0
+
+
+class StatementEntry(BaseModel):
+    """One line of a property account statement (cargo o abono)."""
+    entry_date: datetime
+    entry_type: str  # 'invoice' | 'payment'
+    invoice_id: int
+    invoice_number: str
+    description: str
+    charge: float = 0.0
+    payment: float = 0.0
+    balance: float = 0.0
+
+
+class PropertyStatementResponse(BaseModel):
+    """Estado de cuenta: invoices, payments and running balance for a property."""
+    property_id: int
+    property_code: str
+    condominium_id: int
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    opening_balance: float = 0.0
+    total_charged: float = 0.0
+    total_paid: float = 0.0
+    closing_balance: float = 0.0
+    entries: List[StatementEntry] = []
+
+
+class AdministrationFeeRuleBase(BaseModel):
+    rule_type: str  # 'property_type' | 'block' | 'area_rate' | 'late_interest' | 'recurring_charge'
+    value: float
+    property_type: Optional[str] = None
+    block_id: Optional[int] = None
+    property_id: Optional[int] = None
+    description: Optional[str] = None
+
+
+class AdministrationFeeRuleCreate(AdministrationFeeRuleBase):
+    pass
+
+
+class AdministrationFeeRuleResponse(AdministrationFeeRuleBase):
+    id: int
+    condominium_id: int
+    is_active: bool
+    created_by: int
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class FeeBreakdown(BaseModel):
+    """Per-unit result of the administration fee engine."""
+    property_id: int
+    base_amount: float = 0.0
+    late_interest: float = 0.0
+    recurring_charges: float = 0.0
+    previous_pending: float = 0.0
+
+    @property
+    def additional_charges(self) -> float:
+        return self.late_interest + self.recurring_charges
+
+    @property
+    def total_amount(self) -> float:
+        return self.base_amount + self.additional_charges
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class CalendarEvent(BaseModel):
+    uid: str  # Stable id shared with the .ics feed
+    event_type: str  # space_request, assembly, meeting
+    source_id: int
+    title: str
+    start: datetime
+    end: datetime
+    location: Optional[str] = None
+    description: Optional[str] = None
+    status: Optional[str] = None
+
+
+class CalendarFeedUrl(BaseModel):
+    url: str  # Subscription URL for calendar apps; carries the user's feed token instead of a JWT
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+from app.core.storage import SignedUploadUrl
 
 
 class CondominiumBase(BaseModel):
@@ -53,6 +54,8 @@ class CondominiumUpdate(BaseModel):
 
 class CondominiumResponse(CondominiumBase):
     id: int
+    logo_url: SignedUploadUrl = None
+    landscape_image_url: SignedUploadUrl = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, computed_field
+from typing import Literal, Optional
 from datetime import datetime
+from app.core.storage import download_url
 
 
 class DocumentBase(BaseModel):
@@ -32,10 +33,26 @@ class DocumentResponse(DocumentBase):
     mime_type: Optional[str] = None
     version: int
     previous_version_id: Optional[int] = None
+    root_document_id: Optional[int] = None  # First version; shared by every version of the document
+    is_latest: bool = True
+    content_hash: Optional[str] = None  # SHA-256 of the file
     uploaded_by: int
+    text_status: Optional[str] = None  # Text extraction: pending, extracted, empty, unsupported, failed
     created_at: datetime
     updated_at: Optional[datetime] = None
 
+    @computed_field
+    @property
+    def download_url(self) -> Optional[str]:
+        """Expiring link to the file from the storage backend (see app.core.storage)"""
+        return download_url(self.file_path, filename=self.file_name)
+
     class Config:
         from_attributes = True
 
+
+
+class DocumentTextJobPayload(BaseModel):
+    """Payload of the extract_document_text job"""
+    kind: Literal["document", "attachment"]
+    record_id: int
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field
 from typing import Optional
 from datetime import datetime
+from app.core.storage import download_url
 from app.models.document_attachment import AttachmentEntityType
 
 
@@ -28,9 +29,16 @@ class DocumentAttachmentResponse(DocumentAttachmentBase):
     file_size: Optional[int] = None
     mime_type: Optional[str] = None
     uploaded_by: int
+    text_status: Optional[str] = None  # Text extraction: pending, extracted, empty, unsupported, failed
     created_at: datetime
     updated_at: Optional[datetime] = None
 
+    @computed_field
+    @property
+    def download_url(self) -> Optional[str]:
+        """Expiring link to the file from the storage backend (see app.core.storage)"""
+        return download_url(self.file_path, filename=self.file_name)
+
     class Config:
         from_attributes = True
 
@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from typing import Optional, Any, Dict
+from datetime import datetime
+
+
+class JobCreate(BaseModel):
+    job_type: str  # generate_billing, ...
+    condominium_id: Optional[int] = None  # Required unless the job type is registered with global_scope
+    payload: Dict[str, Any] = {}
+
+
+class JobResponse(BaseModel):
+    id: int
+    job_type: str
+    status: str
+    condominium_id: Optional[int] = None
+    payload: Optional[Dict[str, Any]] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    progress: float = 0.0
+    progress_message: Optional[str] = None
+    idempotency_key: Optional[str] = None
+    attempts: int = 0
+    max_attempts: int = 3
+    created_by: int
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, model_validator
+from typing import Optional, Dict, List
 from datetime import datetime
 
 
@@ -29,3 +29,50 @@ class NotificationResponse(NotificationBase):
     class Config:
         from_attributes = True
 
+
+
+class NotificationUnreadCountResponse(BaseModel):
+    condominium_id: int
+    unread: int
+
+
+class NotificationDeliveryJobPayload(BaseModel):
+    """Payload of the deliver_notification background job: one notification or a batch of them."""
+    notification_id: Optional[int] = None
+    notification_ids: List[int] = []
+
+    @model_validator(mode="after")
+    def require_notification(self):
+        if self.notification_id is None and not self.notification_ids:
+            raise ValueError("notification_id or notification_ids is required")
+        return self
+
+
+class NotificationDeliverySummary(BaseModel):
+    notification_id: int
+    total: int = 0
+    by_status: Dict[str, int] = {}
+    by_channel: Dict[str, Dict[str, int]] = {}
+
+
+class WebPushSubscriptionCreate(BaseModel):
+    endpoint: str
+    p256dh: str
+    auth: str
+
+
+class WebPushSubscriptionResponse(WebPushSubscriptionCreate):
+    id: int
+    user_id: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PaymentReminderRunResponse(BaseModel):
+    """Result of a payment reminder run."""
+    reminders_created: int = 0
+    invoices_covered: int = 0
+    skipped_recent: int = 0
+    delivery_jobs: int = 0
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import AliasChoices, BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
+from app.core.storage import SignedUploadUrl
 
 
 class PropertyBase(BaseModel):
@@ -55,16 +56,65 @@ class PropertyResidentResponse(PropertyResidentBase):
 class PropertyResponse(PropertyBase):
     id: int
     condominium_id: int
-    photo_url: Optional[str] = None
+    photo_url: SignedUploadUrl = None
     created_at: datetime
     updated_at: Optional[datetime] = None
     block: Optional["BlockResponse"] = None
-    property_residents: Optional[List["PropertyResidentResponse"]] = None
+    # Current links only (Property.current_residents); history is at GET /properties/{id}/residents/history
+    property_residents: Optional[List["PropertyResidentResponse"]] = Field(
+        None, validation_alias=AliasChoices("current_residents", "property_residents")
+    )
 
     class Config:
         from_attributes = True
 
 
+class PropertyCompleteResponse(PropertyResponse):
+    """Response of create-complete/update-complete: the property plus residents that were not assigned"""
+    rejected_resident_ids: List[int] = []  # Unknown ids or residents of another condominium
+
+
+class PropertySummary(BaseModel):
+    """Compact row of the property listing (full detail comes from GET /properties/{id})"""
+    id: int
+    code: str
+    type: str
+    block_id: Optional[int] = None
+    block_name: Optional[str] = None
+    owner_name: Optional[str] = None  # Current resident with the largest ownership share
+    resident_count: int = 0  # Current residents
+
+    class Config:
+        from_attributes = True
+
+
+class PropertyPage(BaseModel):
+    items: List[PropertySummary] = []
+    total: int
+    skip: int
+    limit: int
+
+
+class PropertyImportRowError(BaseModel):
+    row: int  # Spreadsheet row number (the header is row 1)
+    field: Optional[str] = None
+    message: str
+
+
+class PropertyImportResponse(BaseModel):
+    """Result of a spreadsheet import; rows with errors are skipped, the rest are imported"""
+    dry_run: bool = False
+    rows_read: int = 0
+    rows_imported: int = 0
+    rows_failed: int = 0
+    blocks_created: int = 0
+    properties_created: int = 0
+    residents_created: int = 0
+    links_created: int = 0
+    links_existing: int = 0  # Resident already linked to the property
+    errors: List[PropertyImportRowError] = []
+
+
 # Forward reference resolution
 from app.schemas.block import BlockResponse
 from app.schemas.resident import ResidentResponse
@@ -72,4 +122,5 @@ from app.schemas.resident import ResidentResponse
 # Rebuild models after all definitions
 PropertyResidentResponse.model_rebuild()
 PropertyResponse.model_rebuild()
+PropertyCompleteResponse.model_rebuild()
 
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+from app.core.storage import SignedUploadUrl
 
 
 class ResidentBase(BaseModel):
@@ -27,7 +28,7 @@ class ResidentUpdate(BaseModel):
 class ResidentResponse(ResidentBase):
     id: int
     condominium_id: int
-    photo_url: Optional[str] = None
+    photo_url: SignedUploadUrl = None
     user_id: Optional[int] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
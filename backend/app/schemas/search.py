@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class SearchResult(BaseModel):
+    entity_type: str  # resident, property, block, document, attachment
+    entity_id: int
+    title: str
+    subtitle: Optional[str] = None
+    score: float  # Higher is a better match (0 without a full-text index)
+    snippet: Optional[str] = None  # Matched words in [brackets], normalized text (content search only)
+
+
+class SearchPage(BaseModel):
+    """Ranked search results with the total number of matches"""
+    items: List[SearchResult]
+    total: int
+    skip: int
+    limit: int
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime
 from app.models.space_request import RequestStatus
 
@@ -41,3 +41,18 @@ class SpaceRequestResponse(SpaceRequestBase):
     class Config:
         from_attributes = True
 
+
+class SpaceSlot(BaseModel):
+    start_time: datetime
+    end_time: datetime
+    status: Optional[RequestStatus] = None  # Set for busy slots
+    request_id: Optional[int] = None
+
+
+class SpaceAvailabilityResponse(BaseModel):
+    """Bookings and free gaps of a space in a date range."""
+    space_name: str
+    date_from: datetime
+    date_to: datetime
+    busy: List[SpaceSlot] = []
+    free: List[SpaceSlot] = []
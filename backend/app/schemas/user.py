@@ -1,6 +1,7 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List
 from datetime import datetime
+from app.core.storage import SignedUploadUrl
 
 
 class UserBase(BaseModel):
@@ -21,7 +22,7 @@ class UserUpdate(BaseModel):
 
 class UserResponse(UserBase):
     id: int
-    photo_url: Optional[str] = None
+    photo_url: SignedUploadUrl = None
     phone: Optional[str] = None
     document_type: Optional[str] = None
     document_number: Optional[str] = None
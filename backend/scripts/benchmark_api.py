@@ -0,0 +1,232 @@
+"""
+API load-test and benchmark harness.
+Drives the main endpoints (login, /me, invoice list, generate-billing,
+record_vote, get_assembly) against data seeded by
+scripts/seed_synthetic_data.py and reports p50/p95/p99 latency and SQL
+queries per request.
+
+By default the API runs in-process (FastAPI TestClient) against DATABASE_URL;
+with --base-url it targets a running server instead (start it with
+SQL_PROFILE_HEADERS=true to get query counts).
+
+Usage: python scripts/benchmark_api.py [--manifest FILE] [--requests N] [--concurrency N]
+                                       [--scenarios login,me,...] [--base-url URL] [--json FILE]
+"""
+import sys
+import os
+import re
+import math
+import json
+import time
+import random
+import argparse
+import statistics
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class HttpClient:
+    """Remote server through urllib (no extra dependencies)"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip("/")
+
+    def request(self, method, path, body=None, headers=None):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method)
+        request.add_header("Content-Type", "application/json")
+        for key, value in (headers or {}).items():
+            request.add_header(key, value)
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status, response.read(), response.headers.get("server-timing")
+        except urllib.error.HTTPError as e:
+            return e.code, e.read(), e.headers.get("server-timing")
+
+
+class InProcessClient:
+    """The app itself through TestClient; Server-Timing is switched on before import"""
+
+    def __init__(self):
+        os.environ.setdefault("SQL_PROFILE_HEADERS", "true")
+        os.environ.setdefault("JOB_WORKERS", "0")
+        from fastapi.testclient import TestClient
+        from app.main import app
+        self.client = TestClient(app, raise_server_exceptions=False)  # 500s are reported as errors
+        self.client.__enter__()  # Run the lifespan (schema check) once
+
+    def request(self, method, path, body=None, headers=None):
+        response = self.client.request(method, path, json=body, headers=headers)
+        return response.status_code, response.content, response.headers.get("server-timing")
+
+    def close(self):
+        self.client.__exit__(None, None, None)
+
+
+class Scenarios:
+    """Request factories per scenario; each call returns (method, path, body)"""
+
+    def __init__(self, manifest: dict, rng: random.Random):
+        self.manifest = manifest
+        self.rng = rng
+        self.condo = manifest["condominiums"][0]
+        self._billing_lock = threading.Lock()
+        self._billing_slots = [
+            (month, block_id) for month in range(1, 13) for block_id in self.condo["block_ids"]
+        ]
+
+    def login(self):
+        return "POST", "/api/auth/login", {"email": self.manifest["email"], "password": self.manifest["password"]}
+
+    def me(self):
+        return "GET", "/api/auth/me", None
+
+    def invoice_list(self):
+        year, month = self.rng.choice(self.condo["invoice_months"])
+        return "GET", f"/api/administration-invoices/condominium/{self.condo['id']}?year={year}&month={month}", None
+
+    def generate_billing(self):
+        # One block per call for a month nobody billed yet, so every call does real work
+        with self._billing_lock:
+            if not self._billing_slots:
+                return None
+            month, block_id = self._billing_slots.pop(0)
+        body = {"month": month, "year": self.manifest["billing_year"], "method": "block", "block_id": block_id}
+        return "POST", f"/api/administration-invoices/generate-billing?condominium_id={self.condo['id']}", body
+
+    def record_vote(self):
+        vote_id = self.rng.choice(self.condo["open_vote_ids"])
+        body = {"vote_id": vote_id, "resident_id": self.rng.choice(self.condo["resident_ids"]),
+                "vote_value": self.rng.choice(["yes", "no", "abstain"])}
+        return "POST", f"/api/assemblies/votes/{vote_id}/record", body
+
+    def get_assembly(self):
+        return "GET", f"/api/assemblies/{self.rng.choice(self.condo['assembly_ids'])}", None
+
+
+SCENARIOS = ["login", "me", "invoice_list", "generate_billing", "record_vote", "get_assembly"]
+
+
+def percentile(ordered, pct: float):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run_scenario(client, factory, headers, requests: int, concurrency: int, warmup: int):
+    def one(_):
+        spec = factory()
+        if spec is None:
+            return None
+        method, path, body = spec
+        started = time.perf_counter()
+        status_code, content, timing = client.request(method, path, body, headers)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        match = SERVER_TIMING_QUERIES.search(timing or "")
+        return status_code, elapsed_ms, int(match.group(1)) if match else None, content
+
+    for _ in range(warmup):
+        one(None)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [r for r in pool.map(one, range(requests)) if r is not None]
+    return results
+
+
+def summarize(name: str, results) -> dict:
+    latencies = sorted(r[1] for r in results)
+    queries = [r[2] for r in results if r[2] is not None]
+    errors = [r for r in results if r[0] >= 400]
+    if errors:
+        status_code, _, _, content = errors[0]
+        print(f"[ERROR] {name}: {len(errors)} failed request(s), first: {status_code} {content[:200]!r}")
+    return {
+        "scenario": name,
+        "requests": len(results),
+        "errors": len(errors),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "mean_ms": statistics.fmean(latencies) if latencies else 0.0,
+        "queries_mean": statistics.fmean(queries) if queries else None,
+        "queries_max": max(queries) if queries else None,
+    }
+
+
+def print_report(rows):
+    print(f"\n{'scenario':<18}{'n':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}{'max q':>7}")
+    for row in rows:
+        mean_q = f"{row['queries_mean']:.1f}" if row["queries_mean"] is not None else "-"
+        max_q = str(row["queries_max"]) if row["queries_max"] is not None else "-"
+        print(
+            f"{row['scenario']:<18}{row['requests']:>6}{row['errors']:>5}{row['p50_ms']:>10.1f}"
+            f"{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}{mean_q:>10}{max_q:>7}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the main API endpoints")
+    parser.add_argument("--manifest", default="benchmark_manifest.json", help="Written by seed_synthetic_data.py")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests per scenario")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--base-url", default=None, help="Target a running server instead of the in-process app")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", default=None, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    try:
+        with open(args.manifest, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        print(f"[ERROR] Manifest {args.manifest} not found; run scripts/seed_synthetic_data.py first")
+        sys.exit(1)
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        print(f"[ERROR] Unknown scenario(s): {', '.join(unknown)}")
+        sys.exit(1)
+
+    client = HttpClient(args.base_url) if args.base_url else InProcessClient()
+    print(f"[INFO] Target: {args.base_url or 'in-process app (' + os.environ.get('DATABASE_URL', 'default DATABASE_URL') + ')'}")
+
+    status_code, content, _ = client.request(
+        "POST", "/api/auth/login", {"email": manifest["email"], "password": manifest["password"]}
+    )
+    if status_code != 200:
+        print(f"[ERROR] Login failed ({status_code}): {content[:200]!r}")
+        sys.exit(1)
+    headers = {"Authorization": f"Bearer {json.loads(content)['access_token']}"}
+
+    scenarios = Scenarios(manifest, random.Random(args.seed))
+    rows = []
+    for name in names:
+        # generate-billing writes a month of invoices per call; never warm it up
+        warmup = 0 if name == "generate_billing" else args.warmup
+        print(f"[INFO] Running {name} ({args.requests} requests, concurrency {args.concurrency})")
+        results = run_scenario(client, getattr(scenarios, name), headers, args.requests, args.concurrency, warmup)
+        rows.append(summarize(name, results))
+
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"target": args.base_url or "in-process", "results": rows}, f, indent=2)
+        print(f"\n[SUCCESS] Results written to {args.json}")
+
+    if isinstance(client, InProcessClient):
+        client.close()
+    if any(row["errors"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
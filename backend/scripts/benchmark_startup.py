@@ -0,0 +1,96 @@
+"""
+Startup latency benchmark.
+Boots the API in fresh interpreters and reports how long importing app.main
+takes and how long the lifespan startup (schema check) takes until the worker
+is ready. Use it to track regressions when adding routers or dependencies.
+
+Usage: python scripts/benchmark_startup.py [--runs N] [--importtime TOP] [--max-ready-ms MS]
+"""
+import sys
+import os
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a fresh interpreter per run so module caches do not skew results
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(boot())
+print(json.dumps({"import_ms": (imported - started) * 1000, "ready_ms": (ready - started) * 1000}))
+"""
+
+
+def run_probe(env):
+    process = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if process.returncode != 0:
+        lines = process.stderr.strip().splitlines() or ["(no output)"]
+        print(f"[ERROR] Startup failed: {lines[-1]}")
+        sys.exit(1)
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(env, top: int):
+    """Modules with the highest cumulative import time (python -X importtime)"""
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if not parts[1].strip().isdigit():
+            continue
+        rows.append((int(parts[1]), parts[2].rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def summarize(values):
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return f"median {statistics.median(ordered):7.1f} ms | p95 {p95:7.1f} ms | max {ordered[-1]:7.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API import and startup latency")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", type=int, default=0, metavar="TOP", help="Show the TOP slowest imports")
+    parser.add_argument("--max-ready-ms", type=float, default=None, help="Exit with status 1 if median readiness exceeds this")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    print(f"[INFO] Booting app.main {args.runs} time(s)")
+    results = [run_probe(env) for _ in range(args.runs)]
+    import_ms = [r["import_ms"] for r in results]
+    ready_ms = [r["ready_ms"] for r in results]
+    print(f"[INFO] Import : {summarize(import_ms)}")
+    print(f"[INFO] Ready  : {summarize(ready_ms)}")
+
+    if args.importtime:
+        print("[INFO] Slowest imports (cumulative):")
+        for micros, module in slowest_imports(env, args.importtime):
+            print(f"  {micros / 1000:8.1f} ms  {module.strip()}")
+
+    if args.max_ready_ms is not None and statistics.median(ready_ms) > args.max_ready_ms:
+        print(f"[ERROR] Median readiness {statistics.median(ready_ms):.1f} ms exceeds {args.max_ready_ms:.1f} ms")
+        sys.exit(1)
+    print("[SUCCESS] Startup benchmark finished")
+
+
+if __name__ == "__main__":
+    main()
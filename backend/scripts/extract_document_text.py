@@ -0,0 +1,58 @@
+"""
+Script to extract and index the text of documents and attachments that were
+never processed (uploaded before text extraction existed) or, with --retry,
+those marked unsupported/failed (e.g. PDFs before installing pypdf).
+Runs in this process; uploads through the API use the background job pool.
+
+Usage: python scripts/extract_document_text.py [--condominium-id ID] [--retry]
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.core.text_extraction import TextStatus, extract_into
+from app.models.document import Document
+from app.models.document_attachment import DocumentAttachment
+
+BATCH_SIZE = 50
+
+
+def extract():
+    parser = argparse.ArgumentParser(description="Extract text of unprocessed documents")
+    parser.add_argument("--condominium-id", type=int, default=None, help="Only this condominium")
+    parser.add_argument("--retry", action="store_true", help="Also retry unsupported and failed files")
+    args = parser.parse_args()
+
+    statuses = [TextStatus.PENDING]
+    if args.retry:
+        statuses += [TextStatus.UNSUPPORTED, TextStatus.FAILED]
+
+    db = SessionLocal()
+    try:
+        for model in (Document, DocumentAttachment):
+            query = db.query(model.id).filter(model.text_status.is_(None) | model.text_status.in_(statuses))
+            if args.condominium_id is not None:
+                query = query.filter(model.condominium_id == args.condominium_id)
+            ids = [row.id for row in query.order_by(model.id)]
+            counts = {}
+            for start in range(0, len(ids), BATCH_SIZE):
+                for record in db.query(model).filter(model.id.in_(ids[start:start + BATCH_SIZE])):
+                    text_status = extract_into(record)
+                    counts[text_status] = counts.get(text_status, 0) + 1
+                db.commit()  # Also refreshes the search index
+            print(f"[INFO] {model.__tablename__}: {len(ids)} file(s) processed {counts or ''}")
+        print("[SUCCESS] Text extraction finished.")
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Text extraction failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    extract()
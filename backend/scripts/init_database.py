@@ -1,7 +1,7 @@
 """
 Script to initialize the database
 This script will:
-1. Create all tables
+1. Apply the Alembic migrations (alembic upgrade head)
 2. Initialize roles
 3. Create a test user with admin role
 """
@@ -10,16 +10,21 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from sqlalchemy.orm import Session
-from app.core.database import engine, Base, SessionLocal
+from alembic import command
+from alembic.config import Config
+from app.core.database import SessionLocal
+from app.core.startup import ALEMBIC_INI, BACKEND_DIR
 from app.models import *
 from app.core.security import get_password_hash
 
 
 def init_database():
     """Initialize database with tables, roles, and test user"""
-    print("Creating database tables...")
-    Base.metadata.create_all(bind=engine)
-    print("[OK] Tables created")
+    print("Applying database migrations...")
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    command.upgrade(config, "head")
+    print("[OK] Database schema is up to date")
     
     db: Session = SessionLocal()
     
@@ -0,0 +1,40 @@
+"""
+Script to regenerate the full-text search index (search_entries) from the
+residents, properties, blocks and documents tables. Needed after writing
+those tables outside the API (raw SQL, restores, bulk scripts).
+
+Usage: python scripts/rebuild_search_index.py [--condominium-id ID]
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.core.search import rebuild_search_index
+
+
+def rebuild():
+    parser = argparse.ArgumentParser(description="Rebuild the search index")
+    parser.add_argument("--condominium-id", type=int, default=None, help="Only this condominium")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        counts = rebuild_search_index(db.connection(), args.condominium_id)
+        db.commit()
+        for entity_type, count in counts.items():
+            print(f"[INFO] {entity_type}: {count} entries")
+        print("[SUCCESS] Search index rebuilt.")
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Search index rebuild failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild()
@@ -0,0 +1,60 @@
+"""
+Background job worker.
+Runs queued jobs from background_jobs on a process pool. Use it on dedicated
+machines/cores, or with JOB_WORKERS=0 in the API so requests only enqueue.
+Running jobs whose lease expired (crashed worker) are queued again on every poll.
+
+Usage: python scripts/run_job_worker.py [--workers N] [--poll SECONDS] [--once]
+"""
+import sys
+import os
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.jobs import run_job, init_job_worker, recover_stale_jobs
+from app.models.job import BackgroundJob, JobStatus
+
+
+def queued_job_ids(limit: int):
+    db = SessionLocal()
+    try:
+        rows = db.query(BackgroundJob.id).filter(
+            BackgroundJob.status == JobStatus.QUEUED
+        ).order_by(BackgroundJob.id).limit(limit).all()
+        return [job_id for (job_id,) in rows]
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run queued background jobs")
+    parser.add_argument("--workers", type=int, default=max(settings.JOB_WORKERS, 1))
+    parser.add_argument("--poll", type=float, default=2.0, help="Seconds between queue polls")
+    parser.add_argument("--once", action="store_true", help="Drain the queue once and exit")
+    args = parser.parse_args()
+
+    print(f"[INFO] Job worker started with {args.workers} process(es)")
+    in_flight = {}
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=init_job_worker) as executor:
+        while True:
+            in_flight = {job_id: f for job_id, f in in_flight.items() if not f.done()}
+            recover_stale_jobs()  # Jobs of crashed workers go back to the queue
+            free = args.workers - len(in_flight)
+            if free > 0:
+                for job_id in queued_job_ids(free * 2):
+                    if job_id not in in_flight:
+                        in_flight[job_id] = executor.submit(run_job, job_id)
+            if args.once and not in_flight:
+                break
+            time.sleep(args.poll)
+    print("[SUCCESS] Job worker stopped")
+
+
+if __name__ == "__main__":
+    main()
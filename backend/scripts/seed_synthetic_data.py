@@ -0,0 +1,332 @@
+"""
+Synthetic data generator for load tests and benchmarks.
+Seeds large condominiums (blocks, thousands of properties and residents,
+years of monthly invoices with payments, accounting transactions and
+assemblies with votes) using batched bulk inserts, and writes a JSON manifest
+(credentials and ids) for scripts/benchmark_api.py.
+
+Run against a migrated database (python scripts/init_database.py); works on
+SQLite and PostgreSQL through DATABASE_URL.
+
+Usage: python scripts/seed_synthetic_data.py [--condominiums N] [--properties N] [--years N] ...
+"""
+import sys
+import os
+import json
+import random
+import argparse
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, select
+from app.core.database import SessionLocal
+from app.core.security import get_password_hash
+from app.core.startup import prepare_database, SchemaOutOfDate
+from app.core.search import rebuild_search_index
+from app.models import (
+    Role, User, UserRole, UserCondominium, Condominium, Block, Property, PropertyResident, Resident,
+    AdministrationInvoice, InvoicePayment, InvoiceStatus, PaymentMethod,
+    AccountingTransaction, Assembly, AssemblyVote, VoteRecord, AssemblyAttendance,
+)
+from app.models.accounting import TransactionType, TransactionStatus
+
+PROPERTY_TYPES = [("apartment", 0.8), ("house", 0.12), ("commercial", 0.05), ("parking", 0.03)]
+EXPENSE_CATEGORIES = ["Vigilancia", "Aseo", "Mantenimiento", "Servicios públicos", "Jardinería", "Seguros"]
+FIRST_NAMES = ["Ana", "Carlos", "Lucía", "Jorge", "María", "Andrés", "Valentina", "Felipe", "Sofía", "Camilo"]
+LAST_NAMES = ["Gómez", "Rodríguez", "Martínez", "López", "García", "Pérez", "Sánchez", "Ramírez", "Torres", "Díaz"]
+VOTE_OPTIONS = json.dumps([
+    {"label": "Sí", "color": "#2E7D32", "key": "yes"},
+    {"label": "No", "color": "#C62828", "key": "no"},
+    {"label": "Abstención", "color": "#757575", "key": "abstain"},
+])
+
+
+def bulk_insert(db, model, rows, batch_size):
+    for start in range(0, len(rows), batch_size):
+        db.execute(insert(model.__table__), rows[start:start + batch_size])
+
+
+def ensure_benchmark_user(db, email: str, password: str) -> User:
+    """Admin + accountant user linked to the seeded condominiums (not super_admin, so access checks run)"""
+    roles = {}
+    for name in ("admin", "accountant"):
+        role = db.query(Role).filter(Role.name == name).first()
+        if not role:
+            role = Role(name=name)
+            db.add(role)
+            db.flush()
+        roles[name] = role
+
+    user = db.query(User).filter(User.email == email).first()
+    if not user:
+        user = User(email=email, full_name="Benchmark Admin", hashed_password=get_password_hash(password), is_active=True)
+        db.add(user)
+        db.flush()
+        for role in roles.values():
+            db.add(UserRole(user_id=user.id, role_id=role.id))
+        db.flush()
+    return user
+
+
+def month_starts(years: int, today: datetime):
+    """First day of each month for the last `years` years, ending with the previous month"""
+    year, month = today.year, today.month
+    months = []
+    for _ in range(years * 12):
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+        months.append(datetime(year, month, 1))
+    return list(reversed(months))
+
+
+def seed_condominium(db, rng, args, index: int, user: User, now: datetime) -> dict:
+    condo = Condominium(
+        name=f"Conjunto Sintético {index + 1}", short_name=f"SYN{index + 1}", city="Bogotá",
+        country="Colombia", total_units=args.properties, administration_value_type="global",
+        administration_value_cop=args.base_fee,
+    )
+    db.add(condo)
+    db.flush()
+    db.add(UserCondominium(user_id=user.id, condominium_id=condo.id))
+    cid = condo.id
+
+    bulk_insert(db, Block, [
+        {"condominium_id": cid, "name": f"Bloque {b + 1}"} for b in range(args.blocks)
+    ], args.batch_size)
+    block_ids = list(db.execute(select(Block.id).where(Block.condominium_id == cid).order_by(Block.id)).scalars())
+
+    # Properties
+    kinds, weights = zip(*PROPERTY_TYPES)
+    property_rows = []
+    per_block = max(len(block_ids), 1)
+    for p in range(args.properties):
+        property_rows.append({
+            "condominium_id": cid,
+            "block_id": block_ids[p % per_block] if block_ids else None,
+            "code": f"{p % per_block + 1}-{p // per_block + 101}",
+            "type": rng.choices(kinds, weights)[0],
+            "area": round(rng.uniform(35, 180), 1),
+        })
+    bulk_insert(db, Property, property_rows, args.batch_size)
+    properties = db.execute(
+        select(Property.id, Property.area).where(Property.condominium_id == cid).order_by(Property.id)
+    ).all()
+
+    # Residents: owners and tenants, a few with more than one property
+    resident_count = max(1, int(args.properties * args.residents_per_property))
+    bulk_insert(db, Resident, [
+        {
+            "condominium_id": cid,
+            "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {r}",
+            "email": f"residente{cid}.{r}@example.com",
+            "document_type": "CC",
+            "document_number": f"{cid:03d}{r:07d}",
+        }
+        for r in range(resident_count)
+    ], args.batch_size)
+    resident_ids = list(db.execute(select(Resident.id).where(Resident.condominium_id == cid).order_by(Resident.id)).scalars())
+
+    history_start = now - timedelta(days=365 * args.years)
+    links = []
+    for i, (property_id, _) in enumerate(properties):
+        links.append({"property_id": property_id, "resident_id": resident_ids[i % len(resident_ids)],
+                      "start_date": history_start, "ownership_percentage": 100.0})
+    for i in range(len(properties), len(resident_ids)):
+        property_id = properties[rng.randrange(len(properties))][0]
+        links.append({"property_id": property_id, "resident_id": resident_ids[i],
+                      "start_date": history_start + timedelta(days=rng.randrange(365 * args.years)),
+                      "ownership_percentage": 50.0})
+    bulk_insert(db, PropertyResident, links, args.batch_size)
+
+    # Monthly invoices with payments; older months are mostly paid
+    months = month_starts(args.years, now)
+    invoices = []
+    for m_index, month_start in enumerate(months):
+        age = len(months) - m_index
+        for property_id, area in properties:
+            total = round(args.base_fee * (area or 60) / 60, 0)
+            roll = rng.random()
+            paid_share, partial_share = (0.97, 0.015) if age > 3 else (0.7, 0.1)
+            paid_ratio = 1.0 if roll < paid_share else (0.5 if roll < paid_share + partial_share else 0.0)
+            paid = round(total * paid_ratio, 0)
+            due = month_start + timedelta(days=15)
+            if paid >= total:
+                status = InvoiceStatus.PAID
+            elif paid > 0:
+                status = InvoiceStatus.PARTIAL
+            else:
+                status = InvoiceStatus.OVERDUE if due < now else InvoiceStatus.PENDING
+            invoices.append({
+                "condominium_id": cid,
+                "property_id": property_id,
+                "invoice_number": f"SYN-{cid}-{month_start:%Y%m}-{property_id}",
+                "month": month_start.month,
+                "year": month_start.year,
+                "issue_date": month_start,
+                "due_date": due,
+                "base_amount": total,
+                "additional_charges": 0.0,
+                "discounts": 0.0,
+                "total_amount": total,
+                "paid_amount": paid,
+                "pending_amount": total - paid,
+                "status": status,
+                "is_active": True,
+                "created_by": user.id,
+            })
+    bulk_insert(db, AdministrationInvoice, invoices, args.batch_size)
+    invoice_count = len(invoices)
+    del invoices
+
+    paid_invoices = db.execute(
+        select(AdministrationInvoice.id, AdministrationInvoice.paid_amount, AdministrationInvoice.issue_date)
+        .where(AdministrationInvoice.condominium_id == cid, AdministrationInvoice.paid_amount > 0)
+    ).all()
+    methods = list(PaymentMethod)
+    payments = [
+        {
+            "invoice_id": invoice_id,
+            "amount": amount,
+            "payment_date": issue_date + timedelta(days=rng.randrange(1, 25)),
+            "payment_method": rng.choice(methods),
+            "reference_number": f"REF{invoice_id}",
+            "recorded_by": user.id,
+        }
+        for invoice_id, amount, issue_date in paid_invoices
+    ]
+    bulk_insert(db, InvoicePayment, payments, args.batch_size)
+
+    # Accounting: one income entry per month and several expenses
+    transactions = []
+    for month_start in months:
+        transactions.append({
+            "condominium_id": cid, "type": TransactionType.INCOME, "category": "Administración",
+            "description": f"Recaudo administración {month_start:%Y-%m}",
+            "amount": round(args.base_fee * len(properties) * 0.9, 0),
+            "transaction_date": month_start + timedelta(days=20),
+            "status": TransactionStatus.COMPLETED, "created_by": user.id,
+        })
+        for category in EXPENSE_CATEGORIES:
+            transactions.append({
+                "condominium_id": cid, "type": TransactionType.EXPENSE, "category": category,
+                "description": f"{category} {month_start:%Y-%m}",
+                "amount": round(rng.uniform(0.02, 0.2) * args.base_fee * len(properties), 0),
+                "transaction_date": month_start + timedelta(days=rng.randrange(1, 28)),
+                "status": TransactionStatus.COMPLETED, "created_by": user.id,
+            })
+    bulk_insert(db, AccountingTransaction, transactions, args.batch_size)
+
+    # Assemblies: past ones completed, the last one in progress with open votes
+    assembly_ids, open_vote_ids = [], []
+    for a in range(args.assemblies):
+        in_progress = a == args.assemblies - 1
+        scheduled = now + timedelta(hours=1) if in_progress else history_start + timedelta(
+            days=int((a + 1) * 365 * args.years / max(args.assemblies, 1)) - 30)
+        assembly = Assembly(
+            condominium_id=cid, assembly_number=a + 1, title=f"Asamblea {a + 1}", scheduled_date=scheduled,
+            location="Salón comunal", agenda="1. Quórum\n2. Informe\n3. Votaciones", required_quorum=50.0,
+            status="in_progress" if in_progress else "completed", created_by=user.id,
+        )
+        db.add(assembly)
+        db.flush()
+        assembly_ids.append(assembly.id)
+
+        attendees = rng.sample(resident_ids, k=int(len(resident_ids) * rng.uniform(0.4, 0.7)))
+        bulk_insert(db, AssemblyAttendance, [
+            {"assembly_id": assembly.id, "resident_id": r, "attended": True, "attendance_confirmed_at": scheduled}
+            for r in attendees
+        ], args.batch_size)
+
+        for v in range(args.votes_per_assembly):
+            vote = AssemblyVote(assembly_id=assembly.id, topic=f"Proposición {v + 1}", options=VOTE_OPTIONS,
+                                is_active=True)
+            db.add(vote)
+            db.flush()
+            if in_progress:
+                open_vote_ids.append(vote.id)
+                continue
+            values = [rng.choices(["yes", "no", "abstain"], [0.6, 0.3, 0.1])[0] for _ in attendees]
+            bulk_insert(db, VoteRecord, [
+                {"vote_id": vote.id, "resident_id": r, "vote_value": value} for r, value in zip(attendees, values)
+            ], args.batch_size)
+            counts = {key: values.count(key) for key in ("yes", "no", "abstain")}
+            vote.total_votes = len(values)
+            vote.yes_votes, vote.no_votes, vote.abstain_votes = counts["yes"], counts["no"], counts["abstain"]
+            vote.option_votes = json.dumps(counts)
+            vote.is_active = False
+
+    # Bulk inserts bypass the ORM hook that maintains the search index
+    rebuild_search_index(db.connection(), cid)
+    db.commit()
+    print(
+        f"[INFO] Condominium {cid}: {len(properties)} properties, {len(resident_ids)} residents, "
+        f"{invoice_count} invoices, {len(payments)} payments, {len(transactions)} transactions, "
+        f"{len(assembly_ids)} assemblies"
+    )
+    return {
+        "id": cid,
+        "block_ids": block_ids,
+        "assembly_ids": assembly_ids,
+        "open_vote_ids": open_vote_ids,
+        "resident_ids": rng.sample(resident_ids, k=min(len(resident_ids), 1000)),
+        "invoice_months": [[m.year, m.month] for m in months[-12:]],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed large synthetic condominiums for benchmarks")
+    parser.add_argument("--condominiums", type=int, default=1)
+    parser.add_argument("--properties", type=int, default=2000, help="Properties per condominium")
+    parser.add_argument("--blocks", type=int, default=20, help="Blocks per condominium")
+    parser.add_argument("--residents-per-property", type=float, default=1.3)
+    parser.add_argument("--years", type=int, default=3, help="Years of monthly invoices")
+    parser.add_argument("--assemblies", type=int, default=6, help="Assemblies per condominium")
+    parser.add_argument("--votes-per-assembly", type=int, default=4)
+    parser.add_argument("--base-fee", type=float, default=250000.0, help="Monthly fee for a 60 m² unit")
+    parser.add_argument("--email", default="bench-admin@example.com")
+    parser.add_argument("--password", default="bench1234")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--manifest", default="benchmark_manifest.json", help="Output file for scripts/benchmark_api.py")
+    args = parser.parse_args()
+
+    try:
+        prepare_database()
+    except SchemaOutOfDate as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        user = ensure_benchmark_user(db, args.email, args.password)
+        db.commit()
+        condominiums = []
+        for index in range(args.condominiums):
+            started = datetime.utcnow()
+            condominiums.append(seed_condominium(db, rng, args, index, user, now))
+            print(f"[INFO] Seeded in {(datetime.utcnow() - started).total_seconds():.1f} s")
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Seeding failed: {e}")
+        raise
+    finally:
+        db.close()
+
+    manifest = {
+        "email": args.email,
+        "password": args.password,
+        "billing_year": now.year + 1,  # No invoices exist yet, so generate-billing always has work
+        "condominiums": condominiums,
+    }
+    with open(args.manifest, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"[SUCCESS] Seeded {len(condominiums)} condominium(s); manifest written to {args.manifest}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Script to send payment reminders to residents with overdue administration
+invoices, for every condominium in one pass.
+Intended to run daily after sweep_overdue_invoices.py (cron / scheduled task).
+Deliveries are left queued for scripts/run_job_worker.py.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.api.notifications import generate_payment_reminders
+
+
+def send():
+    db = SessionLocal()
+    try:
+        result = generate_payment_reminders(db, dispatch=False)
+        print(f"[SUCCESS] {result.reminders_created} reminder(s) created covering {result.invoices_covered} invoice(s).")
+        print(f"[INFO] {result.skipped_recent} user(s) skipped (reminded in the last days).")
+        print(f"[INFO] {result.delivery_jobs} delivery job(s) queued.")
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Payment reminders failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    send()
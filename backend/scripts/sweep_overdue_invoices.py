@@ -0,0 +1,32 @@
+"""
+Script to mark past-due administration invoices as overdue and refresh the
+accounts-receivable aging snapshot for every condominium.
+Intended to run daily (cron / scheduled task).
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import SessionLocal
+from app.api.administration_invoices import sweep_overdue_invoices
+
+
+def sweep():
+    db = SessionLocal()
+    try:
+        result = sweep_overdue_invoices(db)
+        db.commit()
+        print(f"[SUCCESS] {result.marked_overdue} invoice(s) marked overdue.")
+        print(f"[INFO] Aging snapshot refreshed with {result.snapshot_rows} row(s).")
+    except Exception as e:
+        db.rollback()
+        print(f"[ERROR] Overdue sweep failed: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sweep()